@@ -1,7 +1,16 @@
 """
 Database Configuration
 Async SQLAlchemy engine for SQLite/PostgreSQL
+Optional read replica (DATABASE_READ_URL) for GET routes via get_read_db
 """
+import math
+import time
+from contextvars import ContextVar, Token
+from typing import Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event, inspect, text
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
@@ -9,36 +18,56 @@ import os
 
 # Database URL - supports both SQLite (local) and PostgreSQL (production)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./counsellor.db")
+# Optional read replica for GET routes (unset = reads use the primary)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "").strip()
+# After a user's write, their reads stay on the primary this long (replication lag)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
 
-# Convert postgres:// to postgresql+asyncpg:// for async support (Render/Railway compatibility)
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-elif DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-# Detect if using PostgreSQL for pgbouncer compatibility
-is_postgres = "postgresql+asyncpg://" in DATABASE_URL
+def normalize_database_url(url: str) -> str:
+    """Convert postgres:// to postgresql+asyncpg:// for async support (Render/Railway compatibility)"""
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
 
-# Create async engine with pgbouncer-compatible settings
-# Use NullPool to let pgbouncer handle connection pooling
-if is_postgres:
-    engine = create_async_engine(
-        DATABASE_URL,
-        echo=False,
-        poolclass=NullPool,  # Disable SQLAlchemy pooling, let pgbouncer handle it
-        connect_args={
-            "statement_cache_size": 0,
-            "prepared_statement_cache_size": 0,
-        },
-    )
-else:
-    engine = create_async_engine(
-        DATABASE_URL,
+
+def create_engine_for(url: str):
+    """Create async engine with pgbouncer-compatible settings"""
+    if "postgresql+asyncpg://" in url:
+        # Use NullPool to let pgbouncer handle connection pooling
+        return create_async_engine(
+            url,
+            echo=False,
+            poolclass=NullPool,  # Disable SQLAlchemy pooling, let pgbouncer handle it
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            },
+        )
+    return create_async_engine(
+        url,
         echo=False,
         future=True,
         pool_pre_ping=True,
     )
 
+
+DATABASE_URL = normalize_database_url(DATABASE_URL)
+
+# Detect if using PostgreSQL for pgbouncer compatibility
+is_postgres = "postgresql+asyncpg://" in DATABASE_URL
+
+# Primary engine: every write, plus reads that must see them
+engine = create_engine_for(DATABASE_URL)
+
+# Read-only engine (same as primary when no replica is configured)
+if DATABASE_READ_URL:
+    read_engine = create_engine_for(normalize_database_url(DATABASE_READ_URL))
+else:
+    read_engine = engine
+
 # Async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -49,6 +78,100 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+def add_missing_columns(sync_conn, metadata):
+    """
+    ALTER TABLE ... ADD COLUMN for model columns that existing tables lack
+    (create_all only creates missing tables); new columns need a server_default
+    Run via conn.run_sync(add_missing_columns, Base.metadata)
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}"))
+
+
+# Read-your-writes without shared server state: a response to a request that
+# committed row changes carries the write time (epoch seconds) in this header,
+# and the client sends its latest value back on every request / chat frame
+WRITE_MARKER_HEADER = "X-Last-Write"
+
+
+class WriteTracker:
+    """Set for one request: when it last committed a change to at least one row"""
+    __slots__ = ("wrote_at",)
+
+    def __init__(self):
+        self.wrote_at: Optional[float] = None
+
+
+_write_tracker: ContextVar[Optional[WriteTracker]] = ContextVar("write_tracker", default=None)
+
+
+def track_writes() -> Tuple[WriteTracker, Token]:
+    """Start tracking commits for the current request (reset the token afterwards)"""
+    tracker = WriteTracker()
+    return tracker, _write_tracker.set(tracker)
+
+
+def stop_tracking_writes(token: Token):
+    _write_tracker.reset(token)
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _note_row_change(conn, cursor, statement, parameters, context, executemany):
+    # rowcount is -1 when the driver can't tell (RETURNING on SQLite) - count it as a write
+    if (context.isinsert or context.isupdate or context.isdelete) and cursor.rowcount != 0:
+        conn.info["rows_changed"] = True
+
+
+@event.listens_for(engine.sync_engine, "commit")
+def _mark_committed_write(conn):
+    if conn.info.pop("rows_changed", False):
+        tracker = _write_tracker.get()
+        if tracker is not None:
+            tracker.wrote_at = time.time()
+
+
+@event.listens_for(engine.sync_engine, "rollback")
+def _forget_rolled_back_write(conn):
+    conn.info.pop("rows_changed", None)
+
+
+def format_write_marker(wrote_at: float) -> str:
+    return f"{wrote_at:.3f}"
+
+
+def parse_write_marker(value) -> Optional[float]:
+    """Client-sent write marker (header or frame field), None if absent or malformed"""
+    try:
+        marker = float(value)
+    except (TypeError, ValueError):
+        return None
+    return marker if math.isfinite(marker) else None
+
+
+def reads_pinned_to_primary(last_write: Optional[float]) -> bool:
+    """True within READ_YOUR_WRITES_SECONDS of the client's last write"""
+    if last_write is None:
+        return False
+    # Markers are issued by our own clock; anything far in the future is ignored
+    return abs(time.time() - last_write) < READ_YOUR_WRITES_SECONDS
+
+
 # Dependency to get DB session
 async def get_db():
     """
@@ -60,3 +183,23 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+def read_session_factory(last_write: Optional[float]) -> async_sessionmaker:
+    """Replica sessions, unless there is no replica or the client wrote recently"""
+    if read_engine is engine or reads_pinned_to_primary(last_write):
+        return AsyncSessionLocal
+    return ReadSessionLocal
+
+
+async def get_read_db(request: Request):
+    """
+    FastAPI dependency for read-only routes (GET)
+    Uses the read replica unless the caller wrote recently (read-your-writes);
+    request.state.last_write is the client's X-Last-Write, set in main.py
+    """
+    async with read_session_factory(getattr(request.state, "last_write", None))() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,17 +1,20 @@
 """
 Authentication Dependencies
 JWT Token validation and user extraction
+- get_token_user: identity from the token's claims, no DB query (most routes)
+- get_current_user: the full User row, for routes that need more than that
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import os
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 
-from database import get_db
+from database import get_db, AsyncSessionLocal
 from models import User
+from services.token_versions import token_versions
 
 # Security
 security = HTTPBearer()
@@ -22,6 +25,14 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 
+class TokenUser(NamedTuple):
+    """Caller identity carried by a versioned access token (email and name never change)"""
+    id: int
+    email: str
+    full_name: Optional[str]
+    token_version: int
+
+
 def create_access_token(data: dict) -> str:
     """
     Create JWT access token
@@ -29,15 +40,27 @@ def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    from jose import jwt  # deferred (~60 ms of imports), /health never needs it
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def create_user_token(user: User) -> str:
+    """Versioned access token carrying what get_token_user needs"""
+    return create_access_token(data={
+        "sub": str(user.id),
+        "email": user.email,
+        "name": user.full_name,
+        "ver": user.token_version or 0,
+    })
+
+
 def verify_token(token: str) -> dict:
     """
     Verify and decode JWT token
     Raises HTTPException if invalid
     """
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id_raw = payload.get("sub")
@@ -55,7 +78,12 @@ def verify_token(token: str) -> dict:
                 detail="Invalid authentication credentials",
             )
 
-        return {"user_id": user_id}
+        return {
+            "user_id": user_id,
+            "email": payload.get("email"),
+            "name": payload.get("name"),
+            "ver": payload.get("ver"),
+        }
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,6 +91,61 @@ def verify_token(token: str) -> dict:
         )
 
 
+def user_id_from_authorization(authorization: Optional[str]) -> Optional[int]:
+    """Best-effort user ID from an Authorization header (no DB lookup, never raises)"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return verify_token(authorization[7:].strip())["user_id"]
+    except HTTPException:
+        return None
+
+
+def _revoked():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+    )
+
+
+async def resolve_token_user(token: str) -> TokenUser:
+    """
+    Identity for a bearer token
+    - Versioned tokens: claims plus a revocation check against the
+      in-memory token version table (no DB query)
+    - Tokens issued before versioning carry only "sub" and are resolved
+      from the users table until they expire; they count as version 0, so
+      the first POST /auth/revoke invalidates them too
+    """
+    payload = verify_token(token)
+    if not isinstance(payload["ver"], int) or not payload["email"]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.id == payload["user_id"]))
+            user = result.scalar_one_or_none()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        if user.token_version > 0:
+            raise _revoked()
+        return TokenUser(user.id, user.email, user.full_name, user.token_version)
+
+    if not token_versions.is_current(payload["user_id"], payload["ver"]):
+        raise _revoked()
+    return TokenUser(payload["user_id"], payload["email"], payload["name"], payload["ver"])
+
+
+async def get_token_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenUser:
+    """
+    FastAPI dependency for routes that only need the caller's id/email/name
+    Usage: current_user: TokenUser = Depends(get_token_user)
+    """
+    return await resolve_token_user(credentials.credentials)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -84,5 +167,8 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    # Tokens without "ver" predate versioning: version 0
+    if (payload["ver"] or 0) < user.token_version:
+        raise _revoked()
     
     return user
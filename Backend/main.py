@@ -5,30 +5,94 @@ The Neural Core - AI Counsellor Backend
 from dotenv import load_dotenv
 load_dotenv()  # Load .env file BEFORE other imports
 
+from services.boot import boot_profile, warm_up, BOOT_WARMUP
+boot_profile.start()  # time every import below (report on /metrics under "boot")
+
+from services.log_pipeline import setup_logging, log_pipeline, request_context, current_request_id, LOG_REQUESTS
+setup_logging()  # JSON logs through a queue + writer thread (before anything logs)
+
+import asyncio
+import logging
 import os
-from fastapi import FastAPI
+import re
+import time
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from sqlalchemy.exc import IntegrityError
 
-from database import engine
+from database import (
+    engine, read_engine, add_missing_columns, WRITE_MARKER_HEADER, track_writes, stop_tracking_writes,
+    format_write_marker, parse_write_marker
+)
+from dependencies import user_id_from_authorization
 from models import Base
-from routes import auth, profile, chat, universities, tasks, oauth
+from routes import auth, profile, chat, universities, tasks, oauth, usage, dashboard
+from services.semantic_cache import answer_cache
+from services.ai_engine import completion_flights
+from services.admission import AdmissionRejected, llm_admission
+from services.resilience import resilience_stats
+from services.task_jobs import task_assist_queue
+from services.model_router import model_router
+from services.intent_classifier import intent_fast_path
+from services.catalog import catalog_store
+from services.catalog_search import search_index
+from services.prompt_context import prompt_cache
+from services.usage import usage_recorder, UsageQuotaExceeded
+from services.task_progress import backfill_task_progress
+from services.chat_sockets import chat_sockets
+from services.token_versions import token_versions
+from services.recommendation_cache import recommendation_cache
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Startup/Shutdown lifecycle
-    - Creates database tables on startup
+    - Creates database tables on startup, adds columns newer than an existing
+      table (and task progress counters for databases that predate them)
+    - Starts the background task-assistance workers, usage writer and
+      token revocation refresher
+    - Records the boot import report; BOOT_WARMUP preloads deferred SDKs
+      and the catalog in the background (the app is already serving)
     """
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns, Base.metadata)
+    try:
+        async with engine.begin() as conn:
+            await backfill_task_progress(conn)
+    except IntegrityError:
+        pass  # another worker backfilled concurrently
+    
+    await task_assist_queue.start()
+    await usage_recorder.start()
+    await token_versions.start()
+    
+    report = boot_profile.ready()
+    logger.info("boot ready", extra={
+        "ready_seconds": report["ready_seconds"],
+        "import_seconds": report.get("import_seconds"),
+        "slowest_imports": report.get("slowest_imports", [])[:5],
+    })
+    warmup_task = asyncio.create_task(warm_up(), name="boot-warmup") if BOOT_WARMUP else None
     
     yield
     
     # Cleanup (if needed)
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    await task_assist_queue.stop()
+    await usage_recorder.stop()  # flush buffered usage rows
+    await token_versions.stop()
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 # Initialize FastAPI app
@@ -58,8 +122,7 @@ if extra_origins:
         if origin and origin not in ALLOWED_ORIGINS:
             ALLOWED_ORIGINS.append(origin)
 
-# Debug log
-print(f"CORS Allowed Origins: {ALLOWED_ORIGINS}")
+logger.info("CORS allowed origins", extra={"origins": ALLOWED_ORIGINS})
 
 app.add_middleware(
     CORSMiddleware,
@@ -67,8 +130,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[WRITE_MARKER_HEADER],
 )
 
+# Incoming X-Request-ID values we propagate (anything else gets a fresh ID)
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+@app.middleware("http")
+async def request_lifecycle(request: Request, call_next):
+    """
+    Per-request bookkeeping in one middleware layer
+    - Binds a request ID (X-Request-ID, echoed back) to every log record
+    - Identifies the caller once (request.state.user_id) and reads their
+      write marker (request.state.last_write, from X-Last-Write)
+    - If the request committed row changes, returns a fresh X-Last-Write so
+      the client's next reads stay on the primary (on any worker) while the
+      replica catches up
+    - Logs method, path, status and duration (time to response start)
+    """
+    incoming = request.headers.get("x-request-id", "")
+    with request_context(incoming if _REQUEST_ID_PATTERN.match(incoming) else None):
+        started = time.perf_counter()
+        user_id = user_id_from_authorization(request.headers.get("authorization"))
+        request.state.user_id = user_id
+        request.state.last_write = parse_write_marker(request.headers.get(WRITE_MARKER_HEADER))
+        tracker, token = track_writes()
+        try:
+            response = await call_next(request)
+        except Exception:
+            logger.exception("request failed", extra={"method": request.method, "path": request.url.path,
+                                                      "user_id": user_id})
+            raise
+        finally:
+            stop_tracking_writes(token)
+        if tracker.wrote_at is not None:
+            response.headers[WRITE_MARKER_HEADER] = format_write_marker(tracker.wrote_at)
+        response.headers["X-Request-ID"] = current_request_id()
+        if LOG_REQUESTS:
+            logger.info("request", extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "user_id": user_id,
+            })
+        return response
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """LLM capacity exhausted - tell the client when to retry"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "AI Counsellor is busy. Please retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(UsageQuotaExceeded)
+async def usage_quota_exceeded_handler(request: Request, exc: UsageQuotaExceeded):
+    """Daily token quota spent - retry after the next UTC midnight"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Daily AI Counsellor limit reached. It resets at midnight UTC."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(profile.router)
@@ -76,6 +205,8 @@ app.include_router(chat.router)
 app.include_router(universities.router)
 app.include_router(tasks.router)
 app.include_router(oauth.router)
+app.include_router(usage.router)
+app.include_router(dashboard.router)
 
 
 @app.get("/")
@@ -96,3 +227,26 @@ async def health_check():
         "database": "connected",
         "ai_engine": "groq"
     }
+
+
+@app.get("/metrics")
+async def metrics():
+    """In-process performance counters (per worker)"""
+    return {
+        "semantic_cache": answer_cache.stats(),
+        "completion_single_flight": completion_flights.stats(),
+        "llm_admission": llm_admission.stats(),
+        "groq_resilience": resilience_stats(),
+        "task_assist_jobs": task_assist_queue.stats(),
+        "model_routing": model_router.stats(),
+        "intent_fast_path": intent_fast_path.stats(),
+        "catalog": catalog_store.stats(),
+        "catalog_search": search_index.stats(),
+        "system_prompt_cache": prompt_cache.stats(),
+        "llm_usage": usage_recorder.stats(),
+        "chat_sockets": chat_sockets.stats(),
+        "token_versions": token_versions.stats(),
+        "boot": boot_profile.stats(),
+        "logging": log_pipeline.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+    }
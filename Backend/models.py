@@ -2,7 +2,7 @@
 Database Models (SQLAlchemy ORM)
 The Neural Core: Optimized for 6GB RAM using SQLite
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 import enum
@@ -31,6 +31,14 @@ class TaskStatusEnum(str, enum.Enum):
     DONE = "done"
 
 
+class JobStatusEnum(str, enum.Enum):
+    """Background job lifecycle"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class MatchTierEnum(str, enum.Enum):
     """University match tiers"""
     SAFE = "Safe"
@@ -46,6 +54,8 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     full_name = Column(String, nullable=True)  # User's full name
+    # Bumped to revoke every access token issued so far (see services/token_versions.py)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -95,6 +105,11 @@ class University(Base):
     ranking = Column(Integer, nullable=True)
     location = Column(String, nullable=True)
     
+    # Bumped by every ORM/Core UPDATE; part of the catalog fingerprint (services/catalog.py),
+    # so raw-SQL edits must bump it too (or call invalidate_catalog())
+    row_version = Column(Integer, default=0, server_default="0", nullable=False,
+                         onupdate=text("row_version + 1"))
+    
     # Relationships
     shortlists = relationship("Shortlist", back_populates="university")
 
@@ -135,3 +150,51 @@ class Task(Base):
     
     # Relationships
     user = relationship("User", back_populates="tasks")
+
+
+class TaskProgress(Base):
+    """
+    Task counters per user and university, kept in step with every task write
+    university_id 0 holds the user's totals across all their tasks
+    """
+    __tablename__ = "task_progress"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    university_id = Column(Integer, primary_key=True, default=0)
+    
+    total = Column(Integer, default=0, nullable=False)
+    done = Column(Integer, default=0, nullable=False)
+
+
+class TaskAssistJob(Base):
+    """Background AI assistance generation - one persisted result per task"""
+    __tablename__ = "task_assist_jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    task_id = Column(Integer, ForeignKey("tasks.id"), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    status = Column(SQLEnum(JobStatusEnum), default=JobStatusEnum.QUEUED, nullable=False)
+    content = Column(Text, nullable=True)
+    error = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    opened_at = Column(DateTime, nullable=True)  # First time the student requested it
+
+
+class LLMUsage(Base):
+    """One row per upstream Groq completion (written in batches)"""
+    __tablename__ = "llm_usage"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    feature = Column(String(32), nullable=False)  # chat, task_assist
+    model = Column(String, nullable=False)
+    
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    latency_ms = Column(Integer, default=0, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
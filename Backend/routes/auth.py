@@ -2,22 +2,24 @@
 Authentication Routes
 POST /auth/signup - Register new user
 POST /auth/login - Authenticate and get JWT token
+POST /auth/revoke - Sign out everywhere (invalidate all issued tokens)
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import bcrypt
+from sqlalchemy import select, update
 
 from database import get_db
 from models import User, Profile
 from schemas import UserSignup, UserLogin, TokenResponse
-from dependencies import create_access_token
+from dependencies import TokenUser, create_user_token, get_token_user
+from services.token_versions import token_versions
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
+    import bcrypt  # deferred: only signup/login need it
     # Encode password to bytes, hash it, then decode back to string for storage
     password_bytes = password.encode('utf-8')
     salt = bcrypt.gensalt()
@@ -27,6 +29,7 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
+    import bcrypt
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
@@ -70,7 +73,7 @@ async def signup(user_data: UserSignup, db: AsyncSession = Depends(get_db)):
     await db.refresh(new_user)
     
     # Generate JWT token
-    access_token = create_access_token(data={"sub": str(new_user.id)})
+    access_token = create_user_token(new_user)
     
     return TokenResponse(
         access_token=access_token,
@@ -103,11 +106,45 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
             detail="Invalid email or password"
         )
     
-    # Generate JWT token (use str() for consistency with signup)
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Generate JWT token
+    access_token = create_user_token(user)
     
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
         user_id=user.id
     )
+
+
+@router.post("/revoke", response_model=TokenResponse)
+async def revoke_tokens(
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sign out everywhere
+    - Bumps the user's token_version: every token issued so far is rejected
+      (by this worker immediately, by others within TOKEN_VERSION_REFRESH_SECONDS)
+    - Returns a fresh token so the calling device stays signed in
+    """
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(token_version=User.token_version + 1)
+        .returning(User)
+        .execution_options(synchronize_session=False)
+    )
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    await db.commit()
+    token_versions.note(user.id, user.token_version)
+    
+    return TokenResponse(
+        access_token=create_user_token(user),
+        token_type="bearer",
+        user_id=user.id
+    )
@@ -1,24 +1,56 @@
 """
 Chat Routes
 POST /chat/message - Send message to AI counsellor
+WS /chat/ws - Streaming chat over one authenticated connection
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from database import get_db
-from models import User, Profile
-from schemas import ChatMessage, ChatResponse
-from dependencies import get_current_user
-from services.ai_engine import get_ai_response
+from database import get_db, AsyncSessionLocal, parse_write_marker
+from models import Profile
+from schemas import ChatMessage, ChatResponse, UniversityCard
+from dependencies import TokenUser, get_token_user, resolve_token_user
+from services.admission import AdmissionRejected
+from services.ai_engine import get_ai_response, stream_ai_response
+from services.catalog import get_catalog
+from services.catalog_matcher import get_catalog_matcher
+from services.chat_sockets import (
+    chat_sockets, WS_HEARTBEAT_SECONDS, WS_AUTH_TIMEOUT_SECONDS, WS_PROFILE_TTL_SECONDS, WS_HISTORY_MESSAGES
+)
+from services.usage import usage_recorder, UsageQuotaExceeded
+from services.log_pipeline import request_context
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
+def profile_context(profile: Profile) -> Dict[str, any]:
+    """Profile fields the AI prompt is built from"""
+    return {
+        "gpa": profile.gpa,
+        "budget": profile.budget,
+        "degree_level": profile.degree_level,
+        "target_country": profile.target_country,
+        "ielts_score": profile.ielts_score,
+        "gre_score": profile.gre_score
+    }
+
+
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
     chat_data: ChatMessage,
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -26,7 +58,12 @@ async def send_message(
     - Retrieves user's profile for context
     - Injects profile data into AI prompt
     - Returns AI response with optional UI card triggers
+    - Every catalog university mentioned is returned as a structured card
+    - Rejected with 429 once the user's daily token quota is spent
     """
+    # Daily token quota (in-memory counter, raises UsageQuotaExceeded -> 429)
+    await usage_recorder.check_quota(current_user.id)
+    
     # Fetch user's profile
     result = await db.execute(
         select(Profile).where(Profile.user_id == current_user.id)
@@ -40,23 +77,218 @@ async def send_message(
         )
     
     # Prepare profile context for AI
-    user_profile = {
-        "gpa": profile.gpa,
-        "budget": profile.budget,
-        "degree_level": profile.degree_level,
-        "target_country": profile.target_country,
-        "ielts_score": profile.ielts_score,
-        "gre_score": profile.gre_score
-    }
+    user_profile = profile_context(profile)
     
-    # Get AI response
+    # Get AI response (prompt lists only catalog universities relevant to this profile)
     response_text, render_cards = await get_ai_response(
         message=chat_data.message,
         history=chat_data.history,
-        user_profile=user_profile
+        user_profile=user_profile,
+        user_id=current_user.id,
+        catalog=await get_catalog(db)
     )
     
+    # Single pass over the response (plus any explicit tags) against the catalog
+    matcher = await get_catalog_matcher(db)
+    mentioned = matcher.find(" \n".join(render_cards + [response_text]))
+    cards = [UniversityCard(id=uni.id, name=uni.name, country=uni.country) for uni in mentioned]
+    
     return ChatResponse(
         response=response_text,
-        render_cards=render_cards if render_cards else None
+        render_cards=render_cards if render_cards else None,
+        cards=cards if cards else None
     )
+
+
+class ChatSocketSession:
+    """
+    State of one /chat/ws connection
+    - Profile context is loaded once and reloaded only when a message frame's
+      last_write (the client's X-Last-Write) is newer than the loaded copy,
+      or after WS_PROFILE_TTL_SECONDS
+    - Conversation history lives server-side (last WS_HISTORY_MESSAGES)
+    """
+    
+    def __init__(self, websocket: WebSocket, user_id: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.profile: Optional[Dict[str, any]] = None
+        self.profile_loaded_at = 0.0
+        self.history = deque(maxlen=WS_HISTORY_MESSAGES)
+        self.last_seen = time.monotonic()
+        self._send_lock = asyncio.Lock()
+    
+    async def send(self, payload: dict):
+        # Reply stream, heartbeat and control frames share the socket
+        async with self._send_lock:
+            await self.websocket.send_json(payload)
+    
+    async def ensure_profile(self, last_write: Optional[float] = None) -> bool:
+        # Wall clock, to compare with write markers issued by any worker
+        stale = (
+            self.profile is None
+            or time.time() - self.profile_loaded_at > WS_PROFILE_TTL_SECONDS
+            or (last_write is not None and last_write >= self.profile_loaded_at)
+        )
+        if stale:
+            loaded_at = time.time()
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(Profile).where(Profile.user_id == self.user_id))
+                profile = result.scalar_one_or_none()
+            self.profile = profile_context(profile) if profile else None
+            self.profile_loaded_at = loaded_at
+        return self.profile is not None
+
+
+async def _authenticate(websocket: WebSocket) -> Optional[int]:
+    """User ID from ?token= or a first {"type": "auth", "token": ...} frame"""
+    token = websocket.query_params.get("token")
+    if not token:
+        try:
+            frame = await asyncio.wait_for(websocket.receive_json(), timeout=WS_AUTH_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, ValueError):
+            return None
+        if not isinstance(frame, dict) or frame.get("type") != "auth":
+            return None
+        token = frame.get("token")
+    try:
+        return (await resolve_token_user(str(token))).id
+    except HTTPException:
+        return None
+
+
+async def _reply(session: ChatSocketSession, message_id, message: str, last_write: Optional[float] = None):
+    """Stream one answer; cancelled when a newer message supersedes it"""
+    try:
+        await usage_recorder.check_quota(session.user_id)
+        if not await session.ensure_profile(last_write):
+            await session.send({"type": "error", "id": message_id, "status": 404,
+                                "detail": "Profile not found. Complete onboarding first."})
+            return
+        
+        render_cards, parts = [], []
+        async with AsyncSessionLocal() as db:
+            catalog = await get_catalog(db)
+            async for delta in stream_ai_response(
+                message, list(session.history), session.profile, render_cards,
+                user_id=session.user_id, catalog=catalog
+            ):
+                parts.append(delta)
+                await session.send({"type": "delta", "id": message_id, "text": delta})
+            matcher = await get_catalog_matcher(db)
+        
+        response_text = "".join(parts).strip()
+        mentioned = matcher.find(" \n".join(render_cards + [response_text]))
+        session.history.append({"role": "user", "content": message})
+        session.history.append({"role": "assistant", "content": response_text})
+        await session.send({
+            "type": "done",
+            "id": message_id,
+            "response": response_text,
+            "render_cards": render_cards or None,
+            "cards": [UniversityCard(id=u.id, name=u.name, country=u.country).model_dump() for u in mentioned] or None,
+        })
+    # Same status and retry hint as the REST handlers (429 + Retry-After)
+    except UsageQuotaExceeded as e:
+        await session.send({"type": "error", "id": message_id, "status": 429, "retry_after": e.retry_after,
+                            "detail": "Daily AI Counsellor limit reached. It resets at midnight UTC."})
+    except AdmissionRejected as e:
+        await session.send({"type": "error", "id": message_id, "status": 429, "retry_after": e.retry_after,
+                            "detail": "AI Counsellor is busy. Please retry shortly."})
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("chat socket reply error", extra={"user_id": session.user_id, "message_id": message_id})
+        with suppress(Exception):
+            await session.send({"type": "error", "id": message_id, "status": 500,
+                                "detail": "The reply was interrupted. Please try again."})
+
+
+async def _heartbeat(session: ChatSocketSession):
+    """Ping every WS_HEARTBEAT_SECONDS; close connections silent for two intervals"""
+    while True:
+        await asyncio.sleep(WS_HEARTBEAT_SECONDS)
+        if time.monotonic() - session.last_seen > 2 * WS_HEARTBEAT_SECONDS:
+            chat_sockets.timeouts += 1
+            await session.websocket.close(code=1001, reason="Heartbeat timeout")
+            return
+        await session.send({"type": "ping"})
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket):
+    """
+    Streaming chat channel
+    - Authenticates once per connection (?token= or a first auth frame) and
+      keeps profile context and history in memory
+    - Client frames: {"type": "message", "id", "message", "last_write"?}, {"type": "cancel"},
+      {"type": "reset"}, {"type": "pong"}
+    - Server frames: ready, delta, done, cancelled, error, ping
+    - A new message cancels the reply still streaming (and its upstream call)
+    """
+    await websocket.accept()
+    if not chat_sockets.try_open():
+        await websocket.close(code=1013, reason="Too many connections")
+        return
+    
+    current: Optional[asyncio.Task] = None
+    current_id = None
+    heartbeat: Optional[asyncio.Task] = None
+    
+    async def cancel_current():
+        nonlocal current
+        if current is not None and not current.done():
+            current.cancel()
+            with suppress(asyncio.CancelledError):
+                await current
+            chat_sockets.cancelled += 1
+            await session.send({"type": "cancelled", "id": current_id})
+        current = None
+    
+    # One request ID per connection (its reply and heartbeat tasks inherit it)
+    with request_context():
+        try:
+            user_id = await _authenticate(websocket)
+            if user_id is None:
+                await websocket.close(code=1008, reason="Could not validate credentials")
+                return
+            session = ChatSocketSession(websocket, user_id)
+            await session.send({"type": "ready", "user_id": user_id})
+            heartbeat = asyncio.create_task(_heartbeat(session))
+        
+            while True:
+                raw = await websocket.receive_text()
+                session.last_seen = time.monotonic()
+                try:
+                    frame = json.loads(raw)
+                except ValueError:
+                    frame = None
+                kind = frame.get("type") if isinstance(frame, dict) else None
+            
+                if kind == "message":
+                    try:
+                        chat_message = ChatMessage(message=frame.get("message"))
+                    except ValidationError:
+                        await session.send({"type": "error", "id": frame.get("id"), "status": 422,
+                                            "detail": "message must be 1-2000 characters"})
+                        continue
+                    await cancel_current()
+                    chat_sockets.messages += 1
+                    current_id = frame.get("id")
+                    current = asyncio.create_task(_reply(
+                        session, current_id, chat_message.message, parse_write_marker(frame.get("last_write"))
+                    ))
+                elif kind == "cancel":
+                    await cancel_current()
+                elif kind == "reset":
+                    await cancel_current()
+                    session.history.clear()
+                elif kind != "pong":
+                    await session.send({"type": "error", "status": 400, "detail": f"Unknown frame type: {kind!r}"})
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # client went away mid-send
+        finally:
+            for task in (current, heartbeat):
+                if task is not None:
+                    task.cancel()
+            chat_sockets.close()
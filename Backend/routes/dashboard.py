@@ -0,0 +1,56 @@
+"""
+Dashboard Route
+GET /dashboard - Profile, tasks, shortlist and recommendations in one request
+"""
+import asyncio
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select
+
+from database import get_db, read_session_factory
+from models import Profile
+from schemas import DashboardResponse
+from dependencies import TokenUser, get_token_user
+from routes.profile import profile_payload
+from routes.tasks import load_task_list
+from routes.universities import load_recommendations, load_shortlist
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+async def _load(session_factory: async_sessionmaker, loader, *args):
+    """Run a loader on its own session (one AsyncSession can't run queries concurrently)"""
+    async with session_factory() as session:
+        return await loader(session, *args)
+
+
+@router.get("/", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Combined dashboard payload
+    - Authenticates once (vs. once per call for /profile/, /tasks/,
+      /universities/shortlist and /universities/recommend)
+    - Profile is read on the auth session, the other three concurrently
+      on their own (replica when configured) sessions
+    """
+    session_factory = read_session_factory(request.state.last_write)
+    profile_result, task_list, shortlist, recommendations = await asyncio.gather(
+        db.execute(select(Profile).where(Profile.user_id == current_user.id)),
+        _load(session_factory, load_task_list, current_user.id),
+        _load(session_factory, load_shortlist, current_user.id),
+        _load(session_factory, load_recommendations),
+    )
+    profile = profile_result.scalar_one_or_none()
+    
+    return DashboardResponse(
+        profile=profile_payload(profile, current_user) if profile else None,
+        tasks=task_list.tasks,
+        all_cleared=task_list.all_cleared,
+        shortlist=shortlist,
+        recommendations=recommendations,
+    )
@@ -6,14 +6,17 @@ from fastapi import APIRouter, HTTPException, status, Query, Depends
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+import logging
 import os
 import secrets
-import httpx
+import time
 from urllib.parse import urlencode, quote
 
-from database import get_db
+from database import get_db, format_write_marker
 from models import User, Profile
-from dependencies import create_access_token
+from dependencies import create_user_token
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/oauth", tags=["OAuth"])
 
@@ -71,6 +74,7 @@ async def google_callback(
     
     try:
         # Exchange code for tokens
+        import httpx  # deferred: only the OAuth callbacks need it
         async with httpx.AsyncClient() as client:
             token_response = await client.post(
                 "https://oauth2.googleapis.com/token",
@@ -110,6 +114,7 @@ async def google_callback(
         user = result.scalar_one_or_none()
         
         is_new_user = False
+        write_marker = ""
         if not user:
             # Create new user (no password for OAuth users)
             is_new_user = True
@@ -125,6 +130,8 @@ async def google_callback(
             profile = Profile(user_id=user.id, current_stage=1)
             db.add(profile)
             await db.commit()
+            # The browser can't read headers off a redirect - pass the write marker in the URL
+            write_marker = f"&last_write={format_write_marker(time.time())}"
         else:
             # Check if existing user has completed onboarding
             profile_result = await db.execute(select(Profile).where(Profile.user_id == user.id))
@@ -135,14 +142,14 @@ async def google_callback(
                 is_new_user = True  # Existing user but hasn't completed onboarding
         
         # Generate JWT token
-        jwt_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+        jwt_token = create_user_token(user)
         
         # Redirect to frontend with token - new users go to onboarding
         redirect_path = "onboarding" if is_new_user else "dashboard"
-        return RedirectResponse(url=f"{FRONTEND_URL}/auth?token={jwt_token}&oauth=google&redirect={redirect_path}")
+        return RedirectResponse(url=f"{FRONTEND_URL}/auth?token={jwt_token}&oauth=google&redirect={redirect_path}{write_marker}")
         
-    except Exception as e:
-        print(f"Google OAuth error: {e}")
+    except Exception:
+        logger.exception("Google OAuth error")
         return RedirectResponse(url=f"{FRONTEND_URL}/auth?error=oauth_failed")
 
 
@@ -186,6 +193,7 @@ async def github_callback(
         return RedirectResponse(url=f"{FRONTEND_URL}/auth?error=no_code")
     
     try:
+        import httpx  # deferred: only the OAuth callbacks need it
         async with httpx.AsyncClient() as client:
             # Exchange code for access token
             token_response = await client.post(
@@ -248,6 +256,7 @@ async def github_callback(
         user = result.scalar_one_or_none()
         
         is_new_user = False
+        write_marker = ""
         if not user:
             # Create new user
             is_new_user = True
@@ -263,6 +272,8 @@ async def github_callback(
             profile = Profile(user_id=user.id, current_stage=1)
             db.add(profile)
             await db.commit()
+            # The browser can't read headers off a redirect - pass the write marker in the URL
+            write_marker = f"&last_write={format_write_marker(time.time())}"
         else:
             # Check if existing user has completed onboarding
             profile_result = await db.execute(select(Profile).where(Profile.user_id == user.id))
@@ -273,12 +284,12 @@ async def github_callback(
                 is_new_user = True  # Existing user but hasn't completed onboarding
         
         # Generate JWT token
-        jwt_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+        jwt_token = create_user_token(user)
         
         # Redirect to frontend with token - new users go to onboarding
         redirect_path = "onboarding" if is_new_user else "dashboard"
-        return RedirectResponse(url=f"{FRONTEND_URL}/auth?token={jwt_token}&oauth=github&redirect={redirect_path}")
+        return RedirectResponse(url=f"{FRONTEND_URL}/auth?token={jwt_token}&oauth=github&redirect={redirect_path}{write_marker}")
         
-    except Exception as e:
-        print(f"GitHub OAuth error: {e}")
+    except Exception:
+        logger.exception("GitHub OAuth error")
         return RedirectResponse(url=f"{FRONTEND_URL}/auth?error=oauth_failed")
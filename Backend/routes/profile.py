@@ -5,43 +5,76 @@ GET /profile - Get current user's profile
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, case, and_
 
-from database import get_db
-from models import User, Profile
+from database import get_db, get_read_db
+from models import Profile
 from schemas import ProfileUpdate, ProfileResponse
-from dependencies import get_current_user
+from dependencies import TokenUser, get_token_user
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
 
-def calculate_stage(profile: Profile) -> int:
+# Fields that must be filled to leave Onboarding
+ESSENTIAL_FIELDS = ("gpa", "degree_level", "budget", "target_country")
+
+
+def stage_expression(update_data: dict):
     """
-    Auto-calculate user's journey stage based on profile completeness
+    Auto-calculate user's journey stage based on profile completeness,
+    as a value for the same UPDATE that writes `update_data`
     Logic:
     - Stage 1 (Onboarding): Profile incomplete
     - Stage 2 (Discovery): Profile complete, no shortlist
     - Stage 3 (Shortlist): Has shortlisted universities
     - Stage 4 (Applications): Has locked universities (handled elsewhere)
+    Fields being written are known here; the rest are checked in SQL
+    (SET expressions see the row's pre-update values)
     """
-    # Check if essential fields are filled
-    essential_fields = [
-        profile.gpa,
-        profile.degree_level,
-        profile.budget,
-        profile.target_country
-    ]
+    if any(field in update_data and update_data[field] is None for field in ESSENTIAL_FIELDS):
+        return 1  # Stay in Onboarding
     
-    if all(field is not None for field in essential_fields):
+    unchanged = [getattr(Profile, field).is_not(None) for field in ESSENTIAL_FIELDS if field not in update_data]
+    if not unchanged:
         return 2  # Move to Discovery stage
+    return case((and_(*unchanged), 2), else_=1)
+
+
+def profile_payload(profile: Profile, user: TokenUser) -> dict:
+    """Profile fields plus the user's display name and email"""
+    # Smart name logic: use email prefix if full_name is missing
+    # e.g., "john.doe@email.com" -> "John Doe"
+    display_name = None
+    if hasattr(user, 'full_name') and user.full_name:
+        display_name = user.full_name
     else:
-        return 1  # Stay in Onboarding
+        # Extract name from email (before @)
+        email_prefix = user.email.split('@')[0]
+        # Convert "john.doe" or "john_doe" to "John Doe"
+        display_name = email_prefix.replace('.', ' ').replace('_', ' ').title()
+    
+    # Convert profile to dict and add user info
+    profile_dict = {
+        "id": profile.id,
+        "user_id": profile.user_id,
+        "gpa": profile.gpa,
+        "degree_level": profile.degree_level,
+        "budget": profile.budget,
+        "target_country": profile.target_country,
+        "ielts_score": profile.ielts_score,
+        "gre_score": profile.gre_score,
+        "current_stage": profile.current_stage,
+        "email": user.email,
+        "full_name": display_name
+    }
+    
+    return profile_dict
 
 
 @router.post("/update", response_model=ProfileResponse)
 async def update_profile(
     profile_data: ProfileUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -49,10 +82,17 @@ async def update_profile(
     - Updates all provided fields
     - Auto-calculates current_stage
     - Returns updated profile
+    - One UPDATE ... RETURNING round trip (ownership via user_id)
     """
-    # Fetch user's profile
+    # Update fields (only if provided)
+    update_data = profile_data.model_dump(exclude_unset=True)
+    
     result = await db.execute(
-        select(Profile).where(Profile.user_id == current_user.id)
+        update(Profile)
+        .where(Profile.user_id == current_user.id)
+        .values(**update_data, current_stage=stage_expression(update_data))
+        .returning(Profile)
+        .execution_options(synchronize_session=False)
     )
     profile = result.scalar_one_or_none()
     
@@ -62,24 +102,15 @@ async def update_profile(
             detail="Profile not found"
         )
     
-    # Update fields (only if provided)
-    update_data = profile_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(profile, field, value)
-    
-    # Auto-calculate stage
-    profile.current_stage = calculate_stage(profile)
-    
     await db.commit()
-    await db.refresh(profile)
     
     return profile
 
 
 @router.get("/", response_model=ProfileResponse)
 async def get_profile(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current user's profile with user information
@@ -95,30 +126,4 @@ async def get_profile(
             detail="Profile not found"
         )
     
-    # Smart name logic: use email prefix if full_name is missing
-    # e.g., "john.doe@email.com" -> "John Doe"
-    display_name = None
-    if hasattr(current_user, 'full_name') and current_user.full_name:
-        display_name = current_user.full_name
-    else:
-        # Extract name from email (before @)
-        email_prefix = current_user.email.split('@')[0]
-        # Convert "john.doe" or "john_doe" to "John Doe"
-        display_name = email_prefix.replace('.', ' ').replace('_', ' ').title()
-    
-    # Convert profile to dict and add user info
-    profile_dict = {
-        "id": profile.id,
-        "user_id": profile.user_id,
-        "gpa": profile.gpa,
-        "degree_level": profile.degree_level,
-        "budget": profile.budget,
-        "target_country": profile.target_country,
-        "ielts_score": profile.ielts_score,
-        "gre_score": profile.gre_score,
-        "current_stage": profile.current_stage,
-        "email": current_user.email,
-        "full_name": display_name
-    }
-    
-    return profile_dict
+    return profile_payload(profile, current_user)
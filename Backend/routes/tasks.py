@@ -1,46 +1,138 @@
 """
 Task Management Routes
 GET /tasks - Get all tasks for current user
+GET /tasks/progress - Task completion counters (overall and per university)
+PATCH /tasks/bulk - Update the status of many tasks in one statement
 PATCH /tasks/{id} - Update task status
-POST /tasks/assist - Get AI assistance for a task
+POST /tasks/assist - Enqueue AI assistance for a task
+GET /tasks/assist/{job_id} - Poll an assistance job
+GET /tasks/assist/{job_id}/events - Stream assistance job status (SSE)
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from typing import List
 
-from database import get_db
-from models import User, Task, TaskStatusEnum, Profile
-from schemas import TaskResponse, TaskUpdate, TaskListResponse, TaskAssistRequest, TaskAssistResponse
-from dependencies import get_current_user
-from services.ai_engine import generate_task_assistance
+from database import get_db, get_read_db, AsyncSessionLocal
+from models import Task, TaskProgress, TaskAssistJob, JobStatusEnum
+from schemas import (
+    TaskResponse, TaskUpdate, TaskBulkUpdate, TaskListResponse, TaskProgressResponse, UniversityTaskProgress,
+    TaskAssistRequest, TaskAssistJobResponse
+)
+from dependencies import TokenUser, get_token_user
+from services.task_jobs import task_assist_queue, JobQueueFull, PRIORITY_INTERACTIVE
+from services.task_progress import ALL_TASKS, record_status_changes, load_totals, all_cleared, percent
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+# How often an SSE stream re-checks a job it cannot await locally
+SSE_POLL_SECONDS = 3.0
+
+
+async def load_task_list(db: AsyncSession, user_id: int) -> TaskListResponse:
+    """User's tasks ordered by due_date, with the gamification flag (all_cleared)"""
+    result = await db.execute(
+        select(Task)
+        .where(Task.user_id == user_id)
+        .order_by(Task.due_date.asc().nullslast(), Task.created_at.asc())
+    )
+    tasks = result.scalars().all()
+    
+    # Check if all tasks are completed (Gamification) - from the counters
+    total, done = await load_totals(db, user_id)
+    
+    return TaskListResponse(
+        tasks=[TaskResponse.model_validate(task) for task in tasks],
+        all_cleared=all_cleared(total, done)
+    )
+
 
 @router.get("/", response_model=TaskListResponse)
 async def get_tasks(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all tasks for current user
     - Ordered by due_date
     - Includes gamification flag (all_cleared)
     """
+    return await load_task_list(db, current_user.id)
+
+
+@router.get("/progress", response_model=TaskProgressResponse)
+async def get_task_progress(
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Task completion for progress bars
+    - Read from the task_progress counters, never from the task rows
+    """
     result = await db.execute(
-        select(Task)
-        .where(Task.user_id == current_user.id)
-        .order_by(Task.due_date.asc().nullslast(), Task.created_at.asc())
+        select(TaskProgress).where(TaskProgress.user_id == current_user.id).order_by(TaskProgress.university_id)
     )
-    tasks = result.scalars().all()
+    total, done, universities = 0, 0, []
+    for row in result.scalars().all():
+        if row.university_id == ALL_TASKS:
+            total, done = row.total, row.done
+        else:
+            universities.append(UniversityTaskProgress(
+                university_id=row.university_id,
+                total=row.total,
+                done=row.done,
+                percent=percent(row.total, row.done)
+            ))
     
-    # Check if all tasks are completed (Gamification)
-    all_cleared = len(tasks) > 0 and all(task.status == TaskStatusEnum.DONE for task in tasks)
+    return TaskProgressResponse(
+        total=total,
+        done=done,
+        percent=percent(total, done),
+        all_cleared=all_cleared(total, done),
+        universities=universities
+    )
+
+
+# Declared before /{task_id} so "bulk" is never parsed as a task ID
+@router.patch("/bulk", response_model=TaskListResponse)
+async def bulk_update_tasks(
+    bulk_data: TaskBulkUpdate,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update the status of many tasks in one round trip
+    - Single UPDATE ... WHERE id IN (...) AND user_id = ... RETURNING
+    - IDs that don't exist, belong to another user or already have the
+      status are left alone
+    - Progress counters move in the same transaction
+    - Returns only the tasks whose status changed (the RETURNING rows), with
+      all_cleared from the updated counters - no extra SELECTs
+    """
+    result = await db.execute(
+        update(Task)
+        .where(
+            Task.id.in_(set(bulk_data.task_ids)),
+            Task.user_id == current_user.id,
+            Task.status != bulk_data.status
+        )
+        .values(status=bulk_data.status)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    changed = result.scalars().all()
+    totals = await record_status_changes(
+        db, current_user.id, [(task.university_id, bulk_data.status) for task in changed]
+    )
+    if totals is None:
+        # Nothing changed - the counters weren't touched, read them once
+        totals = await load_totals(db, current_user.id)
+    await db.commit()
     
     return TaskListResponse(
-        tasks=[TaskResponse.model_validate(task) for task in tasks],
-        all_cleared=all_cleared
+        tasks=[TaskResponse.model_validate(task) for task in changed],
+        all_cleared=all_cleared(*totals)
     )
 
 
@@ -48,44 +140,58 @@ async def get_tasks(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Update task status (toggle between pending/done)
+    - UPDATE ... RETURNING (ownership via user_id) plus the progress
+      counter update, in one transaction
+    - Only a real status flip moves the counters
     """
     result = await db.execute(
-        select(Task).where(
+        update(Task)
+        .where(
             Task.id == task_id,
-            Task.user_id == current_user.id
+            Task.user_id == current_user.id,
+            Task.status != task_data.status
         )
+        .values(status=task_data.status)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
     )
     task = result.scalar_one_or_none()
     
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
+    if task:
+        await record_status_changes(db, current_user.id, [(task.university_id, task_data.status)])
+    else:
+        # Already in that status, or not this user's task
+        result = await db.execute(
+            select(Task).where(Task.id == task_id, Task.user_id == current_user.id)
         )
+        task = result.scalar_one_or_none()
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
     
-    # Update status
-    task.status = task_data.status
     await db.commit()
-    await db.refresh(task)
     
     return task
 
 
-@router.post("/assist", response_model=TaskAssistResponse)
+@router.post("/assist", response_model=TaskAssistJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def get_task_assistance(
     assist_request: TaskAssistRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get AI assistance for a specific task
-    - Generates templates/guidance based on task title
-    - Uses user profile for personalization
+    Request AI assistance for a specific task
+    - Enqueues a background generation and returns the job immediately
+    - One job per task: repeated requests return the same job/result
+    - Poll GET /tasks/assist/{job_id} or stream /tasks/assist/{job_id}/events
     """
     # Fetch task
     result = await db.execute(
@@ -102,32 +208,84 @@ async def get_task_assistance(
             detail="Task not found"
         )
     
-    # Fetch user profile
+    try:
+        job = await task_assist_queue.enqueue(db, task, priority=PRIORITY_INTERACTIVE)
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Assistance queue is full. Please try again shortly.",
+            headers={"Retry-After": "30"}
+        )
+    
+    return TaskAssistJobResponse.model_validate(job)
+
+
+async def _get_user_job(job_id: str, user_id: int, db: AsyncSession) -> TaskAssistJob:
     result = await db.execute(
-        select(Profile).where(Profile.user_id == current_user.id)
+        select(TaskAssistJob).where(
+            TaskAssistJob.id == job_id,
+            TaskAssistJob.user_id == user_id
+        )
     )
-    profile = result.scalar_one_or_none()
+    job = result.scalar_one_or_none()
     
-    if not profile:
+    if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profile not found"
+            detail="Job not found"
         )
     
-    # Prepare profile context
-    user_profile = {
-        "gpa": profile.gpa,
-        "budget": profile.budget,
-        "degree_level": profile.degree_level,
-        "target_country": profile.target_country,
-        "ielts_score": profile.ielts_score,
-        "gre_score": profile.gre_score
-    }
+    return job
+
+
+@router.get("/assist/{job_id}", response_model=TaskAssistJobResponse)
+async def get_task_assistance_job(
+    job_id: str,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Poll a task assistance job
+    """
+    job = await _get_user_job(job_id, current_user.id, db)
+    return TaskAssistJobResponse.model_validate(job)
+
+
+@router.get("/assist/{job_id}/events")
+async def stream_task_assistance_job(
+    job_id: str,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Server-Sent Events stream for a task assistance job
+    - Emits a "status" event on every change, ends after done/failed
+    - Sends keep-alive comments while waiting
+    """
+    job = await _get_user_job(job_id, current_user.id, db)
     
-    # Generate AI assistance
-    content = await generate_task_assistance(
-        task_title=task.title,
-        user_profile=user_profile
-    )
+    async def event_stream():
+        last_status = None
+        current = job
+        while True:
+            if current.status != last_status:
+                last_status = current.status
+                payload = TaskAssistJobResponse.model_validate(current).model_dump_json()
+                yield f"event: status\ndata: {payload}\n\n"
+            if current.status in (JobStatusEnum.DONE, JobStatusEnum.FAILED):
+                return
+            
+            # Wake on local completion, otherwise re-check periodically
+            # (the job may be running on another worker process)
+            if not await task_assist_queue.wait(job_id, timeout=SSE_POLL_SECONDS):
+                yield ": keep-alive\n\n"
+            async with AsyncSessionLocal() as session:
+                current = await session.get(TaskAssistJob, job_id)
+            if current is None:
+                return
     
-    return TaskAssistResponse(content=content)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,70 +1,80 @@
 """
 University Routes
 GET /universities/recommend - Get personalized recommendations
+GET /universities/search - Typo-tolerant search by name, alias or location
+GET /universities/facets - Counts per country/tier/tuition/ranking band for filters
 POST /universities/lock/{id} - Lock a university for application
 GET /universities/seed - Seed database with dummy data (Hackathon only)
 GET /universities/shortlist - Get user's shortlisted universities
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
 from typing import List
 
-from database import get_db
-from models import User, Profile, University, Shortlist, Task, TaskStatusEnum
-from schemas import UniversityWithMatch, ShortlistResponse
-from dependencies import get_current_user
+from database import get_db, get_read_db, AsyncSessionLocal
+from models import Profile, University, Shortlist, Task, TaskStatusEnum
+from schemas import UniversityWithMatch, UniversitySearchResult, FacetCountsResponse, ShortlistResponse
+from dependencies import TokenUser, get_token_user
+from services.task_jobs import task_assist_queue, TASK_ASSIST_WARMUP
+from services.catalog import get_catalog, invalidate_catalog, calculate_match_tier
+from services.catalog_search import get_search_index, SEARCH_CANDIDATES
+from services.catalog_facets import get_facet_index
+from services.task_progress import record_tasks_created
+from services.recommendation_cache import recommendation_cache
 
 router = APIRouter(prefix="/universities", tags=["Universities"])
 
+# The 20 dummy universities behind /universities/seed
+SEED_UNIVERSITIES = [
+    # USA - High Cost
+    {"name": "Stanford University", "country": "USA", "acceptance_rate": 4.3, "tuition_fee": 55473, "ranking": 3, "location": "California"},
+    {"name": "MIT", "country": "USA", "acceptance_rate": 6.7, "tuition_fee": 53790, "ranking": 1, "location": "Massachusetts"},
+    {"name": "Harvard University", "country": "USA", "acceptance_rate": 5.2, "tuition_fee": 54002, "ranking": 2, "location": "Massachusetts"},
+    {"name": "Princeton University", "country": "USA", "acceptance_rate": 5.8, "tuition_fee": 53890, "ranking": 12, "location": "New Jersey"},
+    
+    # USA - Mid Cost
+    {"name": "University of California, Berkeley", "country": "USA", "acceptance_rate": 17.5, "tuition_fee": 43176, "ranking": 4, "location": "California"},
+    {"name": "University of Michigan", "country": "USA", "acceptance_rate": 26.0, "tuition_fee": 49350, "ranking": 21, "location": "Michigan"},
+    {"name": "University of Texas at Austin", "country": "USA", "acceptance_rate": 32.0, "tuition_fee": 38326, "ranking": 38, "location": "Texas"},
+    {"name": "Georgia Institute of Technology", "country": "USA", "acceptance_rate": 23.0, "tuition_fee": 33794, "ranking": 44, "location": "Georgia"},
+    
+    # USA - Lower Cost
+    {"name": "Arizona State University", "country": "USA", "acceptance_rate": 88.0, "tuition_fee": 28800, "ranking": 103, "location": "Arizona"},
+    {"name": "University of Illinois Chicago", "country": "USA", "acceptance_rate": 73.0, "tuition_fee": 27672, "ranking": 82, "location": "Illinois"},
+    
+    # UK - High Cost
+    {"name": "University of Oxford", "country": "UK", "acceptance_rate": 17.5, "tuition_fee": 35000, "ranking": 5, "location": "Oxford"},
+    {"name": "University of Cambridge", "country": "UK", "acceptance_rate": 21.0, "tuition_fee": 34000, "ranking": 6, "location": "Cambridge"},
+    {"name": "Imperial College London", "country": "UK", "acceptance_rate": 14.3, "tuition_fee": 36000, "ranking": 7, "location": "London"},
+    
+    # UK - Mid Cost
+    {"name": "University of Edinburgh", "country": "UK", "acceptance_rate": 46.0, "tuition_fee": 26000, "ranking": 22, "location": "Edinburgh"},
+    {"name": "King's College London", "country": "UK", "acceptance_rate": 38.0, "tuition_fee": 28000, "ranking": 35, "location": "London"},
+    {"name": "University of Manchester", "country": "UK", "acceptance_rate": 59.0, "tuition_fee": 24000, "ranking": 27, "location": "Manchester"},
+    
+    # Canada
+    {"name": "University of Toronto", "country": "Canada", "acceptance_rate": 43.0, "tuition_fee": 58160, "ranking": 18, "location": "Toronto"},
+    {"name": "University of British Columbia", "country": "Canada", "acceptance_rate": 52.0, "tuition_fee": 40000, "ranking": 34, "location": "Vancouver"},
+    
+    # Germany (Low Cost)
+    {"name": "Technical University of Munich", "country": "Germany", "acceptance_rate": 8.0, "tuition_fee": 3000, "ranking": 50, "location": "Munich"},
+    {"name": "University of Heidelberg", "country": "Germany", "acceptance_rate": 20.0, "tuition_fee": 3500, "ranking": 65, "location": "Heidelberg"},
+]
+
 
 async def seed_universities_data(db: AsyncSession):
     """
     Seed database with 20 dummy universities
     CRITICAL for Hackathon: No external API available
     """
-    universities = [
-        # USA - High Cost
-        {"name": "Stanford University", "country": "USA", "acceptance_rate": 4.3, "tuition_fee": 55473, "ranking": 3, "location": "California"},
-        {"name": "MIT", "country": "USA", "acceptance_rate": 6.7, "tuition_fee": 53790, "ranking": 1, "location": "Massachusetts"},
-        {"name": "Harvard University", "country": "USA", "acceptance_rate": 5.2, "tuition_fee": 54002, "ranking": 2, "location": "Massachusetts"},
-        {"name": "Princeton University", "country": "USA", "acceptance_rate": 5.8, "tuition_fee": 53890, "ranking": 12, "location": "New Jersey"},
-        
-        # USA - Mid Cost
-        {"name": "University of California, Berkeley", "country": "USA", "acceptance_rate": 17.5, "tuition_fee": 43176, "ranking": 4, "location": "California"},
-        {"name": "University of Michigan", "country": "USA", "acceptance_rate": 26.0, "tuition_fee": 49350, "ranking": 21, "location": "Michigan"},
-        {"name": "University of Texas at Austin", "country": "USA", "acceptance_rate": 32.0, "tuition_fee": 38326, "ranking": 38, "location": "Texas"},
-        {"name": "Georgia Institute of Technology", "country": "USA", "acceptance_rate": 23.0, "tuition_fee": 33794, "ranking": 44, "location": "Georgia"},
-        
-        # USA - Lower Cost
-        {"name": "Arizona State University", "country": "USA", "acceptance_rate": 88.0, "tuition_fee": 28800, "ranking": 103, "location": "Arizona"},
-        {"name": "University of Illinois Chicago", "country": "USA", "acceptance_rate": 73.0, "tuition_fee": 27672, "ranking": 82, "location": "Illinois"},
-        
-        # UK - High Cost
-        {"name": "University of Oxford", "country": "UK", "acceptance_rate": 17.5, "tuition_fee": 35000, "ranking": 5, "location": "Oxford"},
-        {"name": "University of Cambridge", "country": "UK", "acceptance_rate": 21.0, "tuition_fee": 34000, "ranking": 6, "location": "Cambridge"},
-        {"name": "Imperial College London", "country": "UK", "acceptance_rate": 14.3, "tuition_fee": 36000, "ranking": 7, "location": "London"},
-        
-        # UK - Mid Cost
-        {"name": "University of Edinburgh", "country": "UK", "acceptance_rate": 46.0, "tuition_fee": 26000, "ranking": 22, "location": "Edinburgh"},
-        {"name": "King's College London", "country": "UK", "acceptance_rate": 38.0, "tuition_fee": 28000, "ranking": 35, "location": "London"},
-        {"name": "University of Manchester", "country": "UK", "acceptance_rate": 59.0, "tuition_fee": 24000, "ranking": 27, "location": "Manchester"},
-        
-        # Canada
-        {"name": "University of Toronto", "country": "Canada", "acceptance_rate": 43.0, "tuition_fee": 58160, "ranking": 18, "location": "Toronto"},
-        {"name": "University of British Columbia", "country": "Canada", "acceptance_rate": 52.0, "tuition_fee": 40000, "ranking": 34, "location": "Vancouver"},
-        
-        # Germany (Low Cost)
-        {"name": "Technical University of Munich", "country": "Germany", "acceptance_rate": 8.0, "tuition_fee": 3000, "ranking": 50, "location": "Munich"},
-        {"name": "University of Heidelberg", "country": "Germany", "acceptance_rate": 20.0, "tuition_fee": 3500, "ranking": 65, "location": "Heidelberg"},
-    ]
-    
-    for uni_data in universities:
+    for uni_data in SEED_UNIVERSITIES:
         uni = University(**uni_data)
         db.add(uni)
     
     await db.commit()
+    invalidate_catalog()
 
 
 @router.get("/seed")
@@ -83,85 +93,104 @@ async def seed_universities(db: AsyncSession = Depends(get_db)):
     return {"message": "Successfully seeded 20 universities"}
 
 
-def calculate_match_tier(acceptance_rate: float) -> str:
+async def load_recommendations(db: AsyncSession) -> List[UniversityWithMatch]:
     """
-    Calculate university match tier based on acceptance rate
-    Logic:
-    - Safe: acceptance_rate > 60%
-    - Target: 30% <= acceptance_rate <= 60%
-    - Dream: acceptance_rate < 30%
+    All universities with their match tier, best-ranked first
+    Built once per catalog version and shared by every caller
     """
-    if acceptance_rate > 60:
-        return "Safe"
-    elif acceptance_rate >= 30:
-        return "Target"
-    else:
-        return "Dream"
+    snapshot = await get_catalog(db)
+    
+    # If no universities, seed them first
+    # (db may be a lagging read replica - check and seed on the primary)
+    if not len(snapshot):
+        async with AsyncSessionLocal() as write_db:
+            result = await write_db.execute(select(University.id).limit(1))
+            if result.first() is None:
+                await seed_universities_data(write_db)
+            invalidate_catalog()
+            snapshot = await get_catalog(write_db)
+    
+    return recommendation_cache.get(snapshot)
 
 
 @router.get("/recommend", response_model=List[UniversityWithMatch])
 async def get_recommendations(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get personalized university recommendations
-    - Returns all universities sorted by tuition
+    - Returns all universities sorted by ranking
     - Calculates match tier (Safe/Target/Dream)
-    - Marks which are within budget
+    - Cached until the catalog changes (the list doesn't depend on the profile)
     """
-    # Fetch user's profile
-    result = await db.execute(
-        select(Profile).where(Profile.user_id == current_user.id)
-    )
-    profile = result.scalar_one_or_none()
-    
-    user_budget = profile.budget if profile and profile.budget else 50000  # Default budget
-    
-    # Fetch ALL universities (not just within budget)
-    result = await db.execute(select(University))
-    universities = result.scalars().all()
-    
-    # If no universities, seed them first
-    if not universities:
-        await seed_universities_data(db)
-        result = await db.execute(select(University))
-        universities = result.scalars().all()
-    
-    # Calculate match tiers and prepare response
-    recommendations = []
-    for uni in universities:
-        match_tier = calculate_match_tier(uni.acceptance_rate)
-        recommendations.append(
-            UniversityWithMatch(
-                id=uni.id,
-                name=uni.name,
-                country=uni.country,
-                acceptance_rate=uni.acceptance_rate,
-                tuition_fee=uni.tuition_fee,
-                ranking=uni.ranking,
-                location=uni.location,
-                match_tier=match_tier
+    return await load_recommendations(db)
+
+
+@router.get("/search", response_model=List[UniversitySearchResult])
+async def search_universities(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Search universities by name, alias ("UBC", "TU Munchen") or location
+    - Tolerates typos and partial words ("stanfrod", "carnegie")
+    - Served from the in-memory index of the current catalog version
+    """
+    index, snapshot = await get_search_index(db)
+    results = []
+    for university_id, score in index.search(q, limit=SEARCH_CANDIDATES):
+        entry = snapshot.by_id[university_id]
+        results.append(
+            UniversitySearchResult(
+                **entry._asdict(),
+                match_tier=calculate_match_tier(entry.acceptance_rate),
+                score=score
             )
         )
-    
-    # Sort by ranking (ascending)
-    recommendations.sort(key=lambda x: x.ranking if x.ranking else 999)
-    
-    return recommendations
+    # Equal scores ("london") fall back to ranking, as in /recommend
+    results.sort(key=lambda x: (-x.score, x.ranking if x.ranking else 999))
+    return results[:limit]
+
+
+@router.get("/facets", response_model=FacetCountsResponse)
+async def get_facets(
+    country: List[str] = Query(default=[]),
+    tier: List[str] = Query(default=[]),
+    tuition_band: List[str] = Query(default=[]),
+    ranking_band: List[str] = Query(default=[]),
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Facet counts for the catalog browser
+    - Filters combine with AND across facets, OR within one (?country=UK&country=USA)
+    - Each facet's counts apply every filter except its own
+    """
+    index = await get_facet_index(db)
+    return index.counts({
+        "country": country,
+        "tier": tier,
+        "tuition_band": tuition_band,
+        "ranking_band": ranking_band,
+    })
 
 
 @router.post("/lock/{university_id}")
 async def lock_university(
     university_id: int,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    current_user: TokenUser = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Lock a university for application
     - Creates shortlist entry with is_locked=True
-    - Auto-generates 3 application tasks
+    - Auto-generates 3 application tasks (and counts them in task_progress)
     - Moves user to Applications stage (stage 4)
+    - Optionally pre-generates task assistance after the response is sent
     """
     # Check if university exists
     result = await db.execute(
@@ -225,6 +254,7 @@ async def lock_university(
     
     for task in tasks:
         db.add(task)
+    await record_tasks_created(db, current_user.id, university_id, len(tasks))
     
     # Update user's stage to Applications (4)
     result = await db.execute(
@@ -236,6 +266,9 @@ async def lock_university(
     
     await db.commit()
     
+    if TASK_ASSIST_WARMUP:
+        background_tasks.add_task(task_assist_queue.warm_up, [task.id for task in tasks])
+    
     return {
         "message": f"Successfully locked {university.name}",
         "tasks_created": 3,
@@ -243,36 +276,33 @@ async def lock_university(
     }
 
 
+async def load_shortlist(db: AsyncSession, user_id: int) -> List[ShortlistResponse]:
+    """User's shortlist joined with its universities (one query)"""
+    result = await db.execute(
+        select(Shortlist, University)
+        .join(University, University.id == Shortlist.university_id)
+        .where(Shortlist.user_id == user_id)
+        .order_by(Shortlist.id)
+    )
+    return [
+        ShortlistResponse(
+            id=shortlist.id,
+            user_id=shortlist.user_id,
+            university_id=shortlist.university_id,
+            is_locked=shortlist.is_locked,
+            locked_at=shortlist.locked_at,
+            university=university
+        )
+        for shortlist, university in result.all()
+    ]
+
+
 @router.get("/shortlist", response_model=List[ShortlistResponse])
 async def get_shortlist(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get user's shortlisted universities
     """
-    result = await db.execute(
-        select(Shortlist).where(Shortlist.user_id == current_user.id)
-    )
-    shortlists = result.scalars().all()
-    
-    # Fetch universities
-    response = []
-    for shortlist in shortlists:
-        result = await db.execute(
-            select(University).where(University.id == shortlist.university_id)
-        )
-        university = result.scalar_one_or_none()
-        if university:
-            response.append(
-                ShortlistResponse(
-                    id=shortlist.id,
-                    user_id=shortlist.user_id,
-                    university_id=shortlist.university_id,
-                    is_locked=shortlist.is_locked,
-                    locked_at=shortlist.locked_at,
-                    university=university
-                )
-            )
-    
-    return response
+    return await load_shortlist(db, current_user.id)
@@ -0,0 +1,124 @@
+"""
+LLM Usage Routes
+GET /usage/me - Current user's token usage per day + remaining quota
+GET /usage/daily - Usage per day across all users (admins)
+GET /usage/users - Top users by tokens over a window (admins)
+"""
+import os
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from database import get_db
+from models import User, LLMUsage
+from schemas import UsageBucket, MyUsageResponse
+from dependencies import TokenUser, get_current_user, get_token_user
+from services.usage import usage_recorder
+
+router = APIRouter(prefix="/usage", tags=["Usage"])
+
+# Comma-separated emails allowed to see usage across all users
+USAGE_ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("USAGE_ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
+
+
+def require_usage_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.email.lower() not in USAGE_ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usage reports are restricted to administrators"
+        )
+    return current_user
+
+
+def _aggregates():
+    """Shared SUM/AVG columns for usage buckets"""
+    return (
+        func.count(LLMUsage.id).label("requests"),
+        func.coalesce(func.sum(LLMUsage.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(LLMUsage.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.avg(LLMUsage.latency_ms), 0).label("avg_latency_ms"),
+    )
+
+
+def _bucket(row, **key) -> UsageBucket:
+    return UsageBucket(
+        **key,
+        requests=row.requests,
+        prompt_tokens=row.prompt_tokens,
+        completion_tokens=row.completion_tokens,
+        total_tokens=row.prompt_tokens + row.completion_tokens,
+        avg_latency_ms=round(float(row.avg_latency_ms), 1),
+    )
+
+
+def _since(days: int) -> datetime:
+    today = datetime.utcnow().date()
+    return datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+
+
+@router.get("/me", response_model=MyUsageResponse)
+async def my_usage(
+    days: int = Query(default=7, ge=1, le=90),
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Current user's LLM usage per day (most recent first)
+    - tokens_today is the estimate the quota uses (last all-worker total
+      plus this worker's calls since), so it includes calls not yet flushed
+    """
+    day = func.date(LLMUsage.created_at)
+    result = await db.execute(
+        select(day.label("day"), *_aggregates())
+        .where(LLMUsage.user_id == current_user.id, LLMUsage.created_at >= _since(days))
+        .group_by(day)
+        .order_by(day.desc())
+    )
+    return MyUsageResponse(
+        days=[_bucket(row, day=str(row.day)) for row in result.all()],
+        tokens_today=usage_recorder.tokens_today(current_user.id),
+        daily_quota=usage_recorder.daily_quota or None,
+    )
+
+
+@router.get("/daily", response_model=List[UsageBucket])
+async def daily_usage(
+    days: int = Query(default=30, ge=1, le=365),
+    _: User = Depends(require_usage_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Usage per day across all users (most recent first)"""
+    day = func.date(LLMUsage.created_at)
+    result = await db.execute(
+        select(day.label("day"), *_aggregates())
+        .where(LLMUsage.created_at >= _since(days))
+        .group_by(day)
+        .order_by(day.desc())
+    )
+    return [_bucket(row, day=str(row.day)) for row in result.all()]
+
+
+@router.get("/users", response_model=List[UsageBucket])
+async def usage_by_user(
+    days: int = Query(default=7, ge=1, le=365),
+    limit: int = Query(default=50, ge=1, le=500),
+    _: User = Depends(require_usage_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Heaviest users by total tokens over the last `days` days"""
+    total = func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens)
+    result = await db.execute(
+        select(LLMUsage.user_id, *_aggregates())
+        .where(LLMUsage.created_at >= _since(days))
+        .group_by(LLMUsage.user_id)
+        .order_by(total.desc())
+        .limit(limit)
+    )
+    return [_bucket(row, user_id=row.user_id) for row in result.all()]
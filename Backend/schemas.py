@@ -3,7 +3,7 @@ Pydantic V2 Schemas for Request/Response Validation
 Strict data validation for REST API
 """
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 
@@ -20,6 +20,13 @@ class TaskStatusEnum(str, Enum):
     DONE = "done"
 
 
+class JobStatusEnum(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class MatchTierEnum(str, Enum):
     SAFE = "Safe"
     TARGET = "Target"
@@ -96,6 +103,17 @@ class UniversityWithMatch(UniversityBase):
     match_tier: str  # Safe/Target/Dream
 
 
+class UniversitySearchResult(UniversityWithMatch):
+    """University matched by a search query"""
+    score: float
+
+
+class FacetCountsResponse(BaseModel):
+    """Catalog facet counts for the current filters"""
+    total: int
+    facets: Dict[str, Dict[str, int]]  # facet -> value -> matching universities
+
+
 class UniversityLockRequest(BaseModel):
     """Request to lock a university"""
     university_id: int
@@ -120,10 +138,18 @@ class ChatMessage(BaseModel):
     history: Optional[List[dict]] = Field(default_factory=list, description="Previous messages")
 
 
+class UniversityCard(BaseModel):
+    """Catalog university mentioned in an AI response"""
+    id: int
+    name: str
+    country: str
+
+
 class ChatResponse(BaseModel):
     """AI response"""
     response: str
     render_cards: Optional[List[str]] = Field(default=None, description="Universities to render as cards")
+    cards: Optional[List[UniversityCard]] = Field(default=None, description="Catalog universities mentioned in the response")
 
 
 # ============= TASK SCHEMAS =============
@@ -140,6 +166,12 @@ class TaskUpdate(BaseModel):
     status: TaskStatusEnum
 
 
+class TaskBulkUpdate(BaseModel):
+    """Set the status of many tasks at once"""
+    task_ids: List[int] = Field(min_length=1, max_length=500)
+    status: TaskStatusEnum
+
+
 class TaskResponse(BaseModel):
     """Task data response"""
     model_config = ConfigDict(from_attributes=True)
@@ -160,14 +192,68 @@ class TaskListResponse(BaseModel):
     all_cleared: bool = Field(description="True if all tasks are completed")
 
 
+class UniversityTaskProgress(BaseModel):
+    """Task completion for one university"""
+    university_id: int
+    total: int
+    done: int
+    percent: int
+
+
+class TaskProgressResponse(BaseModel):
+    """Task completion counters (maintained on every task write)"""
+    total: int
+    done: int
+    percent: int
+    all_cleared: bool
+    universities: List[UniversityTaskProgress]
+
+
 class TaskAssistRequest(BaseModel):
     """Request AI assistance for a task"""
     task_id: int
 
 
-class TaskAssistResponse(BaseModel):
-    """AI-generated task assistance"""
-    content: str
+class TaskAssistJobResponse(BaseModel):
+    """Background AI assistance job (poll until status is done/failed)"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    job_id: str = Field(validation_alias="id")
+    task_id: int
+    status: JobStatusEnum
+    content: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+# ============= DASHBOARD SCHEMAS =============
+class DashboardResponse(BaseModel):
+    """Everything the dashboard renders, in one response"""
+    profile: Optional[ProfileResponse] = None
+    tasks: List[TaskResponse]
+    all_cleared: bool = Field(description="True if all tasks are completed")
+    shortlist: List[ShortlistResponse]
+    recommendations: List[UniversityWithMatch]
+
+
+# ============= USAGE SCHEMAS =============
+class UsageBucket(BaseModel):
+    """Aggregated LLM usage for one day or one user"""
+    day: Optional[str] = None  # YYYY-MM-DD
+    user_id: Optional[int] = None
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    avg_latency_ms: float
+
+
+class MyUsageResponse(BaseModel):
+    """Current user's LLM usage and remaining daily quota"""
+    days: List[UsageBucket]
+    tokens_today: int
+    daily_quota: Optional[int] = Field(default=None, description="None when quotas are disabled")
 
 
 # ============= USER SCHEMAS =============
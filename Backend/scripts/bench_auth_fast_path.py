@@ -0,0 +1,95 @@
+"""
+Benchmark: SQL statements and latency per request on the polling endpoints
+Tokens issued before versioning (resolved with a users SELECT, like every
+request used to be) vs. versioned tokens (claims + in-memory revocation check)
+Also asserts that POST /auth/revoke rejects older tokens, including
+pre-versioning ones, on both paths
+Usage (from Backend/): python scripts/bench_auth_fast_path.py [iterations]
+    (against DATABASE_URL, default: a temp SQLite file)
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from database import engine  # noqa: E402
+from dependencies import create_access_token  # noqa: E402
+from main import app  # noqa: E402
+from models import Base  # noqa: E402
+
+POLLING_ENDPOINTS = ["/tasks/", "/tasks/progress", "/usage/me", "/profile/", "/universities/shortlist", "/dashboard/"]
+
+statements = []
+event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+
+async def measure(client, token, iterations):
+    headers = {"Authorization": f"Bearer {token}"}
+    rows = {}
+    for path in POLLING_ENDPOINTS:
+        (await client.get(path, headers=headers)).raise_for_status()
+        samples = []
+        statements.clear()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+        rows[path] = (statistics.median(samples), len(statements) / iterations)
+    return rows
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/auth/signup", json={
+            "email": f"bench-{time.time_ns()}@example.com", "password": "benchmark", "full_name": "Bench User"
+        })
+        body = response.json()
+        token, user_id = body["access_token"], body["user_id"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/profile/update", headers=headers, json={
+            "gpa": 3.4, "degree_level": "masters", "budget": 40000, "target_country": "USA"
+        })
+        await client.get("/universities/seed")
+        await client.post("/universities/lock/1", headers=headers)
+
+        legacy_token = create_access_token(data={"sub": str(user_id)})
+        legacy = await measure(client, legacy_token, iterations)
+        versioned = await measure(client, token, iterations)
+
+        print(f"{'endpoint':<24} {'SQL/request':>19} {'p50 ms':>17}")
+        print(f"{'':<24} {'legacy':>9} {'versioned':>9} {'legacy':>8} {'versioned':>8}")
+        for path in POLLING_ENDPOINTS:
+            (old_ms, old_sql), (new_ms, new_sql) = legacy[path], versioned[path]
+            assert new_sql == old_sql - 1, (path, old_sql, new_sql)
+            print(f"{path:<24} {old_sql:9.2f} {new_sql:9.2f} {old_ms:8.3f} {new_ms:8.3f}")
+
+        # Revocation: every older token (versioned or legacy-format) is rejected
+        response = await client.post("/auth/revoke", headers=headers)
+        response.raise_for_status()
+        fresh = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        assert (await client.get("/tasks/", headers=headers)).status_code == 401
+        assert (await client.get("/tasks/", headers=fresh)).status_code == 200
+        assert (await client.get("/usage/daily", headers=headers)).status_code == 401
+        legacy_headers = {"Authorization": f"Bearer {legacy_token}"}
+        assert (await client.get("/tasks/", headers=legacy_headers)).status_code == 401
+        assert (await client.get("/usage/daily", headers=legacy_headers)).status_code == 401
+        print("revoked and pre-versioning tokens rejected, fresh token accepted")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark: catalog facet counts
+Bitset facet index vs. the equivalent SQL GROUP BY per facet, on a generated
+catalog; also asserts both return identical counts
+Usage (from Backend/):
+    python scripts/bench_catalog_facets.py [universities] [iterations]
+    (against DATABASE_URL, default: a temp SQLite file)
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from sqlalchemy import case, func, or_, select, true  # noqa: E402
+
+from database import AsyncSessionLocal, engine  # noqa: E402
+from generate_data import populate  # noqa: E402
+from models import University  # noqa: E402
+from services.catalog import get_catalog  # noqa: E402
+from services.catalog_facets import FACETS, RANKING_BANDS, TUITION_BANDS, UNRANKED, FacetIndex  # noqa: E402
+
+
+def _band_case(column, bands, default=None):
+    whens = []
+    for label, low, high in bands:
+        condition = column >= low if high is None else (column >= low) & (column < high)
+        whens.append((condition, label))
+    return case(*whens, else_=default or bands[0][0])
+
+
+SQL_FACETS = {
+    "country": University.country,
+    "tier": case((University.acceptance_rate > 60, "Safe"), (University.acceptance_rate >= 30, "Target"),
+                 else_="Dream"),
+    "tuition_band": _band_case(University.tuition_fee, TUITION_BANDS),
+    "ranking_band": case((or_(University.ranking.is_(None), University.ranking == 0), UNRANKED),
+                         else_=_band_case(University.ranking, RANKING_BANDS)),
+}
+
+
+async def sql_counts(db, filters):
+    """One GROUP BY per facet (with every other facet's filter) plus a total"""
+    def where(skip=None):
+        conditions = [SQL_FACETS[f].in_(v) for f, v in filters.items() if v and f != skip]
+        return conditions or [true()]
+
+    total = (await db.execute(select(func.count()).select_from(University).where(*where()))).scalar()
+    facets = {}
+    for facet in FACETS:
+        expr = SQL_FACETS[facet]
+        rows = await db.execute(select(expr, func.count()).where(*where(facet)).group_by(expr))
+        facets[facet] = dict(rows.all())
+    return {"total": total, "facets": facets}
+
+
+def random_filters(rng, index):
+    filters = {}
+    for facet in FACETS:
+        values = list(index.bitsets[facet])
+        if rng.random() < 0.5:
+            filters[facet] = rng.sample(values, rng.randint(1, min(2, len(values))))
+    return filters
+
+
+async def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    await populate(0, size)
+
+    async with AsyncSessionLocal() as db:
+        snapshot = await get_catalog(db)
+        started = time.perf_counter()
+        index = FacetIndex(snapshot)
+        print(f"{engine.url.drivername}, {len(snapshot):,} universities, "
+              f"index build {(time.perf_counter() - started) * 1000:.0f} ms (once per catalog version)")
+
+        rng = random.Random(3)
+        cases = [{}] + [random_filters(rng, index) for _ in range(iterations - 1)]
+        sql_samples, index_samples = [], []
+        for filters in cases:
+            begin = time.perf_counter()
+            expected = await sql_counts(db, filters)
+            sql_samples.append((time.perf_counter() - begin) * 1000)
+            begin = time.perf_counter()
+            got = index.counts(filters)
+            index_samples.append((time.perf_counter() - begin) * 1000)
+
+            assert got["total"] == expected["total"], (filters, got["total"], expected["total"])
+            for facet in FACETS:
+                nonzero = {value: n for value, n in got["facets"][facet].items() if n}
+                assert nonzero == expected["facets"][facet], (filters, facet, nonzero, expected["facets"][facet])
+
+    for label, samples in (("SQL GROUP BY x4 + total", sql_samples), ("bitset facet index", index_samples)):
+        samples.sort()
+        print(f"{label:<24} p50 {statistics.median(samples):8.3f} ms | p95 {samples[int(len(samples) * 0.95) - 1]:8.3f} ms")
+    print(f"{len(cases)} filter combinations, counts identical")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
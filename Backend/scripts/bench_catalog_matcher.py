@@ -0,0 +1,112 @@
+"""
+Benchmark: catalog mention matching
+Aho-Corasick matcher vs. one compiled regex per name/alias, plus relevance
+checks on the seeded catalog (mentions that must and must not become cards)
+Usage (from Backend/): python scripts/bench_catalog_matcher.py [catalog_size]
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from routes.universities import SEED_UNIVERSITIES  # noqa: E402
+from services.catalog import CatalogEntry, CatalogSnapshot, mention_patterns  # noqa: E402
+from services.catalog_matcher import CatalogMatcher  # noqa: E402
+
+CITIES = ["Aachen", "Boston", "Calgary", "Delft", "Essen", "Florence", "Glasgow", "Hamburg",
+          "Irvine", "Jena", "Kyoto", "Leeds", "Madrid", "Nantes", "Ottawa", "Porto"]
+KINDS = ["University of {}", "{} Institute of Technology", "{} State University",
+         "Technical University of {}", "{} College"]
+# (text, universities that must be found); anything else found is a false card
+RELEVANCE_CASES = [
+    ("Is the USA a good place for a masters?", []),
+    ("I use git for all my coursework", []),
+    ("Harvard is in Cambridge, Massachusetts", ["Harvard University"]),
+    ("I live in Michigan and want to stay close to home", []),
+    ("Toronto is expensive for students", []),
+    ("Do they still use imperial units in the UK?", []),
+    ("My GPA is 3.4 and my GRE is 320, aiming for an MS in CS", []),
+    ("What are my chances at MIT and UBC?", ["MIT", "University of British Columbia"]),
+    ("I got into the University of Toronto", ["University of Toronto"]),
+    ("Should I do an MS at Michigan?", ["University of Michigan"]),
+    ("Imperial College has a great CS program", ["Imperial College London"]),
+    ("Georgia Tech or GIT for robotics?", ["Georgia Institute of Technology"]),
+    ("Is studying at Toronto worth it?", ["University of Toronto"]),
+    ("Compare Oxford University with Cambridge University",
+     ["University of Oxford", "University of Cambridge"]),
+    ("Is the University of South Alabama affordable?", ["University of South Alabama"]),
+]
+FILLER = ("Based on your GPA and budget, here is a balanced list with tuition and acceptance "
+          "rates. Consider applying early and tailoring your SOP to each program. ").split()
+
+
+def build_catalog(size: int) -> CatalogSnapshot:
+    rng = random.Random(42)
+    entries = []
+    for i in range(size):
+        city = f"{rng.choice(CITIES)}{i}"
+        name = rng.choice(KINDS).format(city)
+        entries.append(CatalogEntry(i + 1, name, "USA", 50.0, 30000, i + 1, city))
+    return CatalogSnapshot(1, entries)
+
+
+def build_response(snapshot: CatalogSnapshot, words: int, mentions: int) -> str:
+    rng = random.Random(7)
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for _ in range(mentions):
+        tokens.insert(rng.randrange(len(tokens)), rng.choice(snapshot.entries).name)
+    return " ".join(tokens)
+
+
+def check_relevance() -> None:
+    extra = {"name": "University of South Alabama", "country": "USA", "acceptance_rate": 80.0,
+             "tuition_fee": 20000, "ranking": 300, "location": "Alabama"}
+    entries = [CatalogEntry(i + 1, **uni) for i, uni in enumerate(SEED_UNIVERSITIES + [extra])]
+    matcher = CatalogMatcher(CatalogSnapshot(1, entries))
+    failures = []
+    for text, expected in RELEVANCE_CASES:
+        found = [entry.name for entry in matcher.find(text)]
+        if found != expected:
+            failures.append(f"  {text!r}: expected {expected}, found {found}")
+    negatives = sum(1 for _, expected in RELEVANCE_CASES if not expected)
+    print(f"relevance: {len(RELEVANCE_CASES) - len(failures)}/{len(RELEVANCE_CASES)} cases"
+          f" ({negatives} with no university)")
+    assert not failures, "\n".join(["relevance failures:"] + failures)
+
+
+def time_it(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    check_relevance()
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    snapshot = build_catalog(size)
+
+    started = time.perf_counter()
+    matcher = CatalogMatcher(snapshot)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    regexes = []
+    for entry in snapshot.entries:
+        for pattern, _ in mention_patterns(entry.name, entry.location):
+            regexes.append((re.compile(r"\b" + re.escape(pattern) + r"\b", re.IGNORECASE), entry.id))
+
+    print(f"catalog: {size} universities, {matcher.pattern_count} patterns, build {build_ms:.1f} ms")
+    for words in (300, 3000):
+        text = build_response(snapshot, words, mentions=10)
+        ac_ms = time_it(lambda: matcher.find(text), repeat=20)
+        re_ms = time_it(lambda: [eid for rx, eid in regexes if rx.search(text)], repeat=3)
+        print(f"response {len(text):>6} chars | aho-corasick {ac_ms:7.2f} ms | per-name regex {re_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
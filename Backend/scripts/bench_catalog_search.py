@@ -0,0 +1,120 @@
+"""
+Benchmark: university search
+Trigram/prefix index latency on a large synthetic catalog, incremental update
+cost vs. a full build, and relevance checks for misspelled / partial queries
+Usage (from Backend/): python scripts/bench_catalog_search.py [catalog_size]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.catalog import CatalogEntry, CatalogSnapshot  # noqa: E402
+from services.catalog_search import CatalogSearchIndex  # noqa: E402
+
+REAL = [
+    ("Stanford University", "California"), ("MIT", "Massachusetts"), ("Harvard University", "Massachusetts"),
+    ("Carnegie Mellon University", "Pittsburgh"), ("University of British Columbia", "Vancouver"),
+    ("Technical University of Munich", "Munich"), ("Imperial College London", "London"),
+    ("King's College London", "London"), ("University of Edinburgh", "Edinburgh"),
+    ("University of Toronto", "Toronto"), ("University of California, Berkeley", "California"),
+    ("Georgia Institute of Technology", "Georgia"), ("University of Heidelberg", "Heidelberg"),
+]
+# query -> expected top hit
+RELEVANCE = {
+    "carnegie": "Carnegie Mellon University",
+    "carnegie melon": "Carnegie Mellon University",
+    "CMU": "Carnegie Mellon University",
+    "TU munchen": "Technical University of Munich",
+    "TU München": "Technical University of Munich",
+    "UBC": "University of British Columbia",
+    "british columbia": "University of British Columbia",
+    "stanfrod": "Stanford University",
+    "stanf": "Stanford University",
+    "harvrd": "Harvard University",
+    "imperial": "Imperial College London",
+    "kings college": "King's College London",
+    "edinburg": "University of Edinburgh",
+    "toronto": "University of Toronto",
+    "uc berkeley": "University of California, Berkeley",
+    "georgia tech": "Georgia Institute of Technology",
+    "heidelberg": "University of Heidelberg",
+    "mit": "MIT",
+}
+SYLLABLES = ["ka", "lo", "ri", "mu", "ten", "var", "bel", "dor", "fi", "gan", "hol", "is", "jor", "kes",
+             "lin", "mar", "nor", "os", "pel", "quin", "ros", "sal", "tor", "ul", "ven", "wes", "yar", "zel"]
+KINDS = ["University of {}", "{} Institute of Technology", "{} State University",
+         "Technical University of {}", "{} College", "{} Polytechnic"]
+
+
+def synthetic_name(rng: random.Random) -> str:
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return rng.choice(KINDS).format(word)
+
+
+def build_catalog(size: int, version: int = 1) -> CatalogSnapshot:
+    rng = random.Random(42)
+    entries = [CatalogEntry(i + 1, name, "USA", 40.0, 30000, i + 1, loc) for i, (name, loc) in enumerate(REAL)]
+    for i in range(len(REAL), size):
+        name = synthetic_name(rng)
+        entries.append(CatalogEntry(i + 1, name, "USA", 40.0, 30000, i + 1, name.split()[-1]))
+    return CatalogSnapshot(version, entries)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    snapshot = build_catalog(size)
+
+    index = CatalogSearchIndex()
+    started = time.perf_counter()
+    index.update(snapshot)
+    print(f"{size:,} universities, full build {(time.perf_counter() - started) * 1000:.0f} ms, {index.stats()}")
+
+    # Relevance
+    failures = []
+    for query, expected in RELEVANCE.items():
+        results = index.search(query, limit=5)
+        top = snapshot.by_id[results[0][0]].name if results else None
+        if top != expected:
+            failures.append(f"{query!r}: expected {expected!r}, got {top!r}")
+    print(f"relevance: {len(RELEVANCE) - len(failures)}/{len(RELEVANCE)} top-1")
+    assert not failures, "\n".join(failures)
+
+    # Latency (real-name queries plus prefixes of synthetic names)
+    rng = random.Random(7)
+    queries = list(RELEVANCE) + [snapshot.entries[rng.randrange(size)].name[:rng.randint(3, 12)] for _ in range(200)]
+    samples = []
+    for _ in range(5):
+        for query in queries:
+            begin = time.perf_counter()
+            index.search(query)
+            samples.append((time.perf_counter() - begin) * 1000)
+    samples.sort()
+    print(f"search p50 {statistics.median(samples):.3f} ms | p95 {samples[int(len(samples) * 0.95) - 1]:.3f} ms | "
+          f"p99 {samples[int(len(samples) * 0.99) - 1]:.3f} ms")
+
+    # Incremental update: 100 added, 10 renamed, 10 removed
+    entries = list(snapshot.entries)
+    for i in range(100):
+        entries.append(CatalogEntry(size + i + 1, synthetic_name(rng), "UK", 40.0, 20000, None, None))
+    for i in range(10):
+        entries[100 + i] = entries[100 + i]._replace(name=f"Renamed Academy {i}")
+    del entries[200:210]
+    started = time.perf_counter()
+    index.update(CatalogSnapshot(2, entries))
+    incremental_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    CatalogSearchIndex().update(CatalogSnapshot(2, entries))
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    print(f"catalog change: incremental {incremental_ms:.0f} ms vs full rebuild {rebuild_ms:.0f} ms")
+
+    assert snapshot.entries[200].id not in {i for i, _ in index.search(snapshot.entries[200].name)}
+    assert index.search("Renamed Academy 3")[0][0] == entries[103].id
+    assert len(index) == len(entries)
+
+
+if __name__ == "__main__":
+    main()
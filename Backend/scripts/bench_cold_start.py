@@ -0,0 +1,88 @@
+"""
+Benchmark: time to first healthy response (cold start)
+Starts uvicorn in a fresh process and polls GET /health until it answers,
+with the deferred SDKs (groq, httpx, jose, bcrypt) imported lazily vs.
+preloaded before the app (what every boot used to pay); prints the boot
+import report from /metrics
+Usage (from Backend/): python scripts/bench_cold_start.py [trials]
+    (against DATABASE_URL, default: a temp SQLite file)
+"""
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from services.boot import DEFERRED_MODULES  # noqa: E402
+
+LAUNCH = "import uvicorn; uvicorn.run('main:app', host='127.0.0.1', port={port}, log_level='warning')"
+MODES = {
+    "lazy (on first use)": LAUNCH,
+    "preloaded at boot": f"import {', '.join(DEFERRED_MODULES)}; " + LAUNCH,
+}
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def get(port, path, timeout=1.0):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=timeout) as response:
+        return response.status, json.loads(response.read())
+
+
+def cold_start(code: str):
+    """Seconds from spawning the process to the first 200 from /health, plus /metrics boot"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code.format(port=port)], cwd=BACKEND,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            try:
+                status, _ = get(port, "/health")
+                if status == 200:
+                    break
+            except OSError:
+                time.sleep(0.005)
+        healthy = time.perf_counter() - started
+        return healthy, get(port, "/metrics")[1]["boot"]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cold_start(LAUNCH)  # creates the tables, warms the OS file cache
+    samples = {mode: [] for mode in MODES}
+    boot = {}
+    for _ in range(trials):
+        for mode, code in MODES.items():
+            healthy, boot[mode] = cold_start(code)
+            samples[mode].append(healthy * 1000)
+
+    for mode in MODES:
+        print(f"{mode:<22} time to first healthy response: median {statistics.median(samples[mode]):7.0f} ms"
+              f" | min {min(samples[mode]):7.0f} ms | main.py import to ready {boot[mode]['ready_seconds'] * 1000:5.0f} ms")
+    lazy = boot["lazy (on first use)"]
+    assert not lazy["deferred_modules_loaded"], lazy["deferred_modules_loaded"]
+    print(f"\nBoot import report (lazy): {lazy['import_seconds'] * 1000:.0f} ms in {lazy['modules_loaded']} imports")
+    for item in lazy["slowest_imports"]:
+        print(f"  {item['cumulative_ms']:8.1f} ms cumulative {item['self_ms']:8.1f} ms self  {item['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: dashboard page load
+Four separate calls (sequential and in parallel, as a browser would) vs. GET /dashboard/
+Runs the app in-process over ASGI against DATABASE_URL (default: a temp SQLite file)
+Usage (from Backend/): python scripts/bench_dashboard.py [iterations]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+
+from main import app  # noqa: E402
+from database import engine  # noqa: E402
+from models import Base  # noqa: E402
+
+PAGE_CALLS = ["/profile/", "/tasks/", "/universities/shortlist", "/universities/recommend"]
+
+
+async def timed(label, load, iterations):
+    await load()  # warm up
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await load()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    print(f"{label:<26} p50 {statistics.median(samples):7.2f} ms | p95 {samples[int(len(samples) * 0.95) - 1]:7.2f} ms")
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/auth/signup", json={
+            "email": f"bench-{time.time_ns()}@example.com", "password": "benchmark", "full_name": "Bench User"
+        })
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        await client.post("/profile/update", headers=headers, json={
+            "gpa": 3.4, "degree_level": "masters", "budget": 40000, "target_country": "USA"
+        })
+        universities = (await client.get("/universities/recommend", headers=headers)).json()
+        await client.post(f"/universities/lock/{universities[0]['id']}", headers=headers)
+
+        async def sequential():
+            for path in PAGE_CALLS:
+                (await client.get(path, headers=headers)).raise_for_status()
+
+        async def parallel():
+            for response in await asyncio.gather(*(client.get(path, headers=headers) for path in PAGE_CALLS)):
+                response.raise_for_status()
+
+        async def dashboard():
+            (await client.get("/dashboard/", headers=headers)).raise_for_status()
+
+        print(f"{engine.url.drivername}, {iterations} iterations")
+        await timed("4 calls, sequential", sequential, iterations)
+        await timed("4 calls, parallel", parallel, iterations)
+        await timed("GET /dashboard/", dashboard, iterations)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""
+Benchmark: logging overhead under load
+1. Caller-side cost of one log call, from many concurrent tasks: a
+   synchronous StreamHandler (what print() amounted to) vs. the queue
+   pipeline, writing to a file and to a slow sink (1 ms per write, like a
+   backed-up stdout pipe)
+2. GET /health under concurrent load with per-request logging: off,
+   synchronous, and through the queue pipeline
+Usage (from Backend/): python scripts/bench_logging.py [requests]
+    (against DATABASE_URL, default: a temp SQLite file)
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from services.log_pipeline import JsonFormatter, LogPipeline, log_pipeline, request_context  # noqa: E402
+
+CONCURRENCY = 64
+
+
+class SlowSink:
+    """A file whose writes take at least 1 ms (blocked pipe / slow collector)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        time.sleep(0.001)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def sync_handler(stream) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def use_handler(handler: logging.Handler):
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def log_calls(total: int):
+    """Per-call latency (µs) of logger.info from CONCURRENCY interleaved tasks"""
+    logger = logging.getLogger("bench")
+    samples = []
+
+    async def worker(count):
+        with request_context():
+            for i in range(count):
+                started = time.perf_counter()
+                logger.info("chat reply", extra={"user_id": i, "duration_ms": 12.5, "model": "llama"})
+                samples.append((time.perf_counter() - started) * 1e6)
+                await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(total // CONCURRENCY) for _ in range(CONCURRENCY)))
+    return samples, time.perf_counter() - started
+
+
+async def health_load(client, total: int):
+    """Latency (ms) of GET /health with CONCURRENCY clients"""
+    samples = []
+
+    async def worker(count):
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get("/health")
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(total // CONCURRENCY) for _ in range(CONCURRENCY)))
+    return samples, time.perf_counter() - started
+
+
+async def main_async():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    workdir = tempfile.mkdtemp()
+
+    print(f"1. logger.info from {CONCURRENCY} concurrent tasks, {total} calls")
+    for sink_name, slow in (("file", False), ("slow sink (1 ms/write)", True)):
+        for mode in ("synchronous", "queue pipeline"):
+            stream = open(os.path.join(workdir, f"{sink_name[:4]}-{mode[:4]}.log"), "w")
+            sink = SlowSink(stream) if slow else stream
+            pipeline = None
+            if mode == "synchronous":
+                use_handler(sync_handler(sink))
+            else:
+                pipeline = LogPipeline(stream=sink)
+                pipeline.start()
+                use_handler(pipeline.handler)
+            samples, elapsed = await log_calls(total)
+            if pipeline is not None:
+                pipeline.stop()
+                assert pipeline.written + pipeline.dropped == len(samples), pipeline.stats()
+                extra = f" | written {pipeline.written}, dropped {pipeline.dropped}, {pipeline.batches} batches"
+            else:
+                extra = ""
+            stream.close()
+            print(f"   {sink_name:<23} {mode:<15} p50 {statistics.median(samples):7.1f} µs"
+                  f" | p99 {percentile(samples, 0.99):8.1f} µs | wall {elapsed * 1000:7.0f} ms{extra}")
+
+    print(f"\n2. GET /health, {CONCURRENCY} concurrent clients, {total} requests, one log record per request")
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await health_load(client, CONCURRENCY * 4)  # warm up
+        for mode in ("logging off", "synchronous", "queue pipeline"):
+            stream = SlowSink(open(os.path.join(workdir, f"health-{mode[:4]}.log"), "w"))
+            pipeline = None
+            main.LOG_REQUESTS = mode != "logging off"
+            if mode == "synchronous":
+                use_handler(sync_handler(stream))
+            else:
+                pipeline = LogPipeline(stream=stream)
+                pipeline.start()
+                use_handler(pipeline.handler)
+            samples, elapsed = await health_load(client, total)
+            if pipeline is not None:
+                pipeline.stop()
+            print(f"   {mode:<15} p50 {statistics.median(samples):7.2f} ms | p95 {percentile(samples, 0.95):7.2f} ms"
+                  f" | {len(samples) / elapsed:7.0f} req/s")
+    use_handler(log_pipeline.handler)
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
@@ -0,0 +1,136 @@
+"""
+Benchmark: GET /universities/recommend on a generated catalog
+Previous implementation (SELECT every university + build the list per call)
+vs. the catalog-versioned cache on a miss and on a hit; asserts identical
+results, that profile updates don't rebuild it, and that inserting or
+updating a university does, then reports the hit rate of a polling workload
+Usage (from Backend/):
+    python scripts/bench_recommendations.py [universities] [iterations]
+    (against DATABASE_URL, default: a temp SQLite file)
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import select, update  # noqa: E402
+
+from database import AsyncSessionLocal, engine  # noqa: E402
+from generate_data import populate  # noqa: E402
+from main import app  # noqa: E402
+from models import University  # noqa: E402
+from schemas import UniversityWithMatch  # noqa: E402
+from services.catalog import calculate_match_tier, invalidate_catalog  # noqa: E402
+from services.recommendation_cache import recommendation_cache  # noqa: E402
+
+
+async def legacy_recommendations(db):
+    result = await db.execute(select(University))
+    recommendations = [
+        UniversityWithMatch(
+            id=uni.id, name=uni.name, country=uni.country, acceptance_rate=uni.acceptance_rate,
+            tuition_fee=uni.tuition_fee, ranking=uni.ranking, location=uni.location,
+            match_tier=calculate_match_tier(uni.acceptance_rate),
+        )
+        for uni in result.scalars().all()
+    ]
+    recommendations.sort(key=lambda x: x.ranking if x.ranking else 999)
+    return recommendations
+
+
+def report(label, samples):
+    samples.sort()
+    print(f"{label:<34} p50 {statistics.median(samples):9.2f} ms | p95 {samples[int(len(samples) * 0.95) - 1]:9.2f} ms")
+
+
+async def timed(call, iterations, before=None):
+    samples = []
+    for _ in range(iterations):
+        if before:
+            before()
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def signup(client, email):
+    response = await client.post("/auth/signup", json={"email": email, "password": "benchmark", "full_name": "Bench User"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await client.post("/profile/update", headers=headers, json={
+        "gpa": 3.4, "degree_level": "masters", "budget": 40000, "target_country": "USA"
+    })
+    return headers
+
+
+async def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    await populate(0, size)
+    run = time.time_ns()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = await signup(client, f"bench-{run}@example.com")
+
+        async def endpoint():
+            response = await client.get("/universities/recommend", headers=headers)
+            response.raise_for_status()
+            return response.json()
+
+        async def legacy():
+            async with AsyncSessionLocal() as db:
+                return await legacy_recommendations(db)
+
+        expected = [item.model_dump() for item in await legacy()]
+        assert await endpoint() == expected
+        print(f"{engine.url.drivername}, {size:,} universities")
+        report("previous (SELECT + build per call)", await timed(legacy, iterations))
+        report("cache miss (build from snapshot)", await timed(endpoint, iterations, before=recommendation_cache.clear))
+        await endpoint()
+        report("cache hit", await timed(endpoint, iterations))
+
+        # A profile update doesn't touch the list
+        builds = recommendation_cache.builds
+        await client.post("/profile/update", headers=headers, json={"budget": 45000})
+        assert await endpoint() == expected
+        assert recommendation_cache.builds == builds
+
+        # A catalog change moves the catalog version: inserts and in-place updates show up
+        async with AsyncSessionLocal() as db:
+            db.add(University(name=f"Bench Institute {run}", country="USA", acceptance_rate=50.0,
+                              tuition_fee=30000, ranking=1, location="Boston"))
+            await db.commit()
+        invalidate_catalog()
+        assert any(item["name"] == f"Bench Institute {run}" for item in await endpoint())
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(University).where(University.name == f"Bench Institute {run}").values(tuition_fee=1))
+            await db.commit()
+        invalidate_catalog()
+        assert any(item["tuition_fee"] == 1 for item in await endpoint())
+        assert recommendation_cache.builds == builds + 2
+        print("not rebuilt by profile updates, rebuilt by catalog insert and update")
+
+        # Polling workload: 20 users x 50 dashboard-style loads, half update their profile once
+        users = [await signup(client, f"poll-{run}-{i}@example.com") for i in range(20)]
+        before = recommendation_cache.stats()
+        for round_number in range(50):
+            for i, user_headers in enumerate(users):
+                if round_number == 25 and i % 2 == 0:
+                    await client.post("/profile/update", headers=user_headers, json={"gpa": 3.6})
+                (await client.get("/universities/recommend", headers=user_headers)).raise_for_status()
+        after = recommendation_cache.stats()
+        hits, builds = after["hits"] - before["hits"], after["builds"] - before["builds"]
+        print(f"polling workload hit rate {hits / (hits + builds):.1%} ({hits} hits, {builds} builds)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: per-worker catalog memory
+In-process list of CatalogEntry + id dict vs. the shared mmap'd image
+Usage (from Backend/): python scripts/bench_shared_catalog.py [catalog_size] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import shared_catalog  # noqa: E402
+from services.catalog import CatalogEntry, CatalogSnapshot  # noqa: E402
+from services.shared_catalog import SharedCatalogIndex  # noqa: E402
+
+COUNTRIES = ["USA", "UK", "Canada", "Germany", "Australia", "Netherlands", "Ireland", "France"]
+
+
+def rows(size: int):
+    """Fresh row tuples, as the database driver would return them"""
+    for i in range(size):
+        country = COUNTRIES[i % len(COUNTRIES)]
+        yield (i + 1, f"University of Example City Number {i}", country, 10.0 + i % 80,
+               20000 + (i * 37) % 40000, i + 1, f"Example City {i}")
+
+
+def heap_bytes(build) -> tuple:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def scan_ms(snapshot: CatalogSnapshot) -> float:
+    started = time.perf_counter()
+    sum(entry.tuition_fee for entry in snapshot.entries)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    path = os.path.join(tempfile.mkdtemp(), "catalog.bin")
+
+    local_bytes, local = heap_bytes(
+        lambda: CatalogSnapshot(1, [CatalogEntry(*row) for row in rows(size)])
+    )
+
+    shared_catalog.publish([CatalogEntry(*row) for row in rows(size)], (size, size, 0), path=path)
+
+    def attach():
+        view = shared_catalog.attach(path)
+        return CatalogSnapshot(view.generation, view, SharedCatalogIndex(view))
+
+    shared_bytes, shared = heap_bytes(attach)
+    image_bytes = shared.entries.nbytes
+
+    print(f"catalog: {size} universities, {workers} workers")
+    print(f"in-process : {local_bytes / 1024:9.1f} KiB per worker "
+          f"-> {workers * local_bytes / 1024:9.1f} KiB total | full scan {scan_ms(local):6.2f} ms")
+    print(f"shared mmap: {shared_bytes / 1024:9.1f} KiB per worker + {image_bytes / 1024:.1f} KiB image once "
+          f"-> {(workers * shared_bytes + image_bytes) / 1024:9.1f} KiB total | full scan {scan_ms(shared):6.2f} ms")
+    probe = size // 2
+    assert shared.by_id[probe] == local.by_id[probe]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: per-message chat overhead, REST vs. WebSocket
+Runs the API under uvicorn (in-process thread) and sends messages answered
+by the local fast path (an off-topic query, refused at any point in the
+conversation), so the numbers are pure server overhead: auth,
+profile/catalog lookups and framing - no Groq call
+Usage (from Backend/): python scripts/bench_ws_chat.py [messages]
+    (against DATABASE_URL, default: a temp SQLite file)
+"""
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from database import engine  # noqa: E402
+from main import app  # noqa: E402
+from services.intent_classifier import intent_fast_path  # noqa: E402
+
+MESSAGE = "tell me a joke"
+statements = []
+event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+
+def start_server() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return port
+
+
+def report(label, samples, statement_count, messages, skipped):
+    assert skipped == messages, f"{messages - skipped} message(s) left the fast path"
+    samples.sort()
+    print(f"{label:<22} p50 {statistics.median(samples):7.3f} ms | p95 {samples[int(len(samples) * 0.95) - 1]:7.3f} ms"
+          f" | SQL statements/message {statement_count / messages:.2f}")
+
+
+async def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    port = start_server()
+    base = f"127.0.0.1:{port}"
+
+    async with httpx.AsyncClient(base_url=f"http://{base}") as client:
+        response = await client.post("/auth/signup", json={
+            "email": f"bench-{time.time_ns()}@example.com", "password": "benchmark", "full_name": "Bench User"
+        })
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/profile/update", headers=headers, json={
+            "gpa": 3.4, "degree_level": "masters", "budget": 40000, "target_country": "USA"
+        })
+        await client.get("/universities/seed")
+
+        # REST: one authenticated request per message (keep-alive connection)
+        await client.post("/chat/message", headers=headers, json={"message": MESSAGE})
+        samples = []
+        statements.clear()
+        skipped = intent_fast_path.refusals
+        for _ in range(messages):
+            started = time.perf_counter()
+            response = await client.post("/chat/message", headers=headers, json={"message": MESSAGE, "history": []})
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+        report("REST /chat/message", samples, len(statements), messages, intent_fast_path.refusals - skipped)
+
+    # WebSocket: authenticate once, then one frame per message
+    async with websockets.connect(f"ws://{base}/chat/ws?token={token}") as ws:
+        assert json.loads(await ws.recv())["type"] == "ready"
+
+        async def ask(message_id):
+            await ws.send(json.dumps({"type": "message", "id": message_id, "message": MESSAGE}))
+            while True:
+                frame = json.loads(await ws.recv())
+                if frame["type"] in ("done", "error"):
+                    assert frame["type"] == "done", frame
+                    return
+
+        await ask(0)
+        samples = []
+        statements.clear()
+        skipped = intent_fast_path.refusals
+        for i in range(messages):
+            started = time.perf_counter()
+            await ask(i + 1)
+            samples.append((time.perf_counter() - started) * 1000)
+        report("WebSocket /chat/ws", samples, len(statements), messages, intent_fast_path.refusals - skipped)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
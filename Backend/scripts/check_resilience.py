@@ -0,0 +1,168 @@
+"""
+Resilience layer check against the fault-injecting fake Groq server
+Drives ResilientCaller through a real AsyncGroq client (SDK retries off, as
+in services.ai_engine) and asserts:
+- retryable 503s are retried with backoff; a 400 is not retried
+- the overall deadline cuts off a slow upstream (and counts a timeout)
+- a slow primary request is hedged and the hedge wins; a hedge that isn't
+  admitted is skipped, and every completed attempt (also a losing hedge)
+  gets its usage recorded
+- consecutive failures open the breaker (calls rejected without reaching
+  upstream), a failed half-open probe re-opens it, a good probe closes it
+Usage (from Backend/): python scripts/check_resilience.py
+"""
+import asyncio
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+from groq import AsyncGroq, BadRequestError, InternalServerError  # noqa: E402
+
+from fake_groq import serve_in_thread  # noqa: E402
+from services.resilience import CircuitOpenError, ResilientCaller  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Which universities in Germany have low tuition?"}]
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class FakeUpstream:
+    def __init__(self, base_url: str):
+        self.control = httpx.AsyncClient(base_url=base_url)
+        self.client = AsyncGroq(api_key="fake", base_url=base_url, max_retries=0, timeout=30)
+
+    async def faults(self, *actions, latency: float = 0.01):
+        await self.control.post("/_faults", json={"actions": list(actions), "latency": latency})
+
+    async def requests(self) -> int:
+        return (await self.control.get("/_stats")).json()["requests"]
+
+    def completion(self):
+        return lambda: self.client.chat.completions.create(messages=MESSAGES, model="fake-model")
+
+
+async def expect(exc_type, awaitable):
+    try:
+        await awaitable
+    except exc_type:
+        return
+    raise AssertionError(f"expected {exc_type.__name__}")
+
+
+async def check_retries(upstream: FakeUpstream):
+    caller = ResilientCaller("retries", deadline=5, max_retries=2, backoff=0.01)
+    await upstream.faults({"status": 503}, {"status": 503})
+    before = await upstream.requests()
+    completion = await caller.call(upstream.completion())
+    assert completion.choices[0].message.content
+    assert caller.retries == 2 and await upstream.requests() - before == 3, caller.stats()
+
+    await upstream.faults({"status": 503}, {"status": 503}, {"status": 503})
+    await expect(InternalServerError, caller.call(upstream.completion()))
+    assert caller.retries == 4 and caller.breaker.consecutive_failures == 1, caller.stats()
+
+    await upstream.faults({"status": 400})
+    before = await upstream.requests()
+    await expect(BadRequestError, caller.call(upstream.completion()))
+    assert await upstream.requests() - before == 1 and caller.breaker.consecutive_failures == 1
+    print(f"retries       ok  {caller.stats()['retries']} retries, 400 not retried")
+
+
+async def check_deadline(upstream: FakeUpstream):
+    caller = ResilientCaller("deadline", deadline=0.3, max_retries=2, backoff=0.01)
+    await upstream.faults({"delay": 2.0}, {"delay": 2.0}, {"delay": 2.0})
+    started = time.monotonic()
+    await expect(asyncio.TimeoutError, caller.call(upstream.completion()))
+    elapsed = time.monotonic() - started
+    assert elapsed < 0.5 and caller.timeouts == 1, (elapsed, caller.stats())
+    print(f"deadline      ok  gave up after {elapsed * 1000:.0f} ms (deadline 300 ms, upstream 2 s)")
+
+
+async def check_hedging(upstream: FakeUpstream):
+    caller = ResilientCaller("hedging", deadline=5, max_retries=0, hedge_enabled=True, hedge_min_delay=0.05)
+    await upstream.faults(latency=0.01)
+    for _ in range(20):  # latency samples before hedging kicks in
+        await caller.call(upstream.completion())
+    await upstream.faults({"delay": 2.0})
+    started = time.monotonic()
+    await caller.call(upstream.completion())
+    elapsed = time.monotonic() - started
+    assert caller.hedges == 1 and caller.hedge_wins == 1 and elapsed < 1.0, (elapsed, caller.stats())
+    print(f"hedging       ok  slow primary (2 s) hedged after {caller.hedge_delay() * 1000:.0f} ms,"
+          f" answered in {elapsed * 1000:.0f} ms")
+
+    # No admission slot for the hedge: it is skipped and the primary answers
+    await upstream.faults({"delay": 0.3})
+    before = await upstream.requests()
+    await caller.call(upstream.completion(), admit_hedge=lambda: False)
+    assert caller.hedges == 1 and caller.hedges_skipped == 1, caller.stats()
+    assert await upstream.requests() - before == 1
+    
+    # The hedge finishes and releases the primary: both completed, both record usage
+    recorded, started, release = [], [], asyncio.Event()
+    
+    async def attempt():
+        name = "hedge" if started else "primary"
+        started.append(name)
+        if name == "primary":
+            await release.wait()
+        else:
+            release.set()
+        recorded.append(name)
+        return name
+    
+    winner = await caller.call(attempt, admit_hedge=lambda: True)
+    assert winner == "primary" and sorted(recorded) == ["hedge", "primary"], (winner, recorded)
+    assert caller.hedges == 2, caller.stats()
+    print("hedge admission ok  unadmitted hedge skipped; winner and completed loser both recorded")
+
+
+async def check_breaker(upstream: FakeUpstream):
+    caller = ResilientCaller("breaker", deadline=5, max_retries=0, failure_threshold=3, reset_seconds=0.2)
+    await upstream.faults(*[{"status": 503}] * 4)
+    for _ in range(3):
+        await expect(InternalServerError, caller.call(upstream.completion()))
+    assert caller.breaker.state == "open" and caller.breaker.trips == 1
+
+    before = await upstream.requests()
+    await expect(CircuitOpenError, caller.call(upstream.completion()))
+    assert await upstream.requests() == before, "open breaker must not reach upstream"
+
+    await asyncio.sleep(0.25)  # half-open: the probe fails and re-opens the breaker
+    await expect(InternalServerError, caller.call(upstream.completion()))
+    assert caller.breaker.state == "open" and caller.breaker.trips == 2
+
+    await asyncio.sleep(0.25)  # half-open: the probe succeeds and closes it
+    await caller.call(upstream.completion())
+    assert caller.breaker.state == "closed" and caller.breaker.consecutive_failures == 0
+    print(f"breaker       ok  opened after 3 failures, {caller.breaker.rejected} rejected,"
+          f" failed probe re-opened, good probe closed")
+
+
+async def main():
+    port = free_port()
+    server = serve_in_thread(port)
+    upstream = FakeUpstream(f"http://127.0.0.1:{port}")
+    try:
+        await check_retries(upstream)
+        await check_deadline(upstream)
+        await check_hedging(upstream)
+        await check_breaker(upstream)
+    finally:
+        await upstream.control.aclose()
+        await upstream.client.close()
+        server.should_exit = True
+    print("all resilience checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
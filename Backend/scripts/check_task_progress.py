@@ -0,0 +1,48 @@
+"""
+Task progress consistency check
+Compares the task_progress counters with counts recomputed from `tasks`
+and optionally rebuilds them
+Usage (from Backend/):
+    python scripts/check_task_progress.py            # report drift, exit 1 if any
+    python scripts/check_task_progress.py --fix      # rebuild every counter
+    python scripts/check_task_progress.py --fix --user 42
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine  # noqa: E402
+from models import Base  # noqa: E402
+from services.task_progress import ALL_TASKS, find_drift, rebuild_task_progress  # noqa: E402
+
+
+async def main(fix: bool, user_id=None) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        drift = await find_drift(conn)
+        if user_id is not None:
+            drift = [row for row in drift if row[0] == user_id]
+
+        for drift_user, university_id, expected, stored in drift[:50]:
+            scope = "all tasks" if university_id == ALL_TASKS else f"university {university_id}"
+            print(f"user {drift_user} ({scope}): expected total/done {expected}, stored {stored}")
+        if len(drift) > 50:
+            print(f"... and {len(drift) - 50} more")
+        print(f"{len(drift)} counter(s) out of sync")
+
+        if fix:
+            await rebuild_task_progress(conn, user_id)
+            print("Rebuilt " + ("all counters" if user_id is None else f"counters for user {user_id}"))
+    await engine.dispose()
+    return 1 if drift and not fix else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fix", action="store_true", help="rebuild counters from tasks")
+    parser.add_argument("--user", type=int, default=None, help="only this user")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.fix, args.user)))
@@ -0,0 +1,69 @@
+"""
+Fault-injecting fake Groq server
+Answers POST /openai/v1/chat/completions like Groq (non-streaming) and
+injects scripted faults, so the resilience layer can be exercised locally
+- POST /_faults {"actions": [...], "latency": 0.01} queues one action per
+  upcoming request: {"status": 503}, {"delay": 2.0}, or {} (normal answer);
+  once the queue is empty every request answers after `latency` seconds
+- GET /_stats returns {"requests": n}
+Usage (from Backend/):
+    python scripts/fake_groq.py [port]
+    GROQ_BASE_URL=http://127.0.0.1:9000 GROQ_API_KEY=fake uvicorn main:app
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Groq")
+state = {"actions": deque(), "latency": 0.01, "requests": 0}
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    state["requests"] += 1
+    action = state["actions"].popleft() if state["actions"] else {}
+    await asyncio.sleep(action.get("delay", state["latency"]))
+    if action.get("status"):
+        return JSONResponse({"error": {"message": "injected fault", "type": "fake"}}, status_code=action["status"])
+    return {
+        "id": f"fake-{state['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "Fake counsellor reply."}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14},
+    }
+
+
+@app.post("/_faults")
+async def set_faults(request: Request):
+    body = await request.json()
+    state["actions"] = deque(body.get("actions", []))
+    state["latency"] = float(body.get("latency", state["latency"]))
+    return {"queued": len(state["actions"])}
+
+
+@app.get("/_stats")
+async def stats():
+    return {"requests": state["requests"]}
+
+
+def serve_in_thread(port: int) -> uvicorn.Server:
+    """Run the fake server on a daemon thread until it accepts connections"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]) if len(sys.argv) > 1 else 9000, log_level="info")
@@ -0,0 +1,253 @@
+"""
+Synthetic Data Generator
+Deterministically populates DATABASE_URL with users, profiles, universities,
+shortlists, tasks and LLM usage rows using realistic distributions
+- Same --seed and sizes always produce the same rows
+- Bulk multi-row INSERTs in batches; appends after existing IDs
+Usage (from Backend/):
+    python scripts/generate_data.py --users 100000 [--universities 2000] [--seed 42]
+Every generated user can log in as user<N>@example.com / password123
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, func, text  # noqa: E402
+
+from database import engine, is_postgres  # noqa: E402
+from models import (  # noqa: E402
+    Base, User, Profile, University, Shortlist, Task, LLMUsage,
+    DegreeLevelEnum, TaskStatusEnum,
+)
+from services.task_progress import rebuild_task_progress  # noqa: E402
+
+# bcrypt("password123"), computed once - hashing per user would dominate the run
+PASSWORD_HASH = "$2b$12$TQXphi9i1PW/oRrR2a1X1eCSHAybRyzxRUd0zO.4Su6.OZ80JLqk6"
+
+# country -> (share of universities / students, median tuition USD, cities)
+COUNTRIES = {
+    "USA": (0.38, 42000, ["Boston", "Austin", "Chicago", "Seattle", "Denver", "Atlanta", "Phoenix"]),
+    "UK": (0.18, 30000, ["London", "Manchester", "Leeds", "Glasgow", "Bristol", "Edinburgh"]),
+    "Canada": (0.14, 33000, ["Toronto", "Vancouver", "Montreal", "Calgary", "Ottawa"]),
+    "Germany": (0.10, 3000, ["Munich", "Berlin", "Aachen", "Hamburg", "Stuttgart"]),
+    "Australia": (0.10, 32000, ["Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide"]),
+    "Netherlands": (0.05, 16000, ["Delft", "Amsterdam", "Utrecht", "Leiden"]),
+    "Ireland": (0.05, 20000, ["Dublin", "Cork", "Galway"]),
+}
+NAME_PATTERNS = ["University of {city}", "{city} Institute of Technology", "{city} State University",
+                 "Technical University of {city}", "{city} College", "{city} Metropolitan University"]
+FIRST_NAMES = ["Aarav", "Ananya", "Chen", "Diego", "Fatima", "Hiro", "Isha", "Jonas", "Kwame", "Lena",
+               "Mei", "Noah", "Olga", "Priya", "Rahul", "Sara", "Tariq", "Yuki", "Zara", "Arjun"]
+LAST_NAMES = ["Sharma", "Wang", "Garcia", "Khan", "Tanaka", "Patel", "Muller", "Mensah", "Ivanova",
+              "Singh", "Kim", "Rossi", "Nguyen", "Silva", "Cohen", "Okafor", "Reddy", "Larsen"]
+DEGREE_WEIGHTS = [(DegreeLevelEnum.MASTERS, 0.70), (DegreeLevelEnum.BACHELORS, 0.20), (DegreeLevelEnum.PHD, 0.10)]
+# Journey stage mix of registered users (1=Onboarding ... 4=Applications)
+STAGE_WEIGHTS = [(1, 0.15), (2, 0.40), (3, 0.25), (4, 0.20)]
+TASK_TEMPLATES = [("Draft SOP for {name}", "Write your Statement of Purpose"),
+                  ("Upload Transcripts for {name}", "Prepare and upload official transcripts"),
+                  ("Request LORs for {name}", "Request 2-3 letters of recommendation")]
+LLM_MODELS = ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
+EPOCH = datetime(2025, 1, 1)
+
+
+def _weighted(rng: random.Random, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _clip(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def university_rows(rng: random.Random, count: int, first_id: int) -> List[Dict]:
+    countries = list(COUNTRIES)
+    shares = [COUNTRIES[c][0] for c in countries]
+    rankings = list(range(1, count + 1))
+    rng.shuffle(rankings)
+    rows = []
+    for i in range(count):
+        country = rng.choices(countries, weights=shares)[0]
+        _, median_tuition, cities = COUNTRIES[country]
+        city = rng.choice(cities)
+        ranking = rankings[i]
+        # Better-ranked schools are more selective (and a little pricier)
+        selectivity = ranking / count
+        rows.append({
+            "id": first_id + i,
+            "name": rng.choice(NAME_PATTERNS).format(city=f"{city} {first_id + i}"),
+            "country": country,
+            "acceptance_rate": round(_clip(rng.betavariate(2, 3) * 100 * (0.3 + selectivity), 2, 95), 1),
+            "tuition_fee": int(_clip(rng.lognormvariate(0, 0.25) * median_tuition * (1.3 - 0.5 * selectivity), 500, 90000)),
+            "ranking": ranking,
+            "location": city,
+        })
+    return rows
+
+
+def user_graph(rng: random.Random, count: int, first_ids: Dict[str, int],
+               universities: List[Dict]) -> Iterator[tuple]:
+    """Yield (table, row) for each user and everything that hangs off it"""
+    by_country: Dict[str, List[Dict]] = {}
+    for uni in universities:
+        by_country.setdefault(uni["country"], []).append(uni)
+    countries = list(COUNTRIES)
+    shares = [COUNTRIES[c][0] for c in countries]
+    shortlist_id, task_id, usage_id = first_ids["shortlists"], first_ids["tasks"], first_ids["llm_usage"]
+
+    for i in range(count):
+        user_id = first_ids["users"] + i
+        created = EPOCH + timedelta(minutes=rng.randrange(60 * 24 * 540))
+        yield User.__table__, {
+            "id": user_id,
+            "email": f"user{user_id}@example.com",
+            "password_hash": PASSWORD_HASH,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "created_at": created,
+        }
+
+        stage = _weighted(rng, STAGE_WEIGHTS)
+        complete = stage > 1
+        country = rng.choices(countries, weights=shares)[0]
+        yield Profile.__table__, {
+            "id": first_ids["profiles"] + i,
+            "user_id": user_id,
+            "gpa": round(_clip(rng.gauss(3.3, 0.4), 2.0, 4.0), 2) if complete or rng.random() < 0.5 else None,
+            "degree_level": _weighted(rng, DEGREE_WEIGHTS) if complete else None,
+            "budget": int(round(_clip(rng.lognormvariate(10.4, 0.5), 3000, 120000), -3)) if complete else None,
+            "target_country": country if complete else None,
+            "ielts_score": round(rng.choice([6.0, 6.5, 7.0, 7.5, 8.0]), 1) if rng.random() < 0.6 else None,
+            "gre_score": rng.randint(290, 335) if rng.random() < 0.4 else None,
+            "current_stage": stage,
+        }
+
+        if stage < 3 or not universities:
+            continue
+        # Mostly in the target country, some elsewhere
+        pool = by_country.get(country) or universities
+        picks = {}
+        for _ in range(rng.randint(1, 6)):
+            uni = rng.choice(pool) if rng.random() < 0.8 else rng.choice(universities)
+            picks[uni["id"]] = uni
+        locked_ids = set(list(picks)[:rng.randint(1, 2)]) if stage == 4 else set()
+        for uni_id, uni in picks.items():
+            locked = uni_id in locked_ids
+            locked_at = created + timedelta(days=rng.randint(1, 60)) if locked else None
+            yield Shortlist.__table__, {
+                "id": shortlist_id,
+                "user_id": user_id,
+                "university_id": uni_id,
+                "is_locked": locked,
+                "locked_at": locked_at,
+            }
+            shortlist_id += 1
+            if not locked:
+                continue
+            for title, description in TASK_TEMPLATES:
+                yield Task.__table__, {
+                    "id": task_id,
+                    "user_id": user_id,
+                    "university_id": uni_id,
+                    "title": title.format(name=uni["name"]),
+                    "description": description,
+                    "status": TaskStatusEnum.DONE if rng.random() < 0.4 else TaskStatusEnum.PENDING,
+                    "due_date": locked_at + timedelta(days=rng.randint(14, 120)),
+                    "created_at": locked_at,
+                }
+                task_id += 1
+
+        # Counsellor usage: heavier for users further along
+        for _ in range(int(rng.expovariate(1 / (3 * stage)))):
+            prompt_tokens = int(_clip(rng.gauss(1100, 250), 200, 4000))
+            yield LLMUsage.__table__, {
+                "id": usage_id,
+                "user_id": user_id,
+                "feature": "chat" if rng.random() < 0.85 else "task_assist",
+                "model": rng.choice(LLM_MODELS),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": int(_clip(rng.gauss(350, 150), 10, 1024)),
+                "latency_ms": int(_clip(rng.lognormvariate(7.2, 0.5), 100, 30000)),
+                "created_at": created + timedelta(minutes=rng.randrange(60 * 24 * 90)),
+            }
+            usage_id += 1
+
+
+async def _next_ids(conn) -> Dict[str, int]:
+    ids = {}
+    for model in (User, Profile, University, Shortlist, Task, LLMUsage):
+        max_id = (await conn.execute(select(func.max(model.id)))).scalar()
+        ids[model.__tablename__] = (max_id or 0) + 1
+    return ids
+
+
+async def populate(users: int, universities: int, seed: int = 42, batch_size: int = 5000) -> Dict[str, int]:
+    """Create tables if needed and append the generated rows; returns row counts per table"""
+    rng = random.Random(seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        first_ids = await _next_ids(conn)
+
+    counts: Dict[str, int] = {}
+    pending: Dict = {}
+
+    async def flush(conn, table):
+        rows = pending.pop(table, None)
+        if rows:
+            await conn.execute(insert(table), rows)
+            counts[table.name] = counts.get(table.name, 0) + len(rows)
+
+    uni_rows = university_rows(rng, universities, first_ids["universities"])
+    async with engine.begin() as conn:
+        for start in range(0, len(uni_rows), batch_size):
+            await conn.execute(insert(University.__table__), uni_rows[start:start + batch_size])
+        counts["universities"] = len(uni_rows)
+
+        # Parents are flushed before children so foreign keys always resolve
+        order = [User.__table__, Profile.__table__, Shortlist.__table__, Task.__table__, LLMUsage.__table__]
+        for table, row in user_graph(rng, users, first_ids, uni_rows):
+            rows = pending.setdefault(table, [])
+            rows.append(row)
+            if len(rows) >= batch_size:
+                for parent in order[:order.index(table) + 1]:
+                    await flush(conn, parent)
+        for table in order:
+            await flush(conn, table)
+        # Rows went in behind the API's back - recount the task counters
+        await rebuild_task_progress(conn)
+
+        if is_postgres:
+            # Explicit IDs bypass the serial sequences - move them past the new rows
+            for table in order + [University.__table__]:
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                ))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--universities", type=int, default=None, help="default: users / 50, at least 20")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    universities = args.universities if args.universities is not None else max(20, args.users // 50)
+
+    started = time.perf_counter()
+    counts = asyncio.run(populate(args.users, universities, args.seed, args.batch_size))
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:<14} {count:>10,}")
+    print(f"{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Local read replica for SQLite
+Copies the primary database file into a replica file every few seconds,
+simulating replication lag for DATABASE_READ_URL testing
+Usage (from Backend/):
+    python scripts/sqlite_replica.py ./counsellor.db ./counsellor-replica.db [interval_seconds]
+Then run the API with:
+    DATABASE_READ_URL=sqlite+aiosqlite:///./counsellor-replica.db
+"""
+import sqlite3
+import sys
+import time
+
+
+def sync(primary_path: str, replica_path: str):
+    """Consistent online copy via the SQLite backup API"""
+    primary = sqlite3.connect(primary_path)
+    replica = sqlite3.connect(replica_path)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    primary_path, replica_path = sys.argv[1], sys.argv[2]
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    print(f"Replicating {primary_path} -> {replica_path} every {interval}s (Ctrl+C to stop)")
+    while True:
+        sync(primary_path, replica_path)
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    main()
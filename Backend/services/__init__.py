@@ -1,6 +1,4 @@
 """
 Services Initialization
+Modules are imported where used (services.ai_engine pulls in the groq SDK lazily)
 """
-from . import ai_engine
-
-__all__ = ["ai_engine"]
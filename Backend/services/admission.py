@@ -0,0 +1,236 @@
+"""
+LLM Admission Control
+Global + per-user token buckets with a bounded wait queue
+Keeps Groq calls under the upstream rate limit; callers that would wait
+longer than the queue deadline are rejected immediately (HTTP 429)
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# Configuration (override via .env)
+LLM_ADMISSION_ENABLED = os.getenv("LLM_ADMISSION_ENABLED", "true").lower() == "true"
+LLM_GLOBAL_RATE_PER_SECOND = float(os.getenv("LLM_GLOBAL_RATE_PER_SECOND", "4"))
+LLM_GLOBAL_BURST = float(os.getenv("LLM_GLOBAL_BURST", "8"))
+LLM_USER_RATE_PER_MINUTE = float(os.getenv("LLM_USER_RATE_PER_MINUTE", "12"))
+LLM_USER_BURST = float(os.getenv("LLM_USER_BURST", "4"))
+LLM_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("LLM_MAX_QUEUE_WAIT_SECONDS", "8"))
+LLM_MAX_QUEUE_DEPTH = int(os.getenv("LLM_MAX_QUEUE_DEPTH", "64"))
+
+# Idle per-user buckets are pruned once this many are tracked
+_MAX_TRACKED_USERS = 10000
+
+
+class AdmissionRejected(Exception):
+    """Raised when an LLM call cannot be admitted within the queue deadline"""
+
+    def __init__(self, retry_after: int, scope: str):
+        super().__init__(f"LLM admission rejected ({scope}), retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+class TokenBucket:
+    """
+    Classic token bucket that allows reservations into the future
+    (tokens may go negative; the deficit is the queue ahead of the caller)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        # `now` may predate a bucket created during the same call
+        if now <= self.updated:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one more token is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def reserve(self):
+        self.tokens -= 1
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class AdmissionController:
+    """
+    Admits an LLM call once both the global and the user's bucket have a token
+    - Waiting callers sleep until their reserved slot (bounded queue)
+    - Callers whose wait would exceed max_wait, or who find the queue full,
+      are rejected with a Retry-After hint
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: float,
+        user_rate: float,
+        user_burst: float,
+        max_wait: float,
+        max_depth: int,
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_wait = max_wait
+        self.max_depth = max_depth
+        self._user_buckets: Dict[int, TokenBucket] = {}
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.admitted = 0
+        self.rejected_global = 0
+        self.rejected_user = 0
+        self.admitted_background = 0
+        self.rejected_background = 0
+        self.admitted_hedges = 0
+        self.rejected_hedges = 0
+        self._wait_samples = deque(maxlen=1000)
+
+    def _user_bucket(self, user_id: int, now: float) -> TokenBucket:
+        bucket = self._user_buckets.get(user_id)
+        if bucket is None:
+            if len(self._user_buckets) >= _MAX_TRACKED_USERS:
+                self._user_buckets = {
+                    uid: b for uid, b in self._user_buckets.items() if not b.is_idle(now)
+                }
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+            self._user_buckets[user_id] = bucket
+        return bucket
+
+    def acquire_background(self):
+        """
+        Admit low-priority work only from spare global capacity
+        (never queues, never spends the user's own budget)
+        """
+        now = time.monotonic()
+        wait = self.global_bucket.wait_time(now)
+        if wait > 0 or self.queue_depth > 0:
+            self.rejected_background += 1
+            raise AdmissionRejected(retry_after=max(1, math.ceil(wait)), scope="background")
+        self.global_bucket.reserve()
+        self.admitted_background += 1
+
+    def try_acquire(self, user_id: Optional[int] = None) -> bool:
+        """
+        Admit an optional extra call (a hedged request) only if both buckets
+        have a token right now - it never queues or delays anyone
+        """
+        now = time.monotonic()
+        user_bucket = self._user_bucket(user_id, now) if user_id is not None else None
+        if (self.queue_depth > 0 or self.global_bucket.wait_time(now) > 0
+                or (user_bucket is not None and user_bucket.wait_time(now) > 0)):
+            self.rejected_hedges += 1
+            return False
+        self.global_bucket.reserve()
+        if user_bucket:
+            user_bucket.reserve()
+        self.admitted_hedges += 1
+        return True
+
+    async def acquire(self, user_id: Optional[int] = None):
+        now = time.monotonic()
+        global_wait = self.global_bucket.wait_time(now)
+        user_bucket = self._user_bucket(user_id, now) if user_id is not None else None
+        user_wait = user_bucket.wait_time(now) if user_bucket else 0.0
+        wait = max(global_wait, user_wait)
+
+        if wait > self.max_wait or (wait > 0 and self.queue_depth >= self.max_depth):
+            scope = "user" if user_wait >= global_wait else "global"
+            if scope == "user":
+                self.rejected_user += 1
+            else:
+                self.rejected_global += 1
+            raise AdmissionRejected(retry_after=max(1, math.ceil(wait)), scope=scope)
+
+        self.global_bucket.reserve()
+        if user_bucket:
+            user_bucket.reserve()
+
+        if wait > 0:
+            self.queue_depth += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the slot back so the next caller does not wait for nobody
+                self.global_bucket.refund()
+                if user_bucket:
+                    user_bucket.refund()
+                raise
+            finally:
+                self.queue_depth -= 1
+
+        self.admitted += 1
+        self._wait_samples.append(wait)
+
+    def stats(self) -> Dict[str, any]:
+        samples = sorted(self._wait_samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            "enabled": LLM_ADMISSION_ENABLED,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "admitted": self.admitted,
+            "rejected_global": self.rejected_global,
+            "rejected_user": self.rejected_user,
+            "admitted_background": self.admitted_background,
+            "rejected_background": self.rejected_background,
+            "admitted_hedges": self.admitted_hedges,
+            "rejected_hedges": self.rejected_hedges,
+            "tracked_users": len(self._user_buckets),
+            "wait_ms_avg": round(1000 * sum(samples) / len(samples), 1) if samples else 0.0,
+            "wait_ms_p95": round(1000 * p95, 1),
+            "wait_ms_max": round(1000 * samples[-1], 1) if samples else 0.0,
+        }
+
+
+# Process-wide limiter shared by every LLM feature
+llm_admission = AdmissionController(
+    global_rate=LLM_GLOBAL_RATE_PER_SECOND,
+    global_burst=LLM_GLOBAL_BURST,
+    user_rate=LLM_USER_RATE_PER_MINUTE / 60.0,
+    user_burst=LLM_USER_BURST,
+    max_wait=LLM_MAX_QUEUE_WAIT_SECONDS,
+    max_depth=LLM_MAX_QUEUE_DEPTH,
+)
+
+
+async def admit_llm_call(user_id: Optional[int] = None, background: bool = False):
+    """Wait for an LLM slot or raise AdmissionRejected"""
+    if not LLM_ADMISSION_ENABLED:
+        return
+    if background:
+        llm_admission.acquire_background()
+    else:
+        await llm_admission.acquire(user_id)
+
+
+def try_admit_llm_call(user_id: Optional[int] = None, background: bool = False) -> bool:
+    """Non-blocking admission for an optional extra call (a hedge); False = skip it"""
+    if not LLM_ADMISSION_ENABLED:
+        return True
+    if background:
+        try:
+            llm_admission.acquire_background()
+        except AdmissionRejected:
+            return False
+        return True
+    return llm_admission.try_acquire(user_id)
@@ -1,32 +1,217 @@
 """
 AI Engine Service
 Groq API integration for intelligent chat (6GB RAM optimized)
-Uses Llama-3-8b-8192 via external API (no local model loading)
+Routes chat turns between a fast and a large Llama model via external API (no local model loading)
 """
+import asyncio
+import logging
 import os
-import re
-from typing import List, Dict, Optional
-from groq import Groq
+import time
+from typing import AsyncIterator, List, Dict, Optional
 
-# Lazy-load Groq client to avoid initialization errors
+from services.semantic_cache import answer_cache, is_cacheable_turn, SEMANTIC_CACHE_ENABLED
+from services.single_flight import SingleFlight, fingerprint
+from services.admission import AdmissionRejected, admit_llm_call, try_admit_llm_call
+from services.resilience import (
+    CircuitOpenError, get_resilient_caller, GROQ_DEADLINE_SECONDS, GROQ_REQUEST_DEADLINE_SECONDS,
+    GROQ_FALLBACK_MIN_SECONDS
+)
+from services.intent_classifier import intent_fast_path, WELCOME_MESSAGE, REFUSAL_MESSAGE
+from services.model_router import model_router, GROQ_LARGE_MODEL, GROQ_FAST_MODEL, LARGE_MODEL_MAX_TOKENS
+from services.catalog import CatalogSnapshot
+from services.catalog_matcher import matcher_for
+from services.prompt_context import select_universities, render_university_context, prompt_cache
+from services.usage import usage_recorder
+
+logger = logging.getLogger(__name__)
+
+# Lazy-load Groq client (and the groq SDK, ~0.4 s of imports) on first use
 _groq_client = None
 
 def get_groq_client():
-    """Get or initialize Groq client"""
+    """Get or initialize Groq client (async, so calls don't block the event loop)"""
     global _groq_client
     if _groq_client is None:
         api_key = os.getenv("GROQ_API_KEY", "")
         if not api_key:
             raise ValueError("GROQ_API_KEY environment variable not set")
-        _groq_client = Groq(api_key=api_key)
+        from groq import AsyncGroq
+        # Retries and timeouts are owned by services.resilience, not the SDK
+        _groq_client = AsyncGroq(api_key=api_key, max_retries=0, timeout=GROQ_DEADLINE_SECONDS)
     return _groq_client
 
 
+# Identical concurrent completions (double-clicks, retries) share one upstream call
+completion_flights = SingleFlight()
+
+
+def _remaining(deadline_at: Optional[float]) -> Optional[float]:
+    """Seconds left until deadline_at (None = no request deadline)"""
+    if deadline_at is None:
+        return None
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError("request deadline passed")
+    return remaining
+
+
+async def create_chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    user_id: Optional[int] = None,
+    background: bool = False,
+    feature: str = "chat",
+    deadline_at: Optional[float] = None
+):
+    """
+    Create a Groq chat completion, coalescing identical in-flight requests
+    Only the call that actually goes upstream is charged against admission control
+    and recorded (tokens + latency) under `feature` for usage accounting; a
+    hedged second request is admitted and recorded the same way
+    deadline_at (time.monotonic()) caps the call to what's left of the request
+    
+    Raises:
+        CircuitOpenError: upstream is unhealthy, fall back without calling it
+        asyncio.TimeoutError: the deadline passed (possibly while queued for admission)
+    """
+    request = {
+        "messages": messages,
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    
+    async def call_upstream():
+        caller = get_resilient_caller(model)
+        caller.raise_if_open()
+        await admit_llm_call(user_id, background=background)
+        client = get_groq_client()
+        
+        async def attempt():
+            # Recorded per completed attempt: a hedge that also finished is billed too
+            started = time.monotonic()
+            completion = await client.chat.completions.create(**request)
+            usage_recorder.record(user_id, feature, model, getattr(completion, "usage", None),
+                                  time.monotonic() - started)
+            return completion
+        
+        # A hedged second request goes through the same buckets (skipped if none is free)
+        return await caller.call(
+            attempt,
+            admit_hedge=lambda: try_admit_llm_call(user_id, background=background),
+            timeout=_remaining(deadline_at),
+        )
+    
+    return await completion_flights.do(fingerprint(request), call_upstream)
+
+
+async def open_chat_stream(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    user_id: Optional[int] = None,
+    feature: str = "chat",
+    deadline_at: Optional[float] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of create_chat_completion: returns once Groq has
+    accepted the request, then yields text deltas
+    - Admission and circuit breaker apply as for a normal completion; no
+      single-flight (every stream is its own upstream call)
+    - Closing the iterator early (cancellation) closes the upstream stream
+    - deadline_at caps the time to open the stream, as for completions
+    
+    Raises:
+        CircuitOpenError: upstream is unhealthy, fall back without calling it
+    """
+    caller = get_resilient_caller(model)
+    caller.raise_if_open()
+    await admit_llm_call(user_id)
+    client = get_groq_client()
+    started = time.monotonic()
+    stream = await caller.open_stream(lambda: client.chat.completions.create(
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    ), timeout=_remaining(deadline_at))
+    return _stream_deltas(stream, user_id, feature, model, started)
+
+
+async def _stream_deltas(stream, user_id: Optional[int], feature: str, model: str, started: float):
+    usage = None
+    try:
+        async for chunk in stream:
+            # Groq reports usage on the final chunk
+            x_groq = getattr(chunk, "x_groq", None)
+            if getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        usage_recorder.record(user_id, feature, model, usage, time.monotonic() - started)
+        await stream.close()
+
+
+class RenderCardFilter:
+    """Strips [RENDER_CARD: ...] tags from streamed text, even when a tag spans chunks"""
+    
+    _TAG = "[RENDER_CARD:"
+    
+    def __init__(self):
+        self.cards: List[str] = []
+        self._pending = ""
+    
+    def feed(self, text: str) -> str:
+        """Clean text that is safe to emit now (a possible tag start is held back)"""
+        buffer = self._pending + text
+        self._pending = ""
+        out = []
+        while buffer:
+            start = buffer.find("[")
+            if start == -1:
+                out.append(buffer)
+                break
+            out.append(buffer[:start])
+            rest = buffer[start:]
+            if rest.startswith(self._TAG):
+                end = rest.find("]")
+                if end == -1:
+                    self._pending = rest
+                    break
+                self.cards.append(rest[len(self._TAG):end].strip())
+                buffer = rest[end + 1:]
+            elif self._TAG.startswith(rest):
+                self._pending = rest
+                break
+            else:
+                out.append("[")
+                buffer = rest[1:]
+        return "".join(out)
+    
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+def extract_render_cards(text: str) -> tuple[str, List[str]]:
+    """(text without [RENDER_CARD: ...] tags, tagged names) - same scan as the streaming path"""
+    tag_filter = RenderCardFilter()
+    cleaned = tag_filter.feed(text) + tag_filter.flush()
+    return cleaned.strip(), tag_filter.cards
+
+
 def build_system_prompt(gpa: Optional[float], budget: Optional[int], 
-                        degree_level: Optional[str], target_country: Optional[str]) -> str:
+                        degree_level: Optional[str], target_country: Optional[str],
+                        university_context: str = "") -> str:
     """
     Dynamically construct system prompt with user context
     THE BRAIN: Profile-aware AI counsellor instructions with STRICT domain enforcement
+    university_context: profile-filtered catalog listing (see services.prompt_context)
     """
     return f"""ROLE: You are an elite AI Study Abroad Strategist. Your ONLY goal is to help users secure admission into top universities.
 
@@ -43,7 +228,7 @@ STRICT GUARDRAILS (CRITICAL - MUST ENFORCE):
 2. REFUSAL PROTOCOL (NON-NEGOTIABLE):
    If the user asks about ANYTHING outside the above domains (cooking, sports, entertainment, general coding, life advice, current events, etc.), you MUST respond with:
    
-   "My database is optimized strictly for Global Admissions Strategy. I cannot assist with non-academic queries. Let's refocus on your application goals—what universities or countries are you considering?"
+   "{REFUSAL_MESSAGE}"
    
    ❌ NEVER say: "I'm not a chef but here's a recipe..."
    ❌ NEVER attempt to answer off-topic questions even partially.
@@ -53,7 +238,6 @@ BEHAVIORAL INSTRUCTIONS:
 • Tone: Professional, precise, data-driven, and high-agency. Be encouraging yet realistic.
 • Profile-Aware: Base ALL advice on the user's specific profile (GPA, Budget, Degree Level, Target Country).
 • Actionable Output: Provide bulleted lists with concrete university names, acceptance probabilities, and next steps.
-• Markdown Format: Use **bold** for categories, bullet points for lists, and clear structure.
 
 USER PROFILE:
 - GPA: {gpa if gpa else 'Not provided'}
@@ -61,47 +245,9 @@ USER PROFILE:
 - Degree Level: {degree_level if degree_level else 'Not specified'}
 - Target Country: {target_country if target_country else 'Any'}
 
-UNIVERSITY DATABASE (Use these real universities in your recommendations):
-
-USA - Computer Science/Engineering:
-- MIT (Tuition: $57,986, Accept Rate: 4%)
-- Stanford University (Tuition: $56,169, Accept Rate: 4%)
-- Carnegie Mellon (Tuition: $58,924, Accept Rate: 13%)
-- UC Berkeley (Tuition: $14,312 in-state/$44,066 out-of-state, Accept Rate: 11%)
-- Georgia Tech (Tuition: $12,682 in-state/$33,794 out-of-state, Accept Rate: 17%)
-- University of Illinois Urbana-Champaign (Tuition: $34,316, Accept Rate: 45%)
-- Purdue University (Tuition: $28,794, Accept Rate: 53%)
-- Arizona State University (Tuition: $29,438, Accept Rate: 88%)
-- University of Texas at Dallas (Tuition: $24,516, Accept Rate: 87%)
-- San Jose State University (Tuition: $19,622, Accept Rate: 70%)
-
-USA - Business/MBA:
-- Harvard Business School (Tuition: $74,000, Accept Rate: 11%)
-- Wharton (Tuition: $84,874, Accept Rate: 21%)
-- Indiana University Kelley (Tuition: $27,000, Accept Rate: 35%)
-- Arizona State W.P. Carey (Tuition: $29,000, Accept Rate: 45%)
-
-UK:
-- University of Oxford (Tuition: £32,000, Accept Rate: 14%)
-- Imperial College London (Tuition: £35,100, Accept Rate: 12%)
-- University of Manchester (Tuition: £27,000, Accept Rate: 58%)
-- University of Birmingham (Tuition: £25,740, Accept Rate: 77%)
-
-Canada:
-- University of Toronto (Tuition: CAD$58,160, Accept Rate: 43%)
-- University of British Columbia (Tuition: CAD$42,803, Accept Rate: 52%)
-- University of Waterloo (Tuition: CAD$54,200, Accept Rate: 53%)
-
-Germany (Low-cost options):
-- TU Munich (Tuition: ~€300/semester, Accept Rate: 8%)
-- RWTH Aachen (Tuition: ~€300/semester, Accept Rate: 30%)
-- TU Berlin (Tuition: ~€300/semester, Accept Rate: 25%)
+UNIVERSITY DATABASE (Prefer these universities in your recommendations; tuition in USD/year):
+{university_context}
 
-RULES:
-1. ALWAYS list actual university names with specific details (tuition, acceptance rate).
-2. Categorize suggestions into:
-   - **Reach Schools** (acceptance rate < 20% or GPA requirement higher than user's)
-   - **Match Schools** (acceptance rate 20-60%, realistic based on profile)
 RULES:
 1. ALWAYS list actual university names with specific details (tuition, acceptance rate).
 2. Categorize suggestions into:
@@ -109,27 +255,94 @@ RULES:
    - **Match Schools** (acceptance rate 20-60%, realistic based on profile)
    - **Safety Schools** (acceptance rate > 60%, good chance of admission)
 3. Be realistic about budget constraints. If budget is ${budget}, exclude universities clearly over budget.
-4. Use markdown formatting: **bold** for headers, bullet points for lists.
+4. Use markdown: **bold** for headers and categories, bullet points for university lists.
 5. If test scores (GRE/IELTS/TOEFL) are missing, mention they're typically required.
 6. Give specific, actionable advice. No generic platitudes.
 7. ENFORCE DOMAIN RESTRICTION: Refuse any off-topic queries immediately with the refusal protocol.
 
 INITIAL GREETING (First interaction only):
 If this is the user's first message or a greeting like "Hi" or "Hello", respond warmly but briefly:
-"Welcome! I'm your AI Admissions Strategist. I'll help you identify the best universities for your profile and maximize your acceptance chances. What's your target degree or country?"
-
-OUTPUT FORMAT:
-Use proper markdown:
-- **Bold** for categories and important terms
-- Bullet points for university lists
-- Include tuition and acceptance rate for each suggestion
+"{WELCOME_MESSAGE}"
 """
 
 
+def get_system_prompt(user_profile: Dict[str, any], catalog: Optional[CatalogSnapshot]) -> str:
+    """
+    System prompt for a profile, rendered once per (profile fields, catalog version)
+    """
+    gpa = user_profile.get("gpa")
+    budget = user_profile.get("budget")
+    degree_level = user_profile.get("degree_level")
+    target_country = user_profile.get("target_country")
+    
+    key = (gpa, budget, degree_level, target_country, catalog.version if catalog else 0)
+    prompt = prompt_cache.get(key)
+    if prompt is None:
+        entries = select_universities(catalog, target_country, budget) if catalog else []
+        prompt = build_system_prompt(
+            gpa=gpa,
+            budget=budget,
+            degree_level=degree_level,
+            target_country=target_country,
+            university_context=render_university_context(entries)
+        )
+        prompt_cache.put(key, prompt)
+    return prompt
+
+
+def build_messages(
+    message: str,
+    history: List[Dict[str, str]],
+    user_profile: Dict[str, any],
+    catalog: Optional[CatalogSnapshot]
+) -> List[Dict[str, str]]:
+    """System prompt with user context, recent history, then the new message"""
+    messages = [{"role": "system", "content": get_system_prompt(user_profile, catalog)}]
+    
+    # Add conversation history (limit to last 10 messages for context window)
+    for msg in history[-10:]:
+        messages.append(msg)
+    
+    # Add current message
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+async def _routed_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    max_tokens: int,
+    user_id: Optional[int],
+    deadline_at: Optional[float] = None
+):
+    """Chat completion on a routed model, recording its latency"""
+    started = time.monotonic()
+    chat_completion = await create_chat_completion(
+        messages=messages,
+        model=model,
+        temperature=0.7,
+        max_tokens=max_tokens,
+        user_id=user_id,
+        deadline_at=deadline_at,
+    )
+    model_router.record_latency(model, time.monotonic() - started)
+    return chat_completion
+
+
+def _fallback_has_time(deadline_at: float) -> bool:
+    """Enough of the request deadline left to try the fast model"""
+    if deadline_at - time.monotonic() >= GROQ_FALLBACK_MIN_SECONDS:
+        return True
+    model_router.skip_fallback()
+    return False
+
+
 async def get_ai_response(
     message: str,
     history: List[Dict[str, str]],
-    user_profile: Dict[str, any]
+    user_profile: Dict[str, any],
+    user_id: Optional[int] = None,
+    catalog: Optional[CatalogSnapshot] = None
 ) -> tuple[str, List[str]]:
     """
     Get AI response from Groq API
@@ -138,72 +351,172 @@ async def get_ai_response(
         message: User's current message
         history: Previous conversation (list of {"role": "user/assistant", "content": "..."})
         user_profile: Dict with gpa, budget, degree_level, target_country
+        user_id: Caller's user ID (per-user admission control)
+        catalog: University catalog the prompt's university context is drawn from
     
     Returns:
         (response_text, render_cards_list)
+    
+    Raises:
+        AdmissionRejected: LLM capacity exhausted beyond the queue deadline
     """
+    # Greetings and off-topic queries get their canned reply without a Groq call
+    canned = intent_fast_path.answer(message, history, matcher_for(catalog) if catalog else None)
+    if canned is not None:
+        return canned, []
+    
+    # Reuse answers to near-duplicate standalone questions (similar profiles only)
+    use_cache = SEMANTIC_CACHE_ENABLED and is_cacheable_turn(history)
+    if use_cache:
+        cached = answer_cache.lookup(message, user_profile, catalog)
+        if cached is not None:
+            return cached
+    
     try:
-        # Build system prompt with user context
-        system_prompt = build_system_prompt(
-            gpa=user_profile.get("gpa"),
-            budget=user_profile.get("budget"),
-            degree_level=user_profile.get("degree_level"),
-            target_country=user_profile.get("target_country")
-        )
+        messages = build_messages(message, history, user_profile, catalog)
         
-        # Prepare messages
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history (limit to last 10 messages for context window)
-        for msg in history[-10:]:
-            messages.append(msg)
-        
-        # Add current message
-        messages.append({"role": "user", "content": message})
-        
-        # Call Groq API
-        client = get_groq_client()
-        chat_completion = client.chat.completions.create(
-            messages=messages,
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=1024,
-        )
+        # Call Groq API (fast model for simple turns, large model otherwise)
+        # One deadline covers the routed call and any fallback
+        deadline_at = time.monotonic() + GROQ_REQUEST_DEADLINE_SECONDS
+        route = model_router.route(message, history)
+        try:
+            chat_completion = await _routed_completion(messages, route.model, route.max_tokens, user_id, deadline_at)
+        except AdmissionRejected:
+            raise
+        except Exception:
+            if route.model == GROQ_FAST_MODEL or not _fallback_has_time(deadline_at):
+                raise
+            # Large model failing - answer with the fast model instead of going offline
+            route = model_router.fallback()
+            chat_completion = await _routed_completion(messages, route.model, route.max_tokens, user_id, deadline_at)
         
         response_text = chat_completion.choices[0].message.content
         
-        # Extract university cards (if AI mentioned [RENDER_CARD: UniName])
-        render_cards = re.findall(r'\[RENDER_CARD:\s*([^\]]+)\]', response_text)
+        # Extract university cards (if AI mentioned [RENDER_CARD: UniName]) and remove the tags
+        cleaned_response, render_cards = extract_render_cards(response_text)
         
-        # Clean response (remove the tags)
-        cleaned_response = re.sub(r'\[RENDER_CARD:[^\]]+\]', '', response_text).strip()
+        if use_cache:
+            answer_cache.store(message, user_profile, cleaned_response, render_cards, catalog)
         
         return cleaned_response, render_cards
         
-    except Exception as e:
+    except AdmissionRejected:
+        raise
+    except CircuitOpenError:
+        # Upstream known to be unhealthy - fail fast without a traceback per request
+        return (
+            "System Offline: I'm temporarily unavailable. Please try again in a moment.",
+            []
+        )
+    except Exception:
         # Fallback response if Groq API fails
-        print(f"❌ AI ENGINE ERROR: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("AI engine error", extra={"user_id": user_id})
         return (
             "System Offline: I'm temporarily unavailable. Please try again in a moment.",
             []
         )
 
 
-async def generate_task_assistance(task_title: str, user_profile: Dict[str, any]) -> str:
+async def stream_ai_response(
+    message: str,
+    history: List[Dict[str, str]],
+    user_profile: Dict[str, any],
+    render_cards: List[str],
+    user_id: Optional[int] = None,
+    catalog: Optional[CatalogSnapshot] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming get_ai_response: yields the reply as text deltas
+    - Same fast path, semantic cache, model routing and fallback; the fallback
+      to the fast model only happens before the first token
+    - [RENDER_CARD: ...] tags are stripped from the stream and appended to
+      render_cards
+    
+    Raises:
+        AdmissionRejected: LLM capacity exhausted beyond the queue deadline
+    """
+    canned = intent_fast_path.answer(message, history, matcher_for(catalog) if catalog else None)
+    if canned is not None:
+        yield canned
+        return
+    
+    use_cache = SEMANTIC_CACHE_ENABLED and is_cacheable_turn(history)
+    if use_cache:
+        cached = answer_cache.lookup(message, user_profile, catalog)
+        if cached is not None:
+            text, cards = cached
+            render_cards.extend(cards)
+            yield text
+            return
+    
+    tag_filter = RenderCardFilter()
+    streamed = []
+    try:
+        messages = build_messages(message, history, user_profile, catalog)
+        deadline_at = time.monotonic() + GROQ_REQUEST_DEADLINE_SECONDS
+        route = model_router.route(message, history)
+        try:
+            deltas = await open_chat_stream(messages, route.model, 0.7, route.max_tokens, user_id,
+                                            deadline_at=deadline_at)
+        except AdmissionRejected:
+            raise
+        except Exception:
+            if route.model == GROQ_FAST_MODEL or not _fallback_has_time(deadline_at):
+                raise
+            route = model_router.fallback()
+            deltas = await open_chat_stream(messages, route.model, 0.7, route.max_tokens, user_id,
+                                            deadline_at=deadline_at)
+        
+        started = time.monotonic()
+        async for delta in deltas:
+            clean = tag_filter.feed(delta)
+            if clean:
+                streamed.append(clean)
+                yield clean
+        tail = tag_filter.flush()
+        if tail:
+            streamed.append(tail)
+            yield tail
+        model_router.record_latency(route.model, time.monotonic() - started)
+        
+        render_cards.extend(tag_filter.cards)
+        if use_cache:
+            answer_cache.store(message, user_profile, "".join(streamed).strip(), tag_filter.cards, catalog)
+    
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        if streamed:
+            raise  # part of the reply is already out - let the caller report it
+        if not isinstance(e, CircuitOpenError):
+            logger.exception("AI engine stream error", extra={"user_id": user_id})
+        yield "System Offline: I'm temporarily unavailable. Please try again in a moment."
+
+
+async def generate_task_assistance(
+    task_title: str,
+    user_profile: Dict[str, any],
+    user_id: Optional[int] = None,
+    background: bool = False
+) -> str:
     """
     Generate AI assistance for a specific task
     
     Args:
         task_title: The task the user needs help with (e.g., "Draft SOP")
         user_profile: User's profile data
+        user_id: Caller's user ID (per-user admission control)
+        background: Pre-generation - only runs on spare LLM capacity
     
     Returns:
         AI-generated guidance/template
+    
+    Raises:
+        AdmissionRejected: LLM capacity exhausted beyond the queue deadline
+        Exception: any upstream failure (the job queue records it as failed,
+            so a canned fallback is never persisted as the task's result)
     """
-    try:
-        prompt = f"""You are helping a student with: "{task_title}"
+    prompt = f"""You are helping a student with: "{task_title}"
 
 Student Profile:
 - GPA: {user_profile.get('gpa', 'Not provided')}
@@ -212,16 +525,15 @@ Student Profile:
 
 Provide a structured template or step-by-step guidance for this task. Be specific and actionable.
 """
-        
-        client = get_groq_client()
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
-            temperature=0.8,
-            max_tokens=1024,
-        )
-        
-        return chat_completion.choices[0].message.content
-        
-    except Exception as e:
-        return "I'm unable to generate assistance right now. Please try again later."
+    
+    chat_completion = await create_chat_completion(
+        messages=[{"role": "user", "content": prompt}],
+        model=GROQ_LARGE_MODEL,
+        temperature=0.8,
+        max_tokens=LARGE_MODEL_MAX_TOKENS,
+        user_id=user_id,
+        background=background,
+        feature="task_assist",
+    )
+    
+    return chat_completion.choices[0].message.content
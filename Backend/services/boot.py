@@ -0,0 +1,165 @@
+"""
+Boot Profile
+Cold-start bookkeeping for the API process
+- ImportTimer: a built-in `python -X importtime` summary (self and cumulative
+  time per import statement), recorded from the top of main.py until startup
+  completes; served on /metrics under "boot"
+- Heavy SDKs (groq, httpx, jose, bcrypt) are imported on first use instead
+  of at boot; BOOT_WARMUP=true imports them (and loads the catalog) in the
+  background once the app is already serving
+"""
+import asyncio
+import builtins
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Configuration (override via .env)
+BOOT_IMPORT_PROFILE = os.getenv("BOOT_IMPORT_PROFILE", "true").lower() == "true"
+BOOT_IMPORT_REPORT_TOP = int(os.getenv("BOOT_IMPORT_REPORT_TOP", "15"))
+BOOT_WARMUP = os.getenv("BOOT_WARMUP", "false").lower() == "true"
+
+# Imported lazily by the code that needs them; BOOT_WARMUP preloads them
+DEFERRED_MODULES = ("groq", "httpx", "jose.jwt", "bcrypt")
+
+
+class ImportTimer:
+    """
+    Times import statements by wrapping builtins.__import__
+    - Only statements that loaded new modules are recorded
+    - self time excludes nested imports, cumulative includes them
+    """
+
+    def __init__(self):
+        self._original = None
+        self._hook = self._import  # one bound method, so stop() can recognise it
+        self._active = False
+        self._local = threading.local()
+        self.modules: Dict[str, List[float]] = {}  # name -> [self, cumulative] seconds
+        self.top_level_seconds = 0.0
+
+    def start(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._hook
+        self._active = True
+
+    def stop(self):
+        self._active = False
+        # Unhook unless something wrapped __import__ after us (then pass through)
+        if builtins.__import__ is self._hook:
+            builtins.__import__ = self._original
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if not self._active:
+            return self._original(name, globals, locals, fromlist, level)
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._local.active = {}
+        active = self._local.active
+        key = self._module_name(name, globals, fromlist, level)
+        # A package re-importing itself mid-load must not count its time twice
+        outermost = key not in active
+        active[key] = active.get(key, 0) + 1
+        loaded_before = len(sys.modules)
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            else:
+                self.top_level_seconds += elapsed
+            active[key] -= 1
+            if not active[key]:
+                del active[key]
+            if len(sys.modules) > loaded_before:
+                entry = self.modules.setdefault(key, [0.0, 0.0])
+                entry[0] += elapsed - nested
+                if outermost:
+                    entry[1] += elapsed
+
+    @staticmethod
+    def _module_name(name, globals, fromlist, level) -> str:
+        if not level:
+            return name
+        try:
+            resolved = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+        except (ImportError, ValueError):
+            return name
+        # "from . import a, b" loads submodules, not the (already importing) package
+        return f"{resolved}.{{{','.join(fromlist)}}}" if not name and fromlist else resolved
+
+    def slowest(self, top: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self.modules.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return [
+            {"module": name, "cumulative_ms": round(cumulative * 1000, 1), "self_ms": round(own * 1000, 1)}
+            for name, (own, cumulative) in ranked
+        ]
+
+
+class BootProfile:
+    """Import report plus boot timings for this worker"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timer: Optional[ImportTimer] = ImportTimer() if BOOT_IMPORT_PROFILE else None
+        self.ready_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._report: Dict[str, Any] = {}
+
+    def start(self):
+        if self.timer is not None:
+            self.timer.start()
+
+    def ready(self) -> Dict[str, Any]:
+        """Startup complete: stop timing imports and freeze the report"""
+        self.ready_seconds = time.perf_counter() - self.started_at
+        self._report = {"ready_seconds": round(self.ready_seconds, 3)}
+        if self.timer is not None:
+            self.timer.stop()
+            self._report.update({
+                "import_seconds": round(self.timer.top_level_seconds, 3),
+                "modules_loaded": len(self.timer.modules),
+                "slowest_imports": self.timer.slowest(BOOT_IMPORT_REPORT_TOP),
+            })
+        return self._report
+
+    def deferred_loaded(self) -> List[str]:
+        return [name for name in DEFERRED_MODULES if name in sys.modules]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._report,
+            "warmup_enabled": BOOT_WARMUP,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "deferred_modules_loaded": self.deferred_loaded(),
+        }
+
+
+async def warm_up():
+    """
+    Optional (BOOT_WARMUP): pay first-use costs after the app is healthy
+    - imports the deferred SDKs in a thread so the event loop keeps serving
+    - loads the catalog snapshot chat and recommendations read
+    """
+    started = time.perf_counter()
+    for name in DEFERRED_MODULES:
+        await asyncio.to_thread(importlib.import_module, name)
+
+    from database import AsyncSessionLocal
+    from services.catalog import get_catalog
+    async with AsyncSessionLocal() as db:
+        await get_catalog(db)
+    boot_profile.warmup_seconds = time.perf_counter() - started
+
+
+boot_profile = BootProfile()
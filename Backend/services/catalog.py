@@ -0,0 +1,252 @@
+"""
+University Catalog Snapshot
+Versioned in-memory copy of the `universities` table
+- Reloaded only when the table changes (row count / max id / sum of
+  row_version fingerprint, so in-place UPDATEs count too), checked at most
+  every CATALOG_REFRESH_SECONDS, or after invalidate_catalog()
+- Derived structures (matchers, indexes) rebuild when `version` moves
+- With CATALOG_SHARED_MEMORY, rows live in one mmap'd image shared by all
+  workers (services.shared_catalog) and `version` is its generation
+"""
+import asyncio
+import os
+import re
+import time
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import University
+from services import shared_catalog
+from services.shared_catalog import CATALOG_SHARED_MEMORY, SharedCatalogIndex
+
+# Configuration (override via .env)
+CATALOG_REFRESH_SECONDS = float(os.getenv("CATALOG_REFRESH_SECONDS", "60"))
+
+# Common names students use that can't be derived from the official name
+_CURATED_ALIASES: Dict[str, List[str]] = {
+    "MIT": ["Massachusetts Institute of Technology"],
+    "Stanford University": ["Stanford"],
+    "Harvard University": ["Harvard"],
+    "Princeton University": ["Princeton"],
+    "University of California, Berkeley": ["UC Berkeley", "Berkeley"],
+    "University of Michigan": ["UMich", "Michigan Ann Arbor"],
+    "University of Texas at Austin": ["UT Austin"],
+    "Georgia Institute of Technology": ["Georgia Tech", "GaTech"],
+    "Arizona State University": ["ASU"],
+    "University of Illinois Chicago": ["UIC"],
+    "Carnegie Mellon University": ["Carnegie Mellon", "CMU"],
+    "Imperial College London": ["Imperial", "Imperial College"],
+    "King's College London": ["KCL", "Kings College London"],
+    "University of Toronto": ["UofT", "U of T"],
+    "Technical University of Munich": ["TU Munich", "TU Munchen", "TU München", "TUM"],
+    "University of Heidelberg": ["Heidelberg University"],
+}
+
+_NAME_PREFIX = re.compile(r"^(the )?(university of|university college)\s+", re.IGNORECASE)
+_NAME_SUFFIX = re.compile(r"\s+(university|college)$", re.IGNORECASE)
+_ACRONYM_STOPWORDS = {"of", "the", "at", "and", "in", "for"}
+
+
+class CatalogEntry(NamedTuple):
+    id: int
+    name: str
+    country: str
+    acceptance_rate: float
+    tuition_fee: int
+    ranking: Optional[int]
+    location: Optional[str]
+
+
+# Curated aliases that are also ordinary words - matched only next to a university cue
+_CUE_ONLY_ALIASES = {"Imperial"}
+
+# Uppercase tokens that are never a university (countries, tests, degrees)
+_ACRONYM_STOPLIST = {
+    "USA", "US", "UK", "UAE", "EU", "GPA", "GRE", "GMAT", "IELTS", "TOEFL", "SOP", "LOR",
+    "MBA", "PHD", "MS", "MSC", "BSC", "STEM", "OPT", "CS", "AI", "ML", "IT", "ROI",
+}
+
+# How CatalogMatcher matches an alias in free text
+MATCH_ANY_CASE = "any_case"  # case-insensitive whole words
+MATCH_EXACT = "exact"        # acronyms: case-sensitive whole token ("UBC", not "ubc")
+MATCH_WITH_CUE = "with_cue"  # places/common words: only after "University of", "at", ...
+
+
+def _alias_candidates(name: str) -> List[Tuple[str, str]]:
+    """(alias, source) with source "curated", "acronym" or "short"/"place" (distinctive part)"""
+    candidates = [(alias, "curated") for alias in _CURATED_ALIASES.get(name, [])]
+
+    words = re.findall(r"[A-Za-z][A-Za-z']*", name)
+    initials = "".join(w[0] for w in words if w.lower() not in _ACRONYM_STOPWORDS)
+    if len(initials) >= 3:
+        candidates.append((initials.upper(), "acronym"))
+
+    # "University of X" names a place; "X University" usually a proper name
+    without_prefix = _NAME_PREFIX.sub("", name)
+    short = _NAME_SUFFIX.sub("", without_prefix).strip(" ,")
+    if short and short.lower() != name.lower() and len(short) >= 4:
+        candidates.append((short, "place" if without_prefix != name else "short"))
+
+    seen = {name.lower()}
+    unique = []
+    for alias, source in candidates:
+        if alias.lower() not in seen:
+            seen.add(alias.lower())
+            unique.append((alias, source))
+    return unique
+
+
+def derive_aliases(name: str) -> List[str]:
+    """
+    Alternative spellings for a university name
+    - curated aliases, acronym ("University of British Columbia" -> "UBC"),
+      and the distinctive part of the name ("University of Oxford" -> "Oxford")
+    """
+    return [alias for alias, _ in _alias_candidates(name)]
+
+
+def _is_acronym(text: str) -> bool:
+    return text.isupper() and " " not in text
+
+
+def mention_patterns(name: str, location: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    (pattern, match mode) for spotting a university in chat text
+    - the official name and multi-word aliases match in any case
+    - acronyms match case-sensitively ("git" is not Georgia Tech) and
+      never when they are a country/test/degree ("USA")
+    - a bare place or common word ("Toronto", "Michigan", "Cambridge",
+      "Imperial") needs a university cue next to it
+    """
+    patterns = [(name, MATCH_EXACT if _is_acronym(name) else MATCH_ANY_CASE)]
+    for alias, source in _alias_candidates(name):
+        if _is_acronym(alias):
+            if alias not in _ACRONYM_STOPLIST:
+                patterns.append((alias, MATCH_EXACT))
+        elif alias in _CUE_ONLY_ALIASES or source == "place" or (
+            location and alias.lower() == location.lower()
+        ):
+            patterns.append((alias, MATCH_WITH_CUE))
+        else:
+            patterns.append((alias, MATCH_ANY_CASE))
+    return patterns
+
+
+def calculate_match_tier(acceptance_rate: float) -> str:
+    """
+    Calculate university match tier based on acceptance rate
+    Logic:
+    - Safe: acceptance_rate > 60%
+    - Target: 30% <= acceptance_rate <= 60%
+    - Dream: acceptance_rate < 30%
+    """
+    if acceptance_rate > 60:
+        return "Safe"
+    elif acceptance_rate >= 30:
+        return "Target"
+    else:
+        return "Dream"
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version"""
+
+    def __init__(
+        self,
+        version: int,
+        entries: Sequence[CatalogEntry],
+        by_id: Optional[Mapping[int, CatalogEntry]] = None
+    ):
+        self.version = version
+        self.entries = entries
+        self.by_id = by_id if by_id is not None else {entry.id: entry for entry in entries}
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class CatalogStore:
+    """Process-wide catalog cache keyed on a cheap table fingerprint"""
+
+    def __init__(self):
+        self._snapshot = CatalogSnapshot(0, [])
+        self._fingerprint: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+        self.attaches = 0
+
+    def invalidate(self):
+        self._checked_at = 0.0
+        self._fingerprint = None
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        if time.monotonic() - self._checked_at < CATALOG_REFRESH_SECONDS:
+            return self._snapshot
+        async with self._lock:
+            if time.monotonic() - self._checked_at < CATALOG_REFRESH_SECONDS:
+                return self._snapshot
+            result = await db.execute(select(
+                func.count(University.id), func.max(University.id), func.sum(University.row_version)
+            ))
+            count, max_id, versions = result.one()
+            fingerprint = (count or 0, max_id or 0, int(versions or 0))
+            if fingerprint != self._fingerprint:
+                if CATALOG_SHARED_MEMORY:
+                    await self._attach_shared(db, fingerprint)
+                else:
+                    entries = await self._load_entries(db)
+                    self._snapshot = CatalogSnapshot(self._snapshot.version + 1, entries)
+                    self.reloads += 1
+                self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    async def _load_entries(self, db: AsyncSession) -> List[CatalogEntry]:
+        result = await db.execute(
+            select(
+                University.id,
+                University.name,
+                University.country,
+                University.acceptance_rate,
+                University.tuition_fee,
+                University.ranking,
+                University.location,
+            ).order_by(University.id)
+        )
+        return [CatalogEntry(*row) for row in result.all()]
+
+    async def _attach_shared(self, db: AsyncSession, fingerprint: Tuple[int, int, int]):
+        """Attach to the image another worker published, or build and publish it"""
+        view = shared_catalog.attach()
+        if view is None or view.fingerprint != fingerprint:
+            entries = await self._load_entries(db)
+            view = await asyncio.to_thread(shared_catalog.publish, entries, fingerprint)
+            self.reloads += 1
+        else:
+            self.attaches += 1
+        self._snapshot = CatalogSnapshot(view.generation, view, SharedCatalogIndex(view))
+
+    def stats(self) -> Dict[str, any]:
+        return {
+            "version": self._snapshot.version,
+            "universities": len(self._snapshot),
+            "reloads": self.reloads,
+            "shared_memory": CATALOG_SHARED_MEMORY,
+            "shared_attaches": self.attaches,
+        }
+
+
+# Process-wide catalog
+catalog_store = CatalogStore()
+
+
+async def get_catalog(db: AsyncSession) -> CatalogSnapshot:
+    return await catalog_store.get(db)
+
+
+def invalidate_catalog():
+    """Force a reload on next access (call after writing to `universities`)"""
+    catalog_store.invalidate()
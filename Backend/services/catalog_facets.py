@@ -0,0 +1,126 @@
+"""
+Catalog Facet Index
+Counts per country, match tier, tuition band and ranking band for the
+filterable catalog, computed once per catalog version
+- One bitset (Python int, bit i = i-th catalog entry) per facet value
+- Combined filters are AND across facets / OR within a facet; each count is
+  a popcount of an intersection, never a pass over the rows
+- Counts for a facet ignore that facet's own filter, so the UI can show
+  how many results every alternative would give
+"""
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.catalog import CatalogEntry, CatalogSnapshot, calculate_match_tier, get_catalog
+
+# (label, lower bound inclusive, upper bound exclusive)
+TUITION_BANDS: List[Tuple[str, int, Optional[int]]] = [
+    ("under_10k", 0, 10_000),
+    ("10k_25k", 10_000, 25_000),
+    ("25k_40k", 25_000, 40_000),
+    ("40k_plus", 40_000, None),
+]
+RANKING_BANDS: List[Tuple[str, int, Optional[int]]] = [
+    ("top_10", 1, 11),
+    ("11_50", 11, 51),
+    ("51_100", 51, 101),
+    ("101_200", 101, 201),
+    ("200_plus", 201, None),
+]
+UNRANKED = "unranked"
+FACETS = ("country", "tier", "tuition_band", "ranking_band")
+_FIXED_ORDER = {
+    "tier": ["Dream", "Target", "Safe"],
+    "tuition_band": [label for label, _, _ in TUITION_BANDS],
+    "ranking_band": [label for label, _, _ in RANKING_BANDS] + [UNRANKED],
+}
+
+
+def _band(value: int, bands: List[Tuple[str, int, Optional[int]]]) -> str:
+    for label, low, high in bands:
+        if value >= low and (high is None or value < high):
+            return label
+    return bands[0][0]
+
+
+def facet_values(entry: CatalogEntry) -> Tuple[str, str, str, str]:
+    """Facet value of an entry for each of FACETS"""
+    return (
+        entry.country,
+        calculate_match_tier(entry.acceptance_rate),
+        _band(entry.tuition_fee, TUITION_BANDS),
+        _band(entry.ranking, RANKING_BANDS) if entry.ranking else UNRANKED,
+    )
+
+
+class FacetIndex:
+    """Bitsets for every facet value of one catalog version"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self.size = len(snapshot)
+        self.all = (1 << self.size) - 1
+
+        # Set bits in bytearrays first; OR-ing into big ints row by row is quadratic
+        bitmaps: Dict[str, Dict[str, bytearray]] = {facet: {} for facet in FACETS}
+        width = (self.size + 7) // 8
+        for i, entry in enumerate(snapshot.entries):
+            byte, bit = i >> 3, 1 << (i & 7)
+            for facet, value in zip(FACETS, facet_values(entry)):
+                bitmap = bitmaps[facet].get(value)
+                if bitmap is None:
+                    bitmap = bitmaps[facet][value] = bytearray(width)
+                bitmap[byte] |= bit
+        self.bitsets: Dict[str, Dict[str, int]] = {
+            facet: {value: int.from_bytes(bitmap, "little") for value, bitmap in values.items()}
+            for facet, values in bitmaps.items()
+        }
+
+    def _order(self, facet: str) -> List[str]:
+        """Display order: fixed for tiers and bands (zero counts included), alphabetical otherwise"""
+        if facet in _FIXED_ORDER:
+            return _FIXED_ORDER[facet]
+        return sorted(self.bitsets[facet])
+
+    def _mask(self, facet: str, selected: Sequence[str]) -> int:
+        """OR of the selected values (everything when nothing is selected)"""
+        if not selected:
+            return self.all
+        values = self.bitsets[facet]
+        mask = 0
+        for value in selected:
+            mask |= values.get(value, 0)
+        return mask
+
+    def counts(self, filters: Mapping[str, Sequence[str]]) -> Dict[str, object]:
+        """{"total": n, "facets": {facet: {value: n}}} for the given filters"""
+        masks = {facet: self._mask(facet, filters.get(facet) or ()) for facet in FACETS}
+        total = self.all
+        for mask in masks.values():
+            total &= mask
+
+        facets = {}
+        for facet in FACETS:
+            others = self.all
+            for other, mask in masks.items():
+                if other != facet:
+                    others &= mask
+            bitsets = self.bitsets[facet]
+            facets[facet] = {
+                value: (bitsets[value] & others).bit_count() if value in bitsets else 0
+                for value in self._order(facet)
+            }
+        return {"total": total.bit_count(), "facets": facets}
+
+
+_facet_index: Optional[FacetIndex] = None
+
+
+async def get_facet_index(db: AsyncSession) -> FacetIndex:
+    """Facet index for the current catalog version (rebuilt when the catalog changes)"""
+    global _facet_index
+    snapshot = await get_catalog(db)
+    if _facet_index is None or _facet_index.version != snapshot.version:
+        _facet_index = FacetIndex(snapshot)
+    return _facet_index
@@ -0,0 +1,158 @@
+"""
+Catalog Mention Matcher
+Aho-Corasick automaton over every catalog university name and alias
+Finds all universities mentioned in an AI response in one linear pass,
+independent of catalog size, so render cards no longer depend on the model
+emitting [RENDER_CARD: ...] tags
+- Acronyms only match as the exact uppercase token ("git" is not Georgia
+  Tech), and a bare place name ("Toronto", "Cambridge, Massachusetts")
+  only next to a university cue ("University of Toronto", "at Toronto")
+"""
+import re
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.catalog import MATCH_EXACT, MATCH_WITH_CUE, CatalogEntry, CatalogSnapshot, get_catalog, mention_patterns
+
+# A university cue right before ("University of", "U of", "at") or after ("University") a place name
+_CUE_BEFORE = re.compile(r"\b(university of|uni of|u of|college of|at)\s+$", re.I)
+_CUE_AFTER = re.compile(r"^\s+(university|uni|college)\b", re.I)
+_CUE_WINDOW = 20
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum()
+
+
+class AhoCorasick:
+    """
+    Case-insensitive multi-pattern matcher
+    Trie nodes are dicts of char -> node index; failure links are resolved
+    once at build time so matching never backtracks
+    """
+
+    def __init__(self, patterns: List[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # node -> [(pattern length, value)] including outputs reachable via failure links
+        self._output: List[List[Tuple[int, int]]] = [[]]
+
+        for pattern, value in patterns:
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = nxt
+            self._output[node].append((len(pattern), value))
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self._goto)
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return (start, end, value) for every whole-word match"""
+        lowered = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                end = i + 1
+                after_ok = end == len(lowered) or not _is_word_char(lowered[end])
+                if not after_ok:
+                    continue
+                for length, value in output[node]:
+                    start = end - length
+                    if start == 0 or not _is_word_char(lowered[start - 1]):
+                        matches.append((start, end, value))
+        return matches
+
+
+class CatalogMatcher:
+    """Maps free text to catalog entries (longest, left-most mention wins)"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self._entries = snapshot.by_id
+        # (entry id, pattern as written, match mode); the automaton value indexes this list
+        self._patterns: List[Tuple[int, str, str]] = []
+        for entry in snapshot.entries:
+            for pattern, mode in mention_patterns(entry.name, entry.location):
+                self._patterns.append((entry.id, pattern, mode))
+        self._automaton = AhoCorasick([(pattern, i) for i, (_, pattern, _) in enumerate(self._patterns)])
+        self.pattern_count = len(self._patterns)
+        # Lowercased catalog locations ("toronto", "new jersey") for context checks
+        self.locations = frozenset(entry.location.lower() for entry in snapshot.entries if entry.location)
+
+    def _accepts(self, text: str, start: int, end: int, mode: str, pattern: str) -> bool:
+        if mode == MATCH_EXACT:
+            return text[start:end] == pattern
+        if mode == MATCH_WITH_CUE:
+            return bool(
+                _CUE_BEFORE.search(text[max(0, start - _CUE_WINDOW):start])
+                or _CUE_AFTER.match(text[end:end + _CUE_WINDOW])
+            )
+        return True
+
+    def find(self, text: str) -> List[CatalogEntry]:
+        """Universities mentioned in text, in order of first mention, without duplicates"""
+        matches = []
+        for start, end, index in self._automaton.find_all(text):
+            entry_id, pattern, mode = self._patterns[index]
+            if self._accepts(text, start, end, mode, pattern):
+                matches.append((start, end, entry_id))
+        # Prefer the longest match at overlapping positions
+        # ("University of California, Berkeley" over "Berkeley")
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        found: List[CatalogEntry] = []
+        seen = set()
+        covered_until = -1
+        for start, end, entry_id in matches:
+            if start < covered_until:
+                continue
+            covered_until = end
+            if entry_id not in seen:
+                seen.add(entry_id)
+                found.append(self._entries[entry_id])
+        return found
+
+
+_matcher: Optional[CatalogMatcher] = None
+
+
+def matcher_for(snapshot: CatalogSnapshot) -> CatalogMatcher:
+    """Matcher for a catalog snapshot (rebuilt only when its version moves)"""
+    global _matcher
+    if _matcher is None or _matcher.version != snapshot.version:
+        _matcher = CatalogMatcher(snapshot)
+    return _matcher
+
+
+async def get_catalog_matcher(db: AsyncSession) -> CatalogMatcher:
+    """Matcher for the current catalog version (rebuilt when the catalog changes)"""
+    return matcher_for(await get_catalog(db))
@@ -0,0 +1,227 @@
+"""
+Catalog Search Index
+Typo-tolerant university search over name, location and aliases
+- Trigram postings find candidates for misspelled / partial queries
+  ("stanfrod", "carnegie"); a sorted word list answers short prefixes ("tu")
+- Only the rarest query trigrams are scanned (SEARCH_MAX_POSTINGS), so
+  common grams like "uni" don't make queries scale with catalog size
+- Updated incrementally when the catalog version moves: only added, renamed
+  and removed universities are re-indexed; dead slots are compacted lazily
+"""
+import heapq
+import os
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.catalog import CatalogSnapshot, derive_aliases, get_catalog
+
+# Configuration (override via .env)
+SEARCH_MAX_POSTINGS = int(os.getenv("SEARCH_MAX_POSTINGS", "5000"))
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "32"))
+SEARCH_MIN_SCORE = float(os.getenv("SEARCH_MIN_SCORE", "0.35"))
+
+_PREFIX_WORD_LIMIT = 64
+# Relative weight of a match on each field kind
+_FIELD_WEIGHTS = (1.0, 0.95, 0.8)  # name, alias, location
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents ("München" -> "munchen") and punctuation"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    chars = [ch if ch.isalnum() else " " for ch in decomposed if not unicodedata.combining(ch)]
+    return " ".join("".join(chars).split())
+
+
+def trigrams(folded: str) -> Set[str]:
+    """Word-padded trigrams: "tu munchen" -> {" tu", "tu ", " mu", "mun", ...}"""
+    grams = set()
+    for word in folded.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class _Slot(NamedTuple):
+    entry_id: int
+    name: str
+    location: Optional[str]
+    # (field kind, folded text); kind indexes _FIELD_WEIGHTS
+    fields: Tuple[Tuple[int, str], ...]
+
+
+def _score(query: str, query_grams: Set[str], fields: Iterable[Tuple[int, str]]) -> float:
+    """Best field similarity: trigram coverage of the query, plus exact/prefix bonuses"""
+    best = 0.0
+    for kind, text in fields:
+        grams = trigrams(text)
+        shared = len(query_grams & grams)
+        if not shared and not text.startswith(query):
+            continue
+        coverage = shared / len(query_grams) if query_grams else 0.0
+        jaccard = shared / len(query_grams | grams) if grams else 0.0
+        score = 0.7 * coverage + 0.3 * jaccard
+        if text == query:
+            score += 1.0
+        elif text.startswith(query):
+            score += 0.5
+        elif f" {query}" in f" {text}":
+            score += 0.3
+        best = max(best, score * _FIELD_WEIGHTS[kind])
+    return best
+
+
+class CatalogSearchIndex:
+    """Trigram + prefix index over catalog slots (one slot per indexed version of an entry)"""
+
+    def __init__(self):
+        self.version = 0
+        self._reset()
+        self.builds = 0
+        self.incremental_updates = 0
+
+    def _reset(self):
+        self._slots: List[Optional[_Slot]] = []
+        self._slot_of: Dict[int, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._words: Dict[str, array] = {}
+        self._sorted_words: List[str] = []
+        self._words_dirty = False
+        self.dead_slots = 0
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    # ---- maintenance ----
+
+    def update(self, snapshot: CatalogSnapshot):
+        """Bring the index to snapshot.version, re-indexing only changed entries"""
+        if snapshot.version == self.version:
+            return
+        seen = set()
+        for entry in snapshot.entries:
+            seen.add(entry.id)
+            slot = self._slot_of.get(entry.id)
+            if slot is not None:
+                current = self._slots[slot]
+                if current.name == entry.name and current.location == entry.location:
+                    continue
+                self._retire(slot)
+            self._add(entry.id, entry.name, entry.location)
+        for entry_id in [i for i in self._slot_of if i not in seen]:
+            self._retire(self._slot_of.pop(entry_id))
+
+        if self.dead_slots > max(1024, len(self._slot_of)):
+            self._compact()
+        self.version = snapshot.version
+        self.incremental_updates += 1
+
+    def _add(self, entry_id: int, name: str, location: Optional[str]):
+        fields = [(0, fold(name))]
+        fields += [(1, fold(alias)) for alias in derive_aliases(name)]
+        if location:
+            fields.append((2, fold(location)))
+        fields = tuple((kind, text) for kind, text in fields if text)
+
+        slot = len(self._slots)
+        self._slots.append(_Slot(entry_id, name, location, fields))
+        self._slot_of[entry_id] = slot
+
+        grams, words = set(), set()
+        for _, text in fields:
+            grams |= trigrams(text)
+            words.update(text.split())
+        for gram in grams:
+            self._postings.setdefault(gram, array("i")).append(slot)
+        for word in words:
+            if word not in self._words:
+                self._words[word] = array("i")
+                self._words_dirty = True
+            self._words[word].append(slot)
+
+    def _retire(self, slot: int):
+        """Postings keep the slot number; queries skip retired slots until compaction"""
+        self._slots[slot] = None
+        self.dead_slots += 1
+
+    def _compact(self):
+        live = [slot for slot in self._slots if slot is not None]
+        self._reset()
+        for slot in live:
+            self._add(slot.entry_id, slot.name, slot.location)
+        self.builds += 1
+
+    # ---- queries ----
+
+    def _prefix_slots(self, prefix: str, cap: int) -> List[int]:
+        if self._words_dirty:
+            self._sorted_words = sorted(self._words)
+            self._words_dirty = False
+        words = self._sorted_words
+        slots = []
+        i = bisect_left(words, prefix)
+        end = min(len(words), i + _PREFIX_WORD_LIMIT)
+        while i < end and len(slots) < cap and words[i].startswith(prefix):
+            slots.extend(self._words[words[i]])
+            i += 1
+        return slots[:cap]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Return [(university_id, score)] best first"""
+        folded = fold(query)
+        if not folded:
+            return []
+        query_grams = trigrams(folded)
+
+        # Rarest grams first; stop once the posting budget is spent (a query
+        # made only of very common grams samples the head of the rarest one)
+        postings = sorted(
+            (self._postings[g] for g in query_grams if g in self._postings), key=len
+        )
+        hits = Counter()
+        budget = SEARCH_MAX_POSTINGS
+        for posting in postings:
+            if hits and len(posting) > budget:
+                break
+            hits.update(posting[:budget])
+            budget -= len(posting)
+        # Typeahead: the last word may be incomplete
+        hits.update(self._prefix_slots(folded.split()[-1], max(budget, SEARCH_CANDIDATES)))
+
+        results = []
+        for slot_number in heapq.nlargest(SEARCH_CANDIDATES, hits, key=hits.get):
+            slot = self._slots[slot_number]
+            if slot is None:
+                continue
+            score = _score(folded, query_grams, slot.fields)
+            if score >= SEARCH_MIN_SCORE:
+                results.append((slot.entry_id, round(score, 3)))
+        results.sort(key=lambda r: -r[1])
+        return results[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self.version,
+            "entries": len(self._slot_of),
+            "trigrams": len(self._postings),
+            "words": len(self._words),
+            "dead_slots": self.dead_slots,
+            "builds": self.builds,
+            "incremental_updates": self.incremental_updates,
+        }
+
+
+# Process-wide index
+search_index = CatalogSearchIndex()
+
+
+async def get_search_index(db: AsyncSession) -> Tuple[CatalogSearchIndex, CatalogSnapshot]:
+    """Index for the current catalog version, with the snapshot it was built from"""
+    snapshot = await get_catalog(db)
+    search_index.update(snapshot)
+    return search_index, snapshot
@@ -0,0 +1,58 @@
+"""
+Chat WebSocket Registry
+Per-worker bookkeeping for /chat/ws connections
+- Caps concurrent sockets per worker (WS_MAX_CONNECTIONS); extra
+  connections are closed with 1013 (try again later)
+- Counters for /metrics: open sockets, messages, superseded replies
+"""
+import os
+from typing import Dict
+
+# Configuration (override via .env)
+WS_MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "200"))
+WS_HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+WS_AUTH_TIMEOUT_SECONDS = float(os.getenv("WS_AUTH_TIMEOUT_SECONDS", "10"))
+WS_PROFILE_TTL_SECONDS = float(os.getenv("WS_PROFILE_TTL_SECONDS", "60"))
+WS_HISTORY_MESSAGES = int(os.getenv("WS_HISTORY_MESSAGES", "10"))
+
+
+class ChatSocketRegistry:
+    """Connection cap and counters (single event loop, no locking needed)"""
+
+    def __init__(self, max_connections: int = WS_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self.open = 0
+        self.peak = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.messages = 0
+        self.cancelled = 0
+        self.timeouts = 0
+
+    def try_open(self) -> bool:
+        if self.open >= self.max_connections:
+            self.rejected += 1
+            return False
+        self.open += 1
+        self.accepted += 1
+        self.peak = max(self.peak, self.open)
+        return True
+
+    def close(self):
+        self.open -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open": self.open,
+            "peak": self.peak,
+            "max_connections": self.max_connections,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "messages": self.messages,
+            "superseded_or_cancelled": self.cancelled,
+            "heartbeat_timeouts": self.timeouts,
+        }
+
+
+# Process-wide registry
+chat_sockets = ChatSocketRegistry()
@@ -0,0 +1,211 @@
+"""
+Structured Logging Pipeline
+Non-blocking JSON logs for the API process
+- Log calls only enqueue the record (bounded queue, never blocks: records
+  are dropped and counted when it is full)
+- A background thread formats records as JSON lines and writes them in
+  batches (one write + flush per batch)
+- Records carry the current request ID and the time since the request
+  started (request_ms); request_context() binds both per HTTP request,
+  WebSocket connection or background job
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Any, Dict, Optional, TextIO
+
+# Configuration (override via .env)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+LOG_REQUESTS = os.getenv("LOG_REQUESTS", "true").lower() == "true"
+
+# (request_id, perf_counter at request start) for the current request/connection/job
+_request: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("log_request", default=None)
+
+# LogRecord attributes that aren't user-supplied `extra` fields
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "request_id", "request_ms"}
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_request_id() -> Optional[str]:
+    bound = _request.get()
+    return bound[0] if bound else None
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None):
+    """Bind a request ID (and start time) to every record logged inside"""
+    token = _request.set((request_id or new_request_id(), time.perf_counter()))
+    try:
+        yield token
+    finally:
+        _request.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, request fields, extras, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.message if hasattr(record, "message") else record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+            entry["request_ms"] = record.request_ms
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestQueueHandler(QueueHandler):
+    """
+    Enqueue-only handler used on the caller's thread
+    - Renders the message and stamps request fields (the context isn't
+      visible from the writer thread); JSON and tracebacks are formatted there
+    """
+
+    def __init__(self, record_queue: queue.Queue, pipeline: "LogPipeline"):
+        super().__init__(record_queue)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        bound = _request.get()
+        if bound is not None:
+            record.request_id = bound[0]
+            record.request_ms = round((time.perf_counter() - bound[1]) * 1000, 2)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.pipeline.enqueued += 1
+        except queue.Full:
+            self.pipeline.dropped += 1
+
+
+class LogPipeline:
+    """Bounded record queue drained by one writer thread in batches"""
+
+    def __init__(self, stream: Optional[TextIO] = None, queue_size: int = LOG_QUEUE_SIZE,
+                 batch_size: int = LOG_BATCH_SIZE):
+        self.stream = stream or sys.stdout
+        self.batch_size = batch_size
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = RequestQueueHandler(self.queue, self)
+        self.formatter = JsonFormatter()
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Write everything queued so far, then end the writer thread"""
+        if self._thread is not None:
+            try:
+                self.queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _writer(self):
+        while True:
+            record = self.queue.get()
+            batch, stopping = [], record is None
+            if not stopping:
+                batch.append(record)
+            while len(batch) < self.batch_size and not stopping:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                else:
+                    batch.append(record)
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                self.write_errors += 1
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            self.write_errors += 1
+            return
+        self.written += len(lines)
+        self.batches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0,
+            "write_errors": self.write_errors,
+        }
+
+
+log_pipeline = LogPipeline()
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """
+    Route the root logger (and uvicorn's) through the queue
+    Idempotent; call once at startup. With LOG_REQUESTS the per-request
+    records written by main.py replace uvicorn's access log
+    """
+    root = logging.getLogger()
+    if log_pipeline.handler not in root.handlers:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(log_pipeline.handler)
+        atexit.register(log_pipeline.stop)
+    root.setLevel(level)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = LOG_REQUESTS
+    log_pipeline.start()
@@ -0,0 +1,149 @@
+"""
+Latency-Aware Model Routing
+Cheap local classification decides which Groq model answers a chat turn
+- Greetings, acknowledgements and short follow-ups -> fast model, low token cap
+- Comparisons, strategy and list-building questions -> large model
+- Falls back to the fast model while the large one is slow or failing
+"""
+import os
+import re
+from typing import Dict, List, NamedTuple
+
+from services.resilience import LatencyTracker, get_resilient_caller
+
+# Configuration (override via .env)
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+GROQ_LARGE_MODEL = os.getenv("GROQ_LARGE_MODEL", "llama-3.3-70b-versatile")
+GROQ_FAST_MODEL = os.getenv("GROQ_FAST_MODEL", "llama-3.1-8b-instant")
+LARGE_MODEL_MAX_TOKENS = int(os.getenv("LARGE_MODEL_MAX_TOKENS", "1024"))
+FAST_MODEL_MAX_TOKENS = int(os.getenv("FAST_MODEL_MAX_TOKENS", "384"))
+# Large-model p95 above this (once enough samples exist) routes to the fast model
+LARGE_MODEL_SLOW_P95_SECONDS = float(os.getenv("LARGE_MODEL_SLOW_P95_SECONDS", "12"))
+
+_MIN_LATENCY_SAMPLES = 20
+# While the large model is slow, every Nth complex request still probes it
+_SLOW_PROBE_EVERY = 10
+_SHORT_MESSAGE_WORDS = 12
+
+# Intent that needs the large model's reasoning, regardless of length
+_COMPLEX_INTENT = re.compile(
+    r"\b(compare|comparison|vs|versus|better|best|difference|between|strategy|strategies|"
+    r"plan|roadmap|recommend|recommendations?|suggest|shortlist|list|which|chances?|"
+    r"probability|evaluate|profile|sop|statement|essay|lor|scholarships?|funding|roi|"
+    r"pros|cons|should i|safe|target|dream|reach|safety)\b",
+    re.IGNORECASE,
+)
+
+# Conversational turns the fast model handles well
+_SIMPLE_INTENT = re.compile(
+    r"^\s*(hi|hey|hello|yo|thanks|thank you|thx|ok|okay|cool|great|got it|sure|yes|no|"
+    r"yep|nope|nice|awesome|bye|good (morning|afternoon|evening))\b",
+    re.IGNORECASE,
+)
+
+
+class Route(NamedTuple):
+    model: str
+    max_tokens: int
+    reason: str
+
+
+LARGE_ROUTE = Route(GROQ_LARGE_MODEL, LARGE_MODEL_MAX_TOKENS, "complex")
+FAST_ROUTE = Route(GROQ_FAST_MODEL, FAST_MODEL_MAX_TOKENS, "simple")
+
+
+def classify(message: str, history: List[Dict[str, str]]) -> str:
+    """
+    Return "simple" or "complex" for a chat turn
+    Cost: two regex scans over the message, no model call
+    """
+    words = len(message.split())
+    if _COMPLEX_INTENT.search(message):
+        return "complex"
+    if _SIMPLE_INTENT.match(message) and words <= _SHORT_MESSAGE_WORDS:
+        return "simple"
+    # Short follow-up inside an ongoing conversation
+    if history and words <= _SHORT_MESSAGE_WORDS // 2:
+        return "simple"
+    return "complex"
+
+
+class ModelRouter:
+    """Picks a route per request and records decisions + per-model latency"""
+
+    def __init__(self):
+        self.decisions: Dict[str, int] = {}
+        self.fallbacks = 0
+        self.fallbacks_skipped = 0
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._slow_diversions = 0
+
+    def _count(self, reason: str):
+        self.decisions[reason] = self.decisions.get(reason, 0) + 1
+
+    def _large_unavailable(self) -> str:
+        caller = get_resilient_caller(GROQ_LARGE_MODEL)
+        if caller.breaker.is_open():
+            return "large_unhealthy"
+        tracker = self._latency.get(GROQ_LARGE_MODEL)
+        if (tracker is not None and len(tracker) >= _MIN_LATENCY_SAMPLES
+                and tracker.percentile(0.95) > LARGE_MODEL_SLOW_P95_SECONDS):
+            # Let a probe through now and then so recovery shows up in the samples
+            self._slow_diversions += 1
+            if self._slow_diversions % _SLOW_PROBE_EVERY:
+                return "large_slow"
+        return ""
+
+    def route(self, message: str, history: List[Dict[str, str]]) -> Route:
+        if not MODEL_ROUTING_ENABLED:
+            self._count("routing_disabled")
+            return LARGE_ROUTE
+
+        if classify(message, history) == "simple":
+            self._count("simple")
+            return FAST_ROUTE
+
+        degraded = self._large_unavailable()
+        if degraded:
+            self._count(degraded)
+            return FAST_ROUTE._replace(reason=degraded)
+
+        self._count("complex")
+        return LARGE_ROUTE
+
+    def fallback(self) -> Route:
+        """Route used when the large model call itself failed"""
+        self.fallbacks += 1
+        self._count("large_failed")
+        return FAST_ROUTE._replace(reason="large_failed")
+
+    def skip_fallback(self):
+        """The large model failed too late in the request to try the fast one"""
+        self.fallbacks_skipped += 1
+
+    def record_latency(self, model: str, seconds: float):
+        tracker = self._latency.get(model)
+        if tracker is None:
+            tracker = LatencyTracker()
+            self._latency[model] = tracker
+        tracker.record(seconds)
+
+    def stats(self) -> Dict[str, any]:
+        return {
+            "enabled": MODEL_ROUTING_ENABLED,
+            "decisions": dict(self.decisions),
+            "fallbacks": self.fallbacks,
+            "fallbacks_skipped": self.fallbacks_skipped,
+            "latency_ms": {
+                model: {
+                    "samples": len(tracker),
+                    "p50": round(1000 * tracker.percentile(0.5), 1),
+                    "p95": round(1000 * tracker.percentile(0.95), 1),
+                }
+                for model, tracker in self._latency.items()
+            },
+        }
+
+
+# Process-wide router
+model_router = ModelRouter()
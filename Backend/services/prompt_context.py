@@ -0,0 +1,127 @@
+"""
+Profile-Filtered University Context
+Builds the UNIVERSITY DATABASE section of the system prompt from the catalog
+- Only the top-k universities relevant to the profile (country, budget, tier mix)
+- Rendered once per (profile version, catalog version) and cached
+"""
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.catalog import CatalogEntry, CatalogSnapshot, calculate_match_tier
+
+# Configuration (override via .env)
+PROMPT_UNIVERSITY_TOP_K = int(os.getenv("PROMPT_UNIVERSITY_TOP_K", "12"))
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "1024"))
+
+# How students write countries vs. how the catalog stores them
+_COUNTRY_SYNONYMS = {
+    "us": "usa", "u.s.": "usa", "u.s.a.": "usa", "united states": "usa", "america": "usa",
+    "united states of america": "usa", "uk": "uk", "u.k.": "uk", "united kingdom": "uk",
+    "england": "uk", "britain": "uk", "great britain": "uk", "scotland": "uk",
+    "deutschland": "germany",
+}
+
+_TIER_ORDER = ("Dream", "Target", "Safe")
+
+
+def normalize_country(country: Optional[str]) -> str:
+    value = (country or "").strip().lower()
+    return _COUNTRY_SYNONYMS.get(value, value)
+
+
+def _relevance(entry: CatalogEntry, country: str, budget: Optional[int]) -> float:
+    score = 0.0
+    if country and normalize_country(entry.country) == country:
+        score += 100
+    if budget:
+        if entry.tuition_fee <= budget:
+            score += 50
+        elif entry.tuition_fee <= budget * 1.2:
+            score += 20  # slight stretch
+        else:
+            score -= 50
+    # Better-ranked schools first within the same relevance
+    score -= (entry.ranking or 999) / 100.0
+    return score
+
+
+def select_universities(
+    snapshot: CatalogSnapshot,
+    target_country: Optional[str],
+    budget: Optional[int],
+    k: int = PROMPT_UNIVERSITY_TOP_K
+) -> List[CatalogEntry]:
+    """
+    Top-k catalog entries for a profile, balanced across Dream/Target/Safe tiers
+    (round-robin over tiers, each tier ordered by relevance)
+    """
+    country = normalize_country(target_country)
+    by_tier: Dict[str, List[CatalogEntry]] = {tier: [] for tier in _TIER_ORDER}
+    for entry in sorted(snapshot.entries, key=lambda e: _relevance(e, country, budget), reverse=True):
+        by_tier[calculate_match_tier(entry.acceptance_rate)].append(entry)
+
+    selected: List[CatalogEntry] = []
+    position = 0
+    while len(selected) < k and any(position < len(entries) for entries in by_tier.values()):
+        for tier in _TIER_ORDER:
+            if position < len(by_tier[tier]) and len(selected) < k:
+                selected.append(by_tier[tier][position])
+        position += 1
+    return selected
+
+
+def render_university_context(entries: List[CatalogEntry]) -> str:
+    """Compact one-line-per-university listing grouped by country"""
+    if not entries:
+        return "(No universities in the database yet - give general guidance.)"
+    by_country: "OrderedDict[str, List[CatalogEntry]]" = OrderedDict()
+    for entry in entries:
+        by_country.setdefault(entry.country, []).append(entry)
+    lines = []
+    for country, country_entries in by_country.items():
+        lines.append(f"{country}:")
+        for entry in country_entries:
+            lines.append(
+                f"- {entry.name} (Tuition: ${entry.tuition_fee:,}, Accept Rate: {entry.acceptance_rate:g}%, "
+                f"Tier: {calculate_match_tier(entry.acceptance_rate)})"
+            )
+    return "\n".join(lines)
+
+
+class PromptCache:
+    """Bounded LRU of rendered system prompts"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[str]:
+        prompt = self._entries.get(key)
+        if prompt is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return prompt
+
+    def put(self, key: Tuple, prompt: str):
+        self._entries[key] = prompt
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Process-wide rendered-prompt cache
+prompt_cache = PromptCache(PROMPT_CACHE_MAX_ENTRIES)
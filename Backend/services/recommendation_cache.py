@@ -0,0 +1,67 @@
+"""
+Recommendation Cache
+Memoized /universities/recommend list
+- The list depends only on the catalog (tier from acceptance rate, order by
+  ranking), so one copy per catalog version serves every user
+- Rebuilt on the first request after the catalog version moves (any insert,
+  delete or UPDATE of `universities`, see services.catalog); no per-request
+  query beyond the catalog's own fingerprint check
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas import UniversityWithMatch
+from services.catalog import CatalogSnapshot, calculate_match_tier
+
+
+def build_recommendations(snapshot: CatalogSnapshot) -> List[UniversityWithMatch]:
+    """All universities with their match tier, best-ranked first"""
+    recommendations = [
+        UniversityWithMatch(
+            id=entry.id,
+            name=entry.name,
+            country=entry.country,
+            acceptance_rate=entry.acceptance_rate,
+            tuition_fee=entry.tuition_fee,
+            ranking=entry.ranking,
+            location=entry.location,
+            match_tier=calculate_match_tier(entry.acceptance_rate),
+        )
+        for entry in snapshot.entries
+    ]
+    recommendations.sort(key=lambda x: x.ranking if x.ranking else 999)
+    return recommendations
+
+
+class RecommendationCache:
+    """(catalog version, recommendations) for the latest catalog seen"""
+
+    def __init__(self):
+        self._cached: Optional[Tuple[int, List[UniversityWithMatch]]] = None
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, snapshot: CatalogSnapshot) -> List[UniversityWithMatch]:
+        cached = self._cached
+        if cached is not None and cached[0] == snapshot.version:
+            self.hits += 1
+            return cached[1]
+        recommendations = build_recommendations(snapshot)
+        self._cached = (snapshot.version, recommendations)
+        self.builds += 1
+        return recommendations
+
+    def clear(self):
+        self._cached = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.builds
+        return {
+            "catalog_version": self._cached[0] if self._cached else None,
+            "universities": len(self._cached[1]) if self._cached else 0,
+            "hits": self.hits,
+            "builds": self.builds,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+recommendation_cache = RecommendationCache()
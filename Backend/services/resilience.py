@@ -0,0 +1,310 @@
+"""
+Upstream Resilience Layer
+Deadlines, jittered retries, optional hedging and a circuit breaker for Groq calls
+While the breaker is open, calls fail immediately so callers can return their
+fallback response instead of hammering a degraded upstream
+"""
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Configuration (override via .env)
+GROQ_DEADLINE_SECONDS = float(os.getenv("GROQ_DEADLINE_SECONDS", "25"))
+# One chat request, fallback to the fast model included, finishes within this
+GROQ_REQUEST_DEADLINE_SECONDS = float(os.getenv("GROQ_REQUEST_DEADLINE_SECONDS", str(GROQ_DEADLINE_SECONDS)))
+# Don't start the fallback with less than this left of the request deadline
+GROQ_FALLBACK_MIN_SECONDS = float(os.getenv("GROQ_FALLBACK_MIN_SECONDS", "3"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+GROQ_RETRY_BACKOFF_SECONDS = float(os.getenv("GROQ_RETRY_BACKOFF_SECONDS", "0.5"))
+GROQ_HEDGE_ENABLED = os.getenv("GROQ_HEDGE_ENABLED", "false").lower() == "true"
+GROQ_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("GROQ_HEDGE_MIN_DELAY_SECONDS", "1.0"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Latency samples needed before the p95 hedge delay is trusted
+_MIN_HEDGE_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient upstream failures worth another attempt"""
+    # groq is imported lazily (cold start); only failures get here
+    from groq import APIConnectionError, APIStatusError, APITimeoutError, InternalServerError, RateLimitError
+    if isinstance(exc, (asyncio.TimeoutError, APITimeoutError, APIConnectionError,
+                        RateLimitError, InternalServerError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+    - closed: calls flow normally
+    - open: calls are rejected until reset_seconds have passed
+    - half_open: a single probe call decides whether to close or re-open
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not change state)"""
+        if self.state == "open":
+            return time.monotonic() - self.opened_at < self.reset_seconds
+        return self.state == "half_open" and self._probe_in_flight
+
+    def acquire(self):
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream circuit is open")
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream circuit is half-open, probe in flight")
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Call ended without a verdict on upstream health (e.g. a 400)"""
+        if self.state == "half_open":
+            self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class ResilientCaller:
+    """
+    Wraps one upstream (a Groq model) with:
+    - an overall deadline covering all attempts (or less: what's left of
+      the request's deadline)
+    - limited retries with exponential backoff and full jitter
+    - an optional hedged second request after the observed p95 latency,
+      sent only if the caller's admit_hedge() grants it a slot
+    - a circuit breaker that trips after consecutive upstream failures
+    """
+
+    def __init__(
+        self,
+        name: str,
+        deadline: float = GROQ_DEADLINE_SECONDS,
+        max_retries: int = GROQ_MAX_RETRIES,
+        backoff: float = GROQ_RETRY_BACKOFF_SECONDS,
+        hedge_enabled: bool = GROQ_HEDGE_ENABLED,
+        hedge_min_delay: float = GROQ_HEDGE_MIN_DELAY_SECONDS,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.name = name
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+
+    def raise_if_open(self):
+        if self.breaker.is_open():
+            self.breaker.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {self.name}")
+
+    def _budget(self, timeout: Optional[float]) -> float:
+        return self.deadline if timeout is None else min(self.deadline, timeout)
+
+    def hedge_delay(self) -> float:
+        return max(self.hedge_min_delay, self.latency.percentile(0.95))
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        admit_hedge: Optional[Callable[[], bool]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run fn() under the deadline, retries, hedging and breaker
+        - fn is one upstream attempt; anything it records (usage) is recorded
+          once per completed attempt, including a hedge that lost the race
+        - admit_hedge: non-blocking admission for the hedged second request
+          (False skips the hedge); None sends hedges unadmitted
+        - timeout: what's left of the request's own deadline, if shorter
+          than the caller's deadline
+        """
+        self.breaker.acquire()
+        self.calls += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._with_retries(fn, admit_hedge), timeout=self._budget(timeout))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        except Exception as e:
+            if is_retryable(e):
+                self.failures += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.latency.record(time.monotonic() - started)
+        self.breaker.record_success()
+        return result
+
+    async def open_stream(self, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Start a streaming call: breaker and deadline cover opening the stream
+        - No retries or hedging (a second live stream would bill tokens twice)
+        - Time to open isn't recorded as completion latency
+        - timeout: as for call()
+        """
+        self.breaker.acquire()
+        self.calls += 1
+        try:
+            stream = await asyncio.wait_for(fn(), timeout=self._budget(timeout))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        except Exception as e:
+            if is_retryable(e):
+                self.failures += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return stream
+
+    async def _with_retries(self, fn: Callable[[], Awaitable[Any]], admit_hedge) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(fn, admit_hedge)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                # Full jitter: sleep somewhere in [0, backoff * 2^attempt]
+                await asyncio.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+                attempt += 1
+                self.retries += 1
+
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]], admit_hedge) -> Any:
+        if not self.hedge_enabled or len(self.latency) < _MIN_HEDGE_SAMPLES:
+            return await fn()
+
+        primary = asyncio.ensure_future(fn())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if not done:
+                if admit_hedge is None or admit_hedge():
+                    self.hedges += 1
+                    pending.add(asyncio.ensure_future(fn()))
+                else:
+                    self.hedges_skipped += 1
+            last_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Both may finish in the same step - the primary wins ties
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit_state": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "circuit_rejected": self.breaker.rejected,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped": self.hedges_skipped,
+            "latency_ms_p50": round(1000 * self.latency.percentile(0.5), 1),
+            "latency_ms_p95": round(1000 * self.latency.percentile(0.95), 1),
+        }
+
+
+# One caller (and breaker) per upstream model
+_callers: Dict[str, ResilientCaller] = {}
+
+
+def get_resilient_caller(name: str) -> ResilientCaller:
+    caller = _callers.get(name)
+    if caller is None:
+        caller = ResilientCaller(name)
+        _callers[name] = caller
+    return caller
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return {name: caller.stats() for name, caller in _callers.items()}
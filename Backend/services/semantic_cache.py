@@ -0,0 +1,295 @@
+"""
+Semantic Answer Cache
+In-process similarity cache for repeated counselling questions
+Near-duplicate questions from users with similar profiles reuse one answer
+(no external vector service - sparse hashed vectors + cosine similarity)
+- Similarity alone can't tell "living costs in Canada" from "... in
+  Australia", so the entities a question names (catalog universities,
+  countries, numbers) and the catalog version are part of the bucket: only
+  questions about exactly the same things are compared
+"""
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.catalog import CatalogSnapshot
+from services.catalog_matcher import matcher_for
+
+# Configuration (override via .env)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.86"))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2048"))
+
+# Number of hash buckets for the sparse feature vectors
+_VECTOR_DIMENSIONS = 1 << 18
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "do", "does", "i", "me", "my", "we",
+    "you", "your", "to", "for", "of", "in", "on", "at", "and", "or", "what",
+    "which", "how", "can", "could", "should", "would", "please", "tell", "about",
+    "need", "some", "any", "there", "it", "be", "with",
+}
+
+# Countries as they appear in a normalized question -> one canonical name
+_COUNTRY_TERMS = {
+    "usa": "usa", "us": "usa", "u s": "usa", "u s a": "usa", "united states": "usa", "america": "usa",
+    "uk": "uk", "u k": "uk", "united kingdom": "uk", "britain": "uk", "england": "uk", "scotland": "uk",
+    "canada": "canada", "australia": "australia", "new zealand": "new zealand", "ireland": "ireland",
+    "germany": "germany", "deutschland": "germany", "france": "france", "netherlands": "netherlands",
+    "holland": "netherlands", "italy": "italy", "spain": "spain", "sweden": "sweden",
+    "switzerland": "switzerland", "austria": "austria", "denmark": "denmark", "finland": "finland",
+    "norway": "norway", "japan": "japan", "singapore": "singapore", "hong kong": "hong kong",
+    "china": "china", "south korea": "south korea", "korea": "south korea", "india": "india",
+    "uae": "uae", "dubai": "uae",
+}
+_COUNTRY_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(term) for term in sorted(_COUNTRY_TERMS, key=len, reverse=True)) + r")\b"
+)
+_NUMBER = re.compile(r"\d+")
+
+_NON_WORD = re.compile(r"[^a-z0-9\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _feature_index(feature: str) -> int:
+    # Python's str hash is randomized per process, which is fine for an
+    # in-process index but must never be persisted
+    return hash(feature) % _VECTOR_DIMENSIONS
+
+
+def embed(normalized: str) -> Dict[int, float]:
+    """
+    Build an L2-normalized sparse vector from a normalized question
+    Features: content-word unigrams, bigrams and character trigrams
+    (trigrams make "germany"/"german" and small typos land close together)
+    """
+    words = [w for w in normalized.split() if w not in _STOPWORDS]
+    features: Dict[int, float] = {}
+
+    def add(feature: str, weight: float):
+        index = _feature_index(feature)
+        features[index] = features.get(index, 0.0) + weight
+
+    for word in words:
+        add(f"w:{word}", 1.0)
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            add(f"c:{padded[i:i + 3]}", 0.3)
+    for first, second in zip(words, words[1:]):
+        add(f"b:{first}_{second}", 0.7)
+
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    if norm == 0:
+        return {}
+    return {k: v / norm for k, v in features.items()}
+
+
+def cosine_similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Dot product of two normalized sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+def _band(value: Optional[float], edges: List[float]) -> str:
+    if value is None:
+        return "unknown"
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return str(i)
+    return str(len(edges))
+
+
+def profile_bucket(user_profile: Dict[str, any]) -> Tuple[str, str, str, str]:
+    """
+    Coarse profile bucket used to partition the cache
+    (GPA band, budget band, degree level, target country)
+    """
+    degree_level = user_profile.get("degree_level")
+    degree_level = getattr(degree_level, "value", degree_level)
+    country = user_profile.get("target_country")
+    return (
+        _band(user_profile.get("gpa"), [2.5, 3.0, 3.5]),
+        _band(user_profile.get("budget"), [10000, 30000, 50000]),
+        str(degree_level or "unknown").lower(),
+        (country or "any").strip().lower(),
+    )
+
+
+def question_entities(
+    message: str,
+    normalized: str,
+    catalog: Optional[CatalogSnapshot] = None
+) -> Tuple[Tuple[int, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """
+    What a question is about, beyond its wording
+    (catalog university ids, countries, numbers) - two questions share an
+    answer only if these are identical
+    """
+    universities = tuple(sorted({entry.id for entry in matcher_for(catalog).find(message)})) if catalog else ()
+    countries = tuple(sorted({_COUNTRY_TERMS[term] for term in _COUNTRY_PATTERN.findall(normalized)}))
+    return universities, countries, tuple(_NUMBER.findall(normalized))
+
+
+class _CacheEntry:
+    __slots__ = ("key", "bucket", "vector", "response", "render_cards", "expires_at")
+
+    def __init__(self, key, bucket, vector, response, render_cards, expires_at):
+        self.key = key
+        self.bucket = bucket
+        self.vector = vector
+        self.response = response
+        self.render_cards = render_cards
+        self.expires_at = expires_at
+
+
+class SemanticCache:
+    """
+    Bounded TTL cache with similarity lookup
+    - Entries are partitioned by profile bucket, then scored by cosine similarity
+    - LRU eviction once max_entries is reached
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: int, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple, Dict[Tuple, _CacheEntry]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        bucket_entries = self._buckets.get(entry.bucket)
+        if bucket_entries is not None:
+            bucket_entries.pop(key, None)
+            if not bucket_entries:
+                del self._buckets[entry.bucket]
+
+    def _bucket(self, message: str, normalized: str, user_profile: Dict[str, any],
+                catalog: Optional[CatalogSnapshot]) -> Tuple:
+        version = catalog.version if catalog is not None else None
+        return profile_bucket(user_profile) + (version,) + question_entities(message, normalized, catalog)
+
+    def lookup(
+        self,
+        message: str,
+        user_profile: Dict[str, any],
+        catalog: Optional[CatalogSnapshot] = None
+    ) -> Optional[Tuple[str, List[str]]]:
+        """
+        Return a cached (response, render_cards) for a similar question, if any
+        (same profile bucket, catalog version and named entities)
+        """
+        normalized = normalize_question(message)
+        bucket = self._bucket(message, normalized, user_profile, catalog)
+        now = time.monotonic()
+
+        best_entry = None
+        best_score = 0.0
+        candidates = self._buckets.get(bucket, {})
+
+        exact = candidates.get((bucket, normalized))
+        if exact is not None and exact.expires_at > now:
+            best_entry, best_score = exact, 1.0
+        else:
+            vector = embed(normalized)
+            for key, entry in list(candidates.items()):
+                if entry.expires_at <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                    continue
+                score = cosine_similarity(vector, entry.vector)
+                if score > best_score:
+                    best_entry, best_score = entry, score
+
+        if best_entry is None or best_score < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_entry.key)
+        return best_entry.response, list(best_entry.render_cards)
+
+    def store(
+        self,
+        message: str,
+        user_profile: Dict[str, any],
+        response: str,
+        render_cards: List[str],
+        catalog: Optional[CatalogSnapshot] = None
+    ):
+        """Cache an answer under the normalized question and its bucket"""
+        normalized = normalize_question(message)
+        if not normalized:
+            return
+        bucket = self._bucket(message, normalized, user_profile, catalog)
+        key = (bucket, normalized)
+
+        self._remove(key)
+        entry = _CacheEntry(
+            key=key,
+            bucket=bucket,
+            vector=embed(normalized),
+            response=response,
+            render_cards=list(render_cards),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._entries[key] = entry
+        self._buckets.setdefault(bucket, {})[key] = entry
+        self.stores += 1
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._buckets.clear()
+
+    def stats(self) -> Dict[str, any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": SEMANTIC_CACHE_ENABLED,
+            "size": len(self._entries),
+            "buckets": len(self._buckets),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Process-wide cache instance
+answer_cache = SemanticCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+)
+
+
+def is_cacheable_turn(history: List[Dict[str, str]]) -> bool:
+    """
+    Only standalone questions are shared across users
+    (a follow-up depends on the conversation so far)
+    """
+    return not any(msg.get("role") == "user" for msg in history)
@@ -0,0 +1,237 @@
+"""
+Shared-Memory Catalog
+Read-only binary image of the catalog, built once and mmap'd by every worker
+- Fixed-width records + a deduplicated UTF-8 string table, sorted by id
+- Published atomically (write temp file, os.replace) under /dev/shm when
+  available; workers attach zero-copy and decode records on access
+- The header carries a generation counter and the table fingerprint it was
+  built from, so only one worker rebuilds after the table changes
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process build lock, publishing stays atomic
+    fcntl = None
+
+from database import DATABASE_URL
+
+# Configuration (override via .env)
+CATALOG_SHARED_MEMORY = os.getenv("CATALOG_SHARED_MEMORY", "false").lower() == "true"
+_DEFAULT_SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+CATALOG_SHARED_DIR = os.getenv("CATALOG_SHARED_DIR", _DEFAULT_SHARED_DIR)
+
+_MAGIC = b"AICATLG2"
+# magic, generation, fingerprint (row count, max id, row_version sum), record count, string table offset
+_HEADER = struct.Struct("<8sQqqqII")
+# id, acceptance_rate, tuition_fee, ranking (-1 = none),
+# (offset, length) of name / country / location in the string table
+_RECORD = struct.Struct("<idiiIHIHIH")
+_NO_RANKING = -1
+_NO_STRING = 0xFFFF
+
+
+def shared_catalog_path() -> str:
+    """One image per database, so different deployments on a host never mix"""
+    digest = hashlib.sha256(DATABASE_URL.encode()).hexdigest()[:12]
+    return os.path.join(CATALOG_SHARED_DIR, f"ai-counsellor-catalog-{digest}.bin")
+
+
+def encode_catalog(entries, generation: int, fingerprint: Tuple[int, int, int]) -> bytes:
+    """Serialize CatalogEntry rows (sorted by id) into the shared image format"""
+    strings = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+
+    def intern(value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return 0, _NO_STRING
+        if value not in offsets:
+            data = value.encode("utf-8")[:_NO_STRING - 1]
+            offsets[value] = (len(strings), len(data))
+            strings.extend(data)
+        return offsets[value]
+
+    records = bytearray()
+    for entry in entries:
+        name = intern(entry.name)
+        country = intern(entry.country)
+        location = intern(entry.location)
+        records.extend(_RECORD.pack(
+            entry.id,
+            entry.acceptance_rate,
+            entry.tuition_fee,
+            entry.ranking if entry.ranking is not None else _NO_RANKING,
+            *name, *country, *location,
+        ))
+
+    strings_offset = _HEADER.size + len(records)
+    header = _HEADER.pack(_MAGIC, generation, *fingerprint, len(entries), strings_offset)
+    return bytes(header) + bytes(records) + bytes(strings)
+
+
+class SharedCatalogView(Sequence):
+    """Sequence of CatalogEntry decoded lazily from an mmap'd image"""
+
+    def __init__(self, buffer: mmap.mmap):
+        from services.catalog import CatalogEntry  # services.catalog imports this module
+
+        magic, generation, count, max_id, versions, size, strings_offset = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a catalog image")
+        self._entry = CatalogEntry
+        self._buffer = buffer
+        self.generation = generation
+        self.fingerprint = (count, max_id, versions)
+        self._size = size
+        self._strings = strings_offset
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if length == _NO_STRING:
+            return None
+        start = self._strings + offset
+        return self._buffer[start:start + length].decode("utf-8")
+
+    def _id_at(self, index: int) -> int:
+        return struct.unpack_from("<i", self._buffer, _HEADER.size + index * _RECORD.size)[0]
+
+    def _decode(self, index: int):
+        (entry_id, acceptance_rate, tuition_fee, ranking,
+         name_off, name_len, country_off, country_len,
+         location_off, location_len) = _RECORD.unpack_from(self._buffer, _HEADER.size + index * _RECORD.size)
+        return self._entry(
+            entry_id,
+            self._string(name_off, name_len),
+            self._string(country_off, country_len),
+            acceptance_rate,
+            tuition_fee,
+            None if ranking == _NO_RANKING else ranking,
+            self._string(location_off, location_len),
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return self._decode(index)
+
+    def __iter__(self) -> Iterator:
+        # Sequential scan: one iter_unpack over the record block, local lookups
+        buffer, strings, entry = self._buffer, self._strings, self._entry
+        block = memoryview(buffer)[_HEADER.size:_HEADER.size + self._size * _RECORD.size]
+        try:
+            for (entry_id, acceptance_rate, tuition_fee, ranking,
+                 name_off, name_len, country_off, country_len,
+                 location_off, location_len) in _RECORD.iter_unpack(block):
+                name = strings + name_off
+                country = strings + country_off
+                location = strings + location_off
+                yield entry(
+                    entry_id,
+                    str(buffer[name:name + name_len], "utf-8"),
+                    str(buffer[country:country + country_len], "utf-8"),
+                    acceptance_rate,
+                    tuition_fee,
+                    None if ranking == _NO_RANKING else ranking,
+                    None if location_len == _NO_STRING else str(buffer[location:location + location_len], "utf-8"),
+                )
+        finally:
+            block.release()
+
+    def find(self, entry_id: int) -> int:
+        """Index of entry_id (binary search over the id column), -1 if absent"""
+        low, high = 0, self._size - 1
+        while low <= high:
+            middle = (low + high) // 2
+            current = self._id_at(middle)
+            if current == entry_id:
+                return middle
+            if current < entry_id:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return -1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+
+class SharedCatalogIndex(Mapping):
+    """id -> CatalogEntry over a SharedCatalogView (no per-worker dict)"""
+
+    def __init__(self, view: SharedCatalogView):
+        self._view = view
+
+    def __getitem__(self, entry_id: int):
+        index = self._view.find(entry_id)
+        if index < 0:
+            raise KeyError(entry_id)
+        return self._view[index]
+
+    def __contains__(self, entry_id) -> bool:
+        return self._view.find(entry_id) >= 0
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __iter__(self) -> Iterator[int]:
+        for i in range(len(self._view)):
+            yield self._view._id_at(i)
+
+
+def attach(path: Optional[str] = None) -> Optional[SharedCatalogView]:
+    """Map the published image read-only; None if nothing is published yet"""
+    path = path or shared_catalog_path()
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    try:
+        return SharedCatalogView(buffer)
+    except (ValueError, struct.error):
+        buffer.close()
+        return None
+
+
+def publish(entries, fingerprint: Tuple[int, int, int], path: Optional[str] = None) -> SharedCatalogView:
+    """
+    Build and atomically publish a new image (generation = previous + 1,
+    or the current time in microseconds if that is larger)
+    Holds an exclusive file lock so concurrent workers don't all rebuild:
+    whoever waits re-checks the fingerprint and attaches instead
+    """
+    path = path or shared_catalog_path()
+    with open(path + ".lock", "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            current = attach(path)
+            if current is not None and current.fingerprint == fingerprint:
+                return current
+            # Never reuse a generation, even after the image was wiped (/dev/shm
+            # cleared, host restart): versions key the derived caches of workers
+            # that attached an earlier image
+            generation = max(current.generation + 1 if current is not None else 1, time.time_ns() // 1000)
+            data = encode_catalog(entries, generation, fingerprint)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".catalog-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            return attach(path)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
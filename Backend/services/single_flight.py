@@ -0,0 +1,54 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers with the same key share one in-flight upstream call
+(double-clicks and frontend retries no longer trigger duplicate completions)
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+def fingerprint(payload: Dict[str, Any]) -> str:
+    """Stable hash of a request payload (dict key order does not matter)"""
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key
+    - The first caller starts the call as a separate task
+    - Later callers await the same task until it finishes
+    - A cancelled caller does not cancel the shared call for the others
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.executed = 0
+        self.deduplicated = 0
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finished(k, t))
+            self.executed += 1
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "deduplicated": self.deduplicated,
+        }
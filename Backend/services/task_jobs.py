@@ -0,0 +1,313 @@
+"""
+Task Assistance Job Queue
+In-process background generation for /tasks/assist
+- POST enqueues and returns a job ID immediately
+- A bounded worker pool runs the LLM generations
+- Results are persisted (one per task) so a page reload never regenerates
+"""
+import asyncio
+import itertools
+import logging
+import os
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models import Task, Profile, TaskAssistJob, JobStatusEnum
+from services.admission import AdmissionRejected
+from services.ai_engine import generate_task_assistance
+from services.log_pipeline import request_context
+
+logger = logging.getLogger(__name__)
+
+# Configuration (override via .env)
+TASK_ASSIST_WORKERS = int(os.getenv("TASK_ASSIST_WORKERS", "4"))
+TASK_ASSIST_MAX_QUEUE = int(os.getenv("TASK_ASSIST_MAX_QUEUE", "500"))
+# Queued/running jobs older than this are assumed lost (e.g. worker restart)
+TASK_ASSIST_STALE_SECONDS = int(os.getenv("TASK_ASSIST_STALE_SECONDS", "300"))
+# Pre-generate assistance for new tasks when a university is locked
+TASK_ASSIST_WARMUP = os.getenv("TASK_ASSIST_WARMUP", "false").lower() == "true"
+
+# Lower number = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+FAILED_MESSAGE = "I'm unable to generate assistance right now. Please try again later."
+
+
+class JobQueueFull(Exception):
+    """Raised when the job backlog is at TASK_ASSIST_MAX_QUEUE"""
+
+
+class TaskAssistQueue:
+    """
+    Priority queue + fixed worker pool
+    Completion is signalled through per-job asyncio events (used by SSE)
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.worker_count = workers
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers = []
+        self._sequence = itertools.count()
+        self._events: Dict[str, asyncio.Event] = {}
+        self._active = set()
+        self._first_open_samples = deque(maxlen=1000)
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.warmed = 0
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"task-assist-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _put(self, job_id: str, priority: int):
+        if self._queue is None:
+            raise RuntimeError("Task assist queue not started")
+        if self._queue.qsize() >= self.max_queue:
+            raise JobQueueFull()
+        self._events.setdefault(job_id, asyncio.Event())
+        self._queue.put_nowait((priority, next(self._sequence), job_id))
+        self.enqueued += 1
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        task: Task,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> TaskAssistJob:
+        """
+        Get or create the job for a task (deduplicated per task)
+        - done / in-progress jobs are returned as-is
+        - failed or stale jobs are re-queued
+        - an interactive request for a queued background job bumps its priority
+        """
+        interactive = priority < PRIORITY_BACKGROUND
+        result = await db.execute(
+            select(TaskAssistJob).where(TaskAssistJob.task_id == task.id)
+        )
+        job = result.scalar_one_or_none()
+
+        if job is None:
+            now = datetime.utcnow()
+            job = TaskAssistJob(
+                id=uuid.uuid4().hex,
+                task_id=task.id,
+                user_id=task.user_id,
+                status=JobStatusEnum.QUEUED,
+                created_at=now,
+                opened_at=now if interactive else None,
+            )
+            db.add(job)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another request created the job for this task first
+                await db.rollback()
+                self.deduplicated += 1
+                result = await db.execute(
+                    select(TaskAssistJob).where(TaskAssistJob.task_id == task.id)
+                )
+                return result.scalar_one()
+            self._put(job.id, priority)
+            return job
+
+        if interactive and job.opened_at is None:
+            # First open of a pre-generated (or still generating) result
+            job.opened_at = datetime.utcnow()
+            if job.status == JobStatusEnum.DONE:
+                self._first_open_samples.append(0.0)
+            await db.commit()
+
+        if job.status == JobStatusEnum.DONE or (
+            job.status in (JobStatusEnum.QUEUED, JobStatusEnum.RUNNING) and not self._is_stale(job)
+        ):
+            self.deduplicated += 1
+            if interactive and job.status == JobStatusEnum.QUEUED and job.id in self._events:
+                # Duplicate entry at the higher priority; whichever runs first wins
+                self._put(job.id, priority)
+            return job
+
+        job.status = JobStatusEnum.QUEUED
+        job.error = None
+        job.created_at = datetime.utcnow()
+        job.started_at = None
+        job.completed_at = None
+        job.opened_at = job.created_at if interactive else None
+        await db.commit()
+        self._put(job.id, priority)
+        return job
+
+    async def warm_up(self, task_ids: List[int]):
+        """
+        Pre-generate assistance for freshly created tasks at background priority
+        Runs after the response is sent; background jobs only use spare LLM capacity
+        """
+        async with AsyncSessionLocal() as db:
+            for task_id in task_ids:
+                task = await db.get(Task, task_id)
+                if task is None:
+                    continue
+                try:
+                    await self.enqueue(db, task, priority=PRIORITY_BACKGROUND)
+                except (JobQueueFull, RuntimeError):
+                    return
+                self.warmed += 1
+
+    def _is_stale(self, job: TaskAssistJob) -> bool:
+        # Jobs this worker knows about are never stale
+        if job.id in self._events:
+            return False
+        reference = job.started_at or job.created_at
+        return reference is None or datetime.utcnow() - reference > timedelta(seconds=TASK_ASSIST_STALE_SECONDS)
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """Wait for a job queued on this worker to finish (False on timeout/unknown)"""
+        event = self._events.get(job_id)
+        if event is None:
+            return False
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _finish(self, job_id: str):
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _worker(self):
+        while True:
+            priority, _, job_id = await self._queue.get()
+            self.running += 1
+            with request_context(job_id):
+                try:
+                    requeue_after = await self._run(job_id, priority)
+                except Exception:
+                    logger.exception("task assist job error", extra={"job_id": job_id})
+                    requeue_after = None
+                    self._finish(job_id)
+                finally:
+                    self.running -= 1
+                    self._queue.task_done()
+            if requeue_after is not None:
+                asyncio.get_running_loop().call_later(requeue_after, self._requeue, job_id, priority)
+
+    def _requeue(self, job_id: str, priority: int):
+        try:
+            self._put(job_id, priority)
+        except (JobQueueFull, RuntimeError):
+            self._finish(job_id)
+
+    async def _run(self, job_id: str, priority: int) -> Optional[float]:
+        """Run one job; returns a delay if it should be retried later"""
+        if job_id in self._active:
+            # Duplicate (priority-bumped) entry of a job already running here
+            return None
+        self._active.add(job_id)
+        try:
+            return await self._generate(job_id, priority)
+        finally:
+            self._active.discard(job_id)
+
+    async def _generate(self, job_id: str, priority: int) -> Optional[float]:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(TaskAssistJob, job_id)
+            if job is None or job.status != JobStatusEnum.QUEUED:
+                # Superseded entry (priority bump) of a job that already ran, failed
+                # or is running elsewhere - enqueue() re-queues jobs worth retrying
+                self._finish(job_id)
+                return None
+            task = await db.get(Task, job.task_id)
+            if task is None:
+                job.status = JobStatusEnum.FAILED
+                job.error = "Task not found"
+                job.completed_at = datetime.utcnow()
+                await db.commit()
+                self._finish(job_id)
+                return None
+            result = await db.execute(select(Profile).where(Profile.user_id == job.user_id))
+            profile = result.scalar_one_or_none()
+
+            job.status = JobStatusEnum.RUNNING
+            job.started_at = datetime.utcnow()
+            await db.commit()
+
+            user_profile = {
+                "gpa": profile.gpa if profile else None,
+                "budget": profile.budget if profile else None,
+                "degree_level": profile.degree_level if profile else None,
+                "target_country": profile.target_country if profile else None,
+                "ielts_score": profile.ielts_score if profile else None,
+                "gre_score": profile.gre_score if profile else None,
+            }
+
+            try:
+                job.content = await generate_task_assistance(
+                    task_title=task.title,
+                    user_profile=user_profile,
+                    user_id=job.user_id,
+                    background=priority >= PRIORITY_BACKGROUND
+                )
+                job.status = JobStatusEnum.DONE
+                self.completed += 1
+            except AdmissionRejected as e:
+                # LLM capacity exhausted - keep the job queued and try again later
+                job.status = JobStatusEnum.QUEUED
+                await db.commit()
+                return float(e.retry_after)
+            except Exception:
+                logger.exception("task assist generation error", extra={"job_id": job_id})
+                job.status = JobStatusEnum.FAILED
+                job.error = FAILED_MESSAGE
+                self.failed += 1
+
+            job.completed_at = datetime.utcnow()
+            await db.commit()
+            if job.opened_at is not None:
+                # The student was already waiting for this result
+                self._first_open_samples.append(max(0.0, (job.completed_at - job.opened_at).total_seconds()))
+            self._finish(job_id)
+            return None
+
+    def stats(self) -> Dict[str, any]:
+        samples = sorted(self._first_open_samples)
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self.running,
+            "enqueued": self.enqueued,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "warmed": self.warmed,
+            "first_open_samples": len(samples),
+            "first_open_ms_p50": round(1000 * samples[len(samples) // 2], 1) if samples else 0.0,
+        }
+
+
+# Process-wide queue (workers started in main.lifespan)
+task_assist_queue = TaskAssistQueue(
+    workers=TASK_ASSIST_WORKERS,
+    max_queue=TASK_ASSIST_MAX_QUEUE,
+)
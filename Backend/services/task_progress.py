@@ -0,0 +1,152 @@
+"""
+Task Progress Counters
+Per-user and per-university total/done task counts (`task_progress` table)
+- Updated in the same transaction as the task write that changes them, with
+  relative SQL increments so concurrent writers never lose an update
+- Status updates only count tasks whose status actually flipped
+  (UPDATE ... WHERE status != new), so repeated toggles can't double count
+- all_cleared / progress percentages are primary-key lookups instead of
+  scanning the user's tasks
+- rebuild_task_progress() recomputes them from `tasks`
+  (startup backfill, scripts/check_task_progress.py)
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, exists, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import is_postgres
+from models import Task, TaskProgress, TaskStatusEnum
+
+# university_id of the row holding a user's totals across all tasks
+ALL_TASKS = 0
+
+
+def _upsert():
+    return (pg_insert if is_postgres else sqlite_insert)(TaskProgress)
+
+
+async def record_tasks_created(db, user_id: int, university_id: Optional[int], count: int, done: int = 0):
+    """Add newly created tasks to the user's counters (and the university's)"""
+    rows = [{"user_id": user_id, "university_id": ALL_TASKS, "total": count, "done": done}]
+    if university_id:
+        rows.append({"user_id": user_id, "university_id": university_id, "total": count, "done": done})
+    statement = _upsert().values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TaskProgress.user_id, TaskProgress.university_id],
+        set_={
+            "total": TaskProgress.total + statement.excluded.total,
+            "done": TaskProgress.done + statement.excluded.done,
+        },
+    )
+    await db.execute(statement)
+
+
+async def record_status_changes(
+    db, user_id: int, changed: Iterable[Tuple[Optional[int], TaskStatusEnum]]
+) -> Optional[Tuple[int, int]]:
+    """
+    Apply tasks whose status flipped, as (university_id, new status) pairs
+    Returns the user's (total, done) afterwards, or None if nothing changed
+    """
+    deltas: Dict[int, int] = {}
+    for university_id, new_status in changed:
+        step = 1 if new_status == TaskStatusEnum.DONE else -1
+        deltas[ALL_TASKS] = deltas.get(ALL_TASKS, 0) + step
+        if university_id:
+            deltas[university_id] = deltas.get(university_id, 0) + step
+    if not deltas:
+        return None
+
+    result = await db.execute(
+        update(TaskProgress)
+        .where(TaskProgress.user_id == user_id, TaskProgress.university_id.in_(deltas))
+        .values(done=TaskProgress.done + case(deltas, value=TaskProgress.university_id, else_=0))
+        .returning(TaskProgress.university_id, TaskProgress.total, TaskProgress.done)
+        .execution_options(synchronize_session=False)
+    )
+    for university_id, total, done in result.all():
+        if university_id == ALL_TASKS:
+            return total, done
+    return None
+
+
+async def load_totals(db, user_id: int) -> Tuple[int, int]:
+    """User's (total, done) across all tasks - one primary-key lookup"""
+    result = await db.execute(
+        select(TaskProgress.total, TaskProgress.done).where(
+            TaskProgress.user_id == user_id, TaskProgress.university_id == ALL_TASKS
+        )
+    )
+    row = result.first()
+    return (row.total, row.done) if row else (0, 0)
+
+
+def all_cleared(total: int, done: int) -> bool:
+    """Gamification flag: the user has tasks and every one is done"""
+    return total > 0 and done >= total
+
+
+def percent(total: int, done: int) -> int:
+    return round(done * 100 / total) if total else 0
+
+
+def _expected_counts(user_ids: Optional[Sequence[int]] = None):
+    """(user_id, university_id, total, done) recomputed from `tasks`"""
+    done = func.sum(case((Task.status == TaskStatusEnum.DONE, 1), else_=0))
+    per_user = select(Task.user_id, literal(ALL_TASKS), func.count(Task.id), done).group_by(Task.user_id)
+    per_university = (
+        select(Task.user_id, Task.university_id, func.count(Task.id), done)
+        .where(Task.university_id.is_not(None))
+        .group_by(Task.user_id, Task.university_id)
+    )
+    if user_ids is not None:
+        per_user = per_user.where(Task.user_id.in_(user_ids))
+        per_university = per_university.where(Task.user_id.in_(user_ids))
+    return per_user, per_university
+
+
+async def _rebuild(conn, user_ids: Optional[Sequence[int]] = None):
+    clear = delete(TaskProgress)
+    if user_ids is not None:
+        clear = clear.where(TaskProgress.user_id.in_(user_ids))
+    await conn.execute(clear)
+    columns = [TaskProgress.user_id, TaskProgress.university_id, TaskProgress.total, TaskProgress.done]
+    for query in _expected_counts(user_ids):
+        await conn.execute(insert(TaskProgress).from_select(columns, query))
+
+
+async def rebuild_task_progress(conn, user_id: Optional[int] = None):
+    """Recompute counters from `tasks` (everyone, or one user)"""
+    await _rebuild(conn, None if user_id is None else [user_id])
+
+
+async def find_drift(conn) -> List[Tuple[int, int, Tuple[int, int], Tuple[int, int]]]:
+    """Counters that disagree with `tasks`: (user_id, university_id, expected, stored)"""
+    expected: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    for query in _expected_counts():
+        for user_id, university_id, total, done in (await conn.execute(query)).all():
+            expected[(user_id, university_id)] = (total, done or 0)
+    stored = {
+        (row.user_id, row.university_id): (row.total, row.done)
+        for row in (await conn.execute(select(TaskProgress))).all()
+    }
+    drift = []
+    for key in sorted(expected.keys() | stored.keys()):
+        if expected.get(key, (0, 0)) != stored.get(key, (0, 0)):
+            drift.append((key[0], key[1], expected.get(key, (0, 0)), stored.get(key, (0, 0))))
+    return drift
+
+
+async def backfill_task_progress(conn, batch_size: int = 500) -> int:
+    """
+    Build counters for every user who has tasks but no totals row yet
+    (tasks created before the counters existed); returns how many users
+    """
+    has_totals = exists().where(TaskProgress.user_id == Task.user_id, TaskProgress.university_id == ALL_TASKS)
+    result = await conn.execute(select(Task.user_id).where(~has_totals).distinct())
+    user_ids = [row[0] for row in result.all()]
+    for start in range(0, len(user_ids), batch_size):
+        await _rebuild(conn, user_ids[start:start + batch_size])
+    return len(user_ids)
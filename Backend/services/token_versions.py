@@ -0,0 +1,97 @@
+"""
+Token Version Table
+In-memory revocation list for stateless access tokens
+- Access tokens carry the user's token_version ("ver" claim); bumping
+  users.token_version (POST /auth/revoke) invalidates every older token
+- Only users who ever revoked are held (user_id -> version), so the table
+  stays small and a token check is one dict lookup, no DB query
+- Reloaded from the primary every TOKEN_VERSION_REFRESH_SECONDS, so other
+  workers honour a revocation within that window (this worker immediately)
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from models import User
+
+# Configuration (override via .env)
+TOKEN_VERSION_REFRESH_SECONDS = float(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "30"))
+
+
+class TokenVersionTable:
+    """user_id -> current token_version for users with a version above 0"""
+
+    def __init__(self, refresh_seconds: float = TOKEN_VERSION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._refreshed_at: Optional[float] = None
+        self.checks = 0
+        self.rejected = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    async def start(self):
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresher(), name="token-version-refresher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def is_current(self, user_id: int, version: int) -> bool:
+        """False if the token was issued before the user's last revocation"""
+        self.checks += 1
+        if version < self._versions.get(user_id, 0):
+            self.rejected += 1
+            return False
+        return True
+
+    def note(self, user_id: int, version: int):
+        """Record a revocation made by this worker (versions only go up)"""
+        if version > self._versions.get(user_id, 0):
+            self._versions[user_id] = version
+
+    async def refresh(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(User.id, User.token_version).where(User.token_version > 0)
+                )
+                loaded = dict(result.all())
+        except Exception:
+            self.refresh_errors += 1
+            return
+        # Keep local bumps the query may have raced with
+        for user_id, version in self._versions.items():
+            if version > loaded.get(user_id, 0):
+                loaded[user_id] = version
+        self._versions = loaded
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+
+    async def _refresher(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.refresh()
+
+    def stats(self) -> Dict[str, any]:
+        return {
+            "entries": len(self._versions),
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshed_seconds_ago": (
+                round(time.monotonic() - self._refreshed_at, 1) if self._refreshed_at is not None else None
+            ),
+        }
+
+
+token_versions = TokenVersionTable()
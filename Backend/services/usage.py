@@ -0,0 +1,231 @@
+"""
+LLM Usage Accounting
+Records prompt/completion tokens and latency of every upstream Groq call
+- Rows are buffered in memory and written in batches by one background task
+- Per-user token totals for the current day are kept in memory (seeded
+  from the table on startup); the daily quota is checked against the
+  table's total across all workers, re-read per user every
+  USAGE_QUOTA_REFRESH_SECONDS, or every USAGE_QUOTA_NEAR_REFRESH_SECONDS
+  once the user is close to the quota
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, func
+
+from database import AsyncSessionLocal
+from models import LLMUsage
+
+logger = logging.getLogger(__name__)
+
+# Configuration (override via .env)
+USAGE_FLUSH_SECONDS = float(os.getenv("USAGE_FLUSH_SECONDS", "2"))
+USAGE_BATCH_SIZE = int(os.getenv("USAGE_BATCH_SIZE", "200"))
+# Rows kept in memory while the database is unreachable; oldest dropped beyond this
+USAGE_MAX_BUFFER = int(os.getenv("USAGE_MAX_BUFFER", "10000"))
+# Total tokens per user per UTC day; 0 disables the quota
+USAGE_DAILY_TOKEN_QUOTA = int(os.getenv("USAGE_DAILY_TOKEN_QUOTA", "0"))
+# How stale a user's shared (all-worker) total may be for the quota check:
+# far from the quota / past USAGE_QUOTA_NEAR_FRACTION of it
+USAGE_QUOTA_REFRESH_SECONDS = float(os.getenv("USAGE_QUOTA_REFRESH_SECONDS", "10"))
+USAGE_QUOTA_NEAR_REFRESH_SECONDS = float(os.getenv("USAGE_QUOTA_NEAR_REFRESH_SECONDS", "1"))
+USAGE_QUOTA_NEAR_FRACTION = float(os.getenv("USAGE_QUOTA_NEAR_FRACTION", "0.8"))
+
+
+class UsageQuotaExceeded(Exception):
+    """Raised when a user has spent their daily token quota"""
+
+    def __init__(self, used: int, quota: int):
+        super().__init__(f"Daily LLM token quota exhausted ({used}/{quota})")
+        self.used = used
+        self.quota = quota
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds until the quota resets (next UTC midnight)"""
+        now = datetime.utcnow()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return int((midnight - now).total_seconds()) + 1
+
+
+class UsageRecorder:
+    """Batched async writer + in-memory per-user daily totals"""
+
+    def __init__(self, daily_quota: int):
+        self.daily_quota = daily_quota
+        self._buffer: List[Dict[str, any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._today = datetime.utcnow().date()
+        self._daily_tokens: Dict[Optional[int], int] = {}
+        # user_id -> (all-worker total, this worker's total, monotonic time) when last read
+        self._shared_totals: Dict[int, Tuple[int, int, float]] = {}
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rejected = 0
+        self.quota_refreshes = 0
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        await self._load_today()
+        self._task = asyncio.create_task(self._flusher(), name="usage-flusher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _load_today(self):
+        """Seed today's per-user totals so a restart doesn't reset quotas"""
+        start_of_day = datetime.combine(self._today, datetime.min.time())
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        LLMUsage.user_id,
+                        func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens),
+                    )
+                    .where(LLMUsage.created_at >= start_of_day)
+                    .group_by(LLMUsage.user_id)
+                )
+                self._daily_tokens = {user_id: int(tokens or 0) for user_id, tokens in result.all()}
+        except Exception as e:
+            logger.warning("usage totals not loaded", extra={"error": f"{type(e).__name__}: {e}"})
+
+    def _roll_day(self):
+        today = datetime.utcnow().date()
+        if today != self._today:
+            self._today = today
+            self._daily_tokens = {}
+            self._shared_totals = {}
+    def record(
+        self,
+        user_id: Optional[int],
+        feature: str,
+        model: str,
+        usage,
+        latency_seconds: float
+    ):
+        """Buffer one completion's usage (never blocks, never raises)"""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        self._roll_day()
+        self._daily_tokens[user_id] = self._daily_tokens.get(user_id, 0) + prompt_tokens + completion_tokens
+
+        if len(self._buffer) >= USAGE_MAX_BUFFER:
+            self._buffer.pop(0)
+            self.dropped += 1
+        self._buffer.append({
+            "user_id": user_id,
+            "feature": feature,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": int(latency_seconds * 1000),
+            "created_at": datetime.utcnow(),
+        })
+        self.recorded += 1
+        if len(self._buffer) >= USAGE_BATCH_SIZE and self._wakeup is not None:
+            self._wakeup.set()
+
+    def tokens_today(self, user_id: Optional[int]) -> int:
+        """User's tokens today: the last all-worker total plus what this worker recorded since"""
+        self._roll_day()
+        local = self._daily_tokens.get(user_id, 0)
+        shared = self._shared_totals.get(user_id)
+        if shared is None:
+            return local
+        total, local_then, _ = shared
+        return max(local, total + local - local_then)
+
+    async def _refresh_shared_total(self, user_id: int):
+        """Re-read the user's total for today from the table (every worker's flushed rows)"""
+        start_of_day = datetime.combine(self._today, datetime.min.time())
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens))
+                .where(LLMUsage.user_id == user_id, LLMUsage.created_at >= start_of_day)
+            )
+            stored = int(result.scalar() or 0)
+        # This worker's rows not flushed yet
+        buffered = sum(
+            row["prompt_tokens"] + row["completion_tokens"] for row in self._buffer if row["user_id"] == user_id
+        )
+        self._shared_totals[user_id] = (stored + buffered, self._daily_tokens.get(user_id, 0), time.monotonic())
+        self.quota_refreshes += 1
+
+    async def check_quota(self, user_id: int):
+        """
+        Raises:
+            UsageQuotaExceeded: user has no tokens left today (across all workers,
+            give or take rows other workers haven't flushed yet)
+        """
+        if not self.daily_quota:
+            return
+        used = self.tokens_today(user_id)
+        near = used >= self.daily_quota * USAGE_QUOTA_NEAR_FRACTION
+        shared = self._shared_totals.get(user_id)
+        max_age = USAGE_QUOTA_NEAR_REFRESH_SECONDS if near else USAGE_QUOTA_REFRESH_SECONDS
+        if shared is None or time.monotonic() - shared[2] > max_age:
+            try:
+                await self._refresh_shared_total(user_id)
+            except Exception as e:
+                # Database unreachable - this worker's own total still applies
+                logger.warning("usage total not refreshed", extra={"error": f"{type(e).__name__}: {e}"})
+            used = self.tokens_today(user_id)
+        if used >= self.daily_quota:
+            self.rejected += 1
+            raise UsageQuotaExceeded(used, self.daily_quota)
+
+    async def flush(self):
+        """Write buffered rows with one multi-row INSERT per batch"""
+        while self._buffer:
+            batch = self._buffer[:USAGE_BATCH_SIZE]
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(LLMUsage), batch)
+                    await db.commit()
+            except Exception as e:
+                # Keep the rows; the next flush retries them
+                self.flush_errors += 1
+                logger.warning("usage flush failed", extra={"error": f"{type(e).__name__}: {e}", "rows": len(batch)})
+                return
+            del self._buffer[:len(batch)]
+            self.written += len(batch)
+            self.flushes += 1
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=USAGE_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, any]:
+        return {
+            "recorded": self.recorded,
+            "written": self.written,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "daily_quota": self.daily_quota,
+            "quota_rejections": self.rejected,
+            "quota_refreshes": self.quota_refreshes,
+        }
+
+
+# Process-wide recorder
+usage_recorder = UsageRecorder(USAGE_DAILY_TOKEN_QUOTA)
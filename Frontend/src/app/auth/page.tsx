@@ -17,7 +17,7 @@ import {
 } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
-import { API } from "@/lib/api";
+import { API, WriteMarker } from "@/lib/api";
 import SocialButton from "@/components/SocialButton";
 
 // Inner component that uses useSearchParams
@@ -51,9 +51,10 @@ function AuthPageContent() {
       console.log(`[OAuth] Received token from ${oauthProvider} login`);
       console.log(`[OAuth] Redirect path: ${redirectPath}`);
       
-      // Store the token
+      // Store the token (and the signup's write marker, so the next reads see the new account)
       localStorage.setItem('access_token', token);
       localStorage.setItem('token', token);
+      WriteMarker.set(searchParams.get('last_write'));
       
       // Verify token storage
       const storedToken = localStorage.getItem('access_token');
@@ -56,6 +56,16 @@ export interface Task {
   created_at: string;
 }
 
+export interface TaskAssistJob {
+  job_id: string;
+  task_id: number;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  content?: string | null;
+  error?: string | null;
+  created_at: string;
+  completed_at?: string | null;
+}
+
 export interface ChatMessage {
   role: 'user' | 'assistant';
   content: string;
@@ -66,6 +76,38 @@ export interface ChatResponse {
   render_cards?: string[];
 }
 
+export type ChatSocketEvent =
+  | { type: 'ready'; user_id: number }
+  | { type: 'delta'; id: string; text: string }
+  | { type: 'done'; id: string; response: string; render_cards?: string[] | null; cards?: { id: number; name: string; country: string }[] | null }
+  | { type: 'cancelled'; id: string }
+  | { type: 'error'; id?: string; status: number; detail: string; retry_after?: number };
+
+export interface ShortlistEntry {
+  id: number;
+  user_id: number;
+  university_id: number;
+  is_locked: boolean;
+  locked_at?: string | null;
+  university: University;
+}
+
+export interface DashboardData {
+  profile: (UserProfile & { email?: string; full_name?: string }) | null;
+  tasks: Task[];
+  all_cleared: boolean;
+  shortlist: ShortlistEntry[];
+  recommendations: University[];
+}
+
+export interface TaskProgress {
+  total: number;
+  done: number;
+  percent: number;
+  all_cleared: boolean;
+  universities: { university_id: number; total: number; done: number; percent: number }[];
+}
+
 export interface ApiError {
   message: string;
   status?: number;
@@ -115,6 +157,33 @@ export const TokenStorage = {
   },
 };
 
+// ═══════════════════════════════════════════════════════════════
+// WRITE MARKER (read-your-writes)
+// ═══════════════════════════════════════════════════════════════
+
+/**
+ * Time of this tab's latest write, as issued by the backend (X-Last-Write)
+ * Sent back on every request so reads right after a write see it,
+ * whichever backend worker answers
+ */
+export const WriteMarker = {
+  HEADER: 'X-Last-Write',
+  KEY: 'last_write',
+
+  get(): string | null {
+    if (typeof window === 'undefined') return null;
+    return sessionStorage.getItem(this.KEY);
+  },
+
+  set(value: string | null | undefined): void {
+    if (typeof window === 'undefined' || !value) return;
+    const current = this.get();
+    if (!current || parseFloat(value) > parseFloat(current)) {
+      sessionStorage.setItem(this.KEY, value);
+    }
+  },
+};
+
 // ═══════════════════════════════════════════════════════════════
 // AXIOS INSTANCE & INTERCEPTORS
 // ═══════════════════════════════════════════════════════════════
@@ -156,6 +225,11 @@ axiosInstance.interceptors.request.use(
       } else {
         console.warn('⚠️ No token found in storage for:', config.url);
       }
+
+      const lastWrite = WriteMarker.get();
+      if (lastWrite && config.headers) {
+        config.headers[WriteMarker.HEADER] = lastWrite;
+      }
     }
     
     return config;
@@ -168,6 +242,7 @@ axiosInstance.interceptors.request.use(
 // RESPONSE INTERCEPTOR: Handle errors globally
 axiosInstance.interceptors.response.use(
   (response) => {
+    WriteMarker.set(response.headers[WriteMarker.HEADER.toLowerCase()]);
     return response;
   },
   (error: AxiosError<{ detail?: string; message?: string }>) => {
@@ -332,6 +407,17 @@ export const API = {
       return response.data;
     },
 
+    /**
+     * Sign out on every other device
+     * Invalidates all issued tokens and stores the fresh one returned
+     */
+    revokeOtherSessions: async (): Promise<AuthResponse> => {
+      const response = await axiosInstance.post<AuthResponse>('/auth/revoke');
+      TokenStorage.set(response.data.access_token);
+      setAuthHeader(response.data.access_token);
+      return response.data;
+    },
+
     /**
      * Clear local auth state
      */
@@ -370,6 +456,19 @@ export const API = {
     },
   },
 
+  // ─────────────────────────────────────────────────────────────
+  // DASHBOARD
+  // ─────────────────────────────────────────────────────────────
+  dashboard: {
+    /**
+     * Profile, tasks, shortlist and recommendations in one request
+     */
+    get: async (): Promise<DashboardData> => {
+      const response = await axiosInstance.get<DashboardData>('/dashboard/');
+      return response.data;
+    },
+  },
+
   // ─────────────────────────────────────────────────────────────
   // UNIVERSITY DISCOVERY
   // ─────────────────────────────────────────────────────────────
@@ -425,6 +524,31 @@ export const API = {
       });
       return response.data;
     },
+
+    /**
+     * Streaming chat over one WebSocket (authenticated once per connection)
+     * History is kept server-side; sending a new message cancels the reply
+     * still streaming. Heartbeat pings are answered automatically.
+     */
+    connect: (onEvent: (event: ChatSocketEvent) => void) => {
+      const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/chat/ws`);
+      socket.onopen = () => socket.send(JSON.stringify({ type: 'auth', token: TokenStorage.get() }));
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.type === 'ping') {
+          socket.send(JSON.stringify({ type: 'pong' }));
+        } else {
+          onEvent(event as ChatSocketEvent);
+        }
+      };
+      return {
+        send: (id: string, message: string) =>
+          socket.send(JSON.stringify({ type: 'message', id, message, last_write: WriteMarker.get() })),
+        cancel: () => socket.send(JSON.stringify({ type: 'cancel' })),
+        reset: () => socket.send(JSON.stringify({ type: 'reset' })),
+        close: () => socket.close(),
+      };
+    },
   },
 
   // ─────────────────────────────────────────────────────────────
@@ -447,12 +571,43 @@ export const API = {
       return response.data;
     },
 
+    /**
+     * Completion counters for progress bars (overall and per university)
+     */
+    getProgress: async (): Promise<TaskProgress> => {
+      const response = await axiosInstance.get<TaskProgress>('/tasks/progress');
+      return response.data;
+    },
+
+    /**
+     * Update many tasks at once (e.g. "mark all done") in a single request
+     * Returns only the tasks whose status changed, plus all_cleared
+     */
+    bulkUpdate: async (
+      taskIds: number[],
+      status: 'pending' | 'done'
+    ): Promise<{ tasks: Task[]; all_cleared: boolean }> => {
+      const response = await axiosInstance.patch('/tasks/bulk', { task_ids: taskIds, status });
+      return response.data;
+    },
+
     /**
      * Get AI assistance for a specific task
+     * Generation runs as a background job; poll until it finishes
+     * (results are stored, so re-opening a task returns instantly)
      */
     getAssistance: async (taskId: number): Promise<{ content: string }> => {
-      const response = await axiosInstance.post('/tasks/assist', { task_id: taskId });
-      return response.data;
+      const response = await axiosInstance.post<TaskAssistJob>('/tasks/assist', { task_id: taskId });
+      let job = response.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const poll = await axiosInstance.get<TaskAssistJob>(`/tasks/assist/${job.job_id}`);
+        job = poll.data;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Unable to generate assistance');
+      }
+      return { content: job.content || '' };
     },
   },
 